@@ -0,0 +1,61 @@
+import operator
+
+#metric name -> value read from the shared db.stats.StatsSnapshot
+#achievement rules in the achievements table refer to these names
+METRICS = {
+    "level": lambda s: s.level,
+    "total_xp": lambda s: s.total_xp,
+    "todos_completed": lambda s: s.positive_counts.get("todo_completed", 0),
+    "journal_entries": lambda s: s.event_counts.get("journal_written", 0),
+    "best_daily_streak": lambda s: s.best_daily_streak,
+    "best_weekly_streak": lambda s: s.best_weekly_streak,
+    "largest_expense": lambda s: max(0.0, -s.min_transaction),
+    "largest_income": lambda s: max(0.0, s.max_transaction),
+}
+
+COMPARATORS = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "==": operator.eq,
+}
+
+
+def rule_met(achievement: dict, snapshot) -> bool:
+    metric = METRICS.get(achievement.get("metric") or "")
+    compare = COMPARATORS.get(achievement.get("comparator") or ">=")
+    threshold = achievement.get("threshold")
+    if metric is None or compare is None or threshold is None:
+        return False
+    return bool(compare(metric(snapshot), threshold))
+
+
+#progress for every achievement from one snapshot, e.g. {'current': 37, 'target': 50}
+#target is None for rules where a progress bar makes no sense (<=, ==, unknown metric)
+def evaluate_progress(achievements: list[dict], snapshot, unlocked: set[str]) -> dict[str, dict]:
+    progress: dict[str, dict] = {}
+
+    for a in achievements:
+        aid = a["id"]
+        metric = METRICS.get(a.get("metric") or "")
+        value = metric(snapshot) if metric else 0
+        threshold = a.get("threshold")
+
+        target = None
+        if metric and threshold is not None and (a.get("comparator") or ">=") in (">=", ">"):
+            target = threshold
+
+        is_unlocked = aid in unlocked
+        current = value
+        if target is not None:
+            current = target if is_unlocked else min(value, target)
+
+        progress[aid] = {
+            "current": current,
+            "target": target,
+            "met": rule_met(a, snapshot),
+            "unlocked": is_unlocked,
+        }
+
+    return progress
@@ -0,0 +1,108 @@
+import hashlib
+import threading
+from datetime import date as dt_date
+
+from db.achievements import list_achievements, list_unlocked_ids, unlock
+from db.settings import get_setting, set_setting
+from db.stats import load_stats_snapshot
+from actions.achievement_checks import rule_met
+from helpers.events import AchievementsChanged, ExternalChange, subscribe
+
+
+#anything that grants or removes xp can move the xp based metrics
+XP_METRICS = ('level', 'total_xp')
+
+#which metrics an action can possibly change, achievements on other metrics are skipped for that action
+EVENT_METRICS = {
+    'todo_toggled': XP_METRICS + ('todos_completed',),
+    'daily_habit_toggled': XP_METRICS + ('best_daily_streak',),
+    'weekly_habit_incremented': XP_METRICS + ('best_weekly_streak',),
+    'journal_saved': XP_METRICS + ('journal_entries',),
+    'transactions_changed': ('largest_expense', 'largest_income'),
+}
+
+
+#achievements not unlocked yet, so a toggle with nothing left to unlock costs no query at all
+#dropped on every achievements change (unlock, seeding) and on writes of other processes
+_locked_cache: list[dict] | None = None
+_locked_lock = threading.Lock()
+_locked_generation = 0
+
+
+def _drop_locked_cache(event) -> None:
+    global _locked_cache, _locked_generation
+    with _locked_lock:
+        _locked_cache = None
+        _locked_generation += 1
+
+
+subscribe(AchievementsChanged, _drop_locked_cache)
+subscribe(ExternalChange, _drop_locked_cache)
+
+
+def list_locked_achievements(connection) -> list[dict]:
+    global _locked_cache
+    with _locked_lock:
+        if _locked_cache is not None:
+            return _locked_cache
+        generation = _locked_generation
+
+    unlocked = list_unlocked_ids(connection)
+    locked = [a for a in list_achievements(connection) if a['id'] not in unlocked]
+
+    with _locked_lock:
+        if generation == _locked_generation:
+            _locked_cache = locked
+    return locked
+
+
+def evaluate_achievements(connection, metrics=None, day: str | None = None) -> list[str]:
+    day = day or dt_date.today().isoformat()
+
+    pending = [
+        a for a in list_locked_achievements(connection)
+        if metrics is None or a.get('metric') in metrics
+    ]
+    if not pending:
+        return []
+
+    snapshot = load_stats_snapshot(connection, day)
+
+    newly_unlocked = []
+    for a in pending:
+        if rule_met(a, snapshot):
+            unlock(connection, a['id'])
+            newly_unlocked.append(a['id'])
+
+    return newly_unlocked
+
+
+#called by the action layer right after the write, so unlocks never wait for a tab to open
+def evaluate_for_event(connection, event: str, day: str | None = None) -> list[str]:
+    return evaluate_achievements(connection, EVENT_METRICS.get(event, ()), day)
+
+
+#full sweep, catches up on data from before the engine existed or from before a rule changed
+def evaluate_all_achievements(connection, day: str | None = None) -> list[str]:
+    return evaluate_achievements(connection, None, day)
+
+
+#fingerprint of the rules the last full sweep ran against
+RULES_EVALUATED_SETTING = 'achievement_rules_evaluated'
+
+
+def rules_signature(achievements: list[dict]) -> str:
+    rules = sorted((a['id'], a['metric'], a['comparator'], a['threshold']) for a in achievements)
+    return hashlib.sha1(repr(rules).encode('utf-8')).hexdigest()
+
+
+#startup: the per-event evaluation covers new data, so the full sweep only runs on the first start
+#and after seeding changed a rule (new achievement, new threshold)
+def evaluate_achievements_if_rules_changed(connection, day: str | None = None) -> list[str]:
+    signature = rules_signature(list_achievements(connection))
+    if get_setting(connection, RULES_EVALUATED_SETTING) == signature:
+        return []
+
+    unlocked = evaluate_all_achievements(connection, day)
+    set_setting(connection, RULES_EVALUATED_SETTING, signature)
+    return unlocked
@@ -1,29 +1,58 @@
+from datetime import date as dt_date
+
 from db.todos import set_todo_completed, get_todo_title
 from db.habits import (
     set_daily_done,
     increment_habit_today,
-    get_weekly_progress,
     get_habit_title,
+    get_daily_streak,
+    get_weekly_streak,
+)
+from db.journal import save_journal_entry, update_journal_fields
+from db.finance import (
+    insert_transaction,
+    update_transaction,
+    import_transactions as import_transaction_rows,
+    sync_recurring_transactions,
 )
-from db.journal import save_journal_entry
+from helpers.events import deferred, subscribe, RecurringRulesChanged, ExternalChange
+from helpers.db import db_session
 
 from actions.xp_rules import (
+    WEEKLY_HABIT_XP,
     todo_toggled,
     daily_habit_toggled,
     weekly_habit_target_reached,
     journal_written,
 )
+from actions.achievements import evaluate_for_event
 
 
+#the toggles return the new state of what they changed, so views can patch one row
+#instead of reloading: the entity fields, xp_delta and any achievements unlocked by it
+#the state change and its xp event are one transaction, the change events go out after its commit
+#(the streak cache applies the log change to its runs instead of rebuilding them)
+#views pass the title they already show, it is only looked up when missing
+
 def toggle_todo(
     connection,
     day: str,
     todo_id: int,
     completed: bool,
-) -> None:
-    title = get_todo_title(connection, todo_id)
-    set_todo_completed(connection, todo_id, completed)
-    todo_toggled(connection, day, todo_id, title, completed)
+    title: str | None = None,
+) -> dict:
+    if title is None:
+        title = get_todo_title(connection, todo_id)
+    with deferred(), connection:
+        set_todo_completed(connection, todo_id, completed, commit=False)
+        xp_delta = todo_toggled(connection, day, todo_id, title, completed, commit=False)
+    unlocked = evaluate_for_event(connection, 'todo_toggled', day)
+    return {
+        'todo_id': todo_id,
+        'completed': completed,
+        'xp_delta': xp_delta,
+        'unlocked': unlocked,
+    }
 
 
 def toggle_daily_habit(
@@ -31,21 +60,51 @@ def toggle_daily_habit(
     day: str,
     habit_id: int,
     done: bool,
-) -> None:
-    title = get_habit_title(connection, habit_id)
-    set_daily_done(connection, habit_id, day, done)
-    daily_habit_toggled(connection, day, habit_id, title, done)
+    title: str | None = None,
+) -> dict:
+    if title is None:
+        title = get_habit_title(connection, habit_id)
+    with deferred(), connection:
+        set_daily_done(connection, habit_id, day, done, commit=False)
+        xp_delta = daily_habit_toggled(connection, day, habit_id, title, done, commit=False)
+    unlocked = evaluate_for_event(connection, 'daily_habit_toggled', day)
+    return {
+        'habit_id': habit_id,
+        'done': done,
+        'streak': get_daily_streak(connection, habit_id, day),
+        'xp_delta': xp_delta,
+        'unlocked': unlocked,
+    }
 
 
 def increment_weekly_habit(
     connection,
     day: str,
     habit_id: int,
-) -> None:
-    title = get_habit_title(connection, habit_id)
-    increment_habit_today(connection, habit_id, day)
-    new_done, target = get_weekly_progress(connection, habit_id, day)
-    weekly_habit_target_reached(connection, day, habit_id, title, new_done, target)
+    title: str | None = None,
+) -> dict:
+    if title is None:
+        title = get_habit_title(connection, habit_id)
+
+    xp_delta = 0
+    with deferred(), connection:
+        new_done, target = increment_habit_today(connection, habit_id, day, commit=False)
+        #the weekly streak can only grow in the call that first reaches the target
+        if weekly_habit_target_reached(connection, day, habit_id, title, new_done, target, commit=False) is not None:
+            xp_delta = WEEKLY_HABIT_XP
+
+    unlocked = []
+    if xp_delta:
+        unlocked = evaluate_for_event(connection, 'weekly_habit_incremented', day)
+
+    return {
+        'habit_id': habit_id,
+        'done': new_done,
+        'target': target,
+        'streak': get_weekly_streak(connection, habit_id, day),
+        'xp_delta': xp_delta,
+        'unlocked': unlocked,
+    }
 
 
 def save_journal(
@@ -54,4 +113,68 @@ def save_journal(
     text: str,
 ) -> None:
     save_journal_entry(connection, day, text)
-    journal_written(connection, day, text)
+    if journal_written(connection, day, text) is not None:
+        evaluate_for_event(connection, 'journal_saved', day)
+
+
+#diff based variant used by the journal write-behind, xp is still tied to the notes text
+def save_journal_fields(
+    connection,
+    day: str,
+    fields: dict,
+) -> None:
+    update_journal_fields(connection, day, fields)
+    if 'text' in fields and journal_written(connection, day, fields['text'] or '') is not None:
+        evaluate_for_event(connection, 'journal_saved', day)
+
+
+def add_transaction(connection, **fields) -> int | None:
+    tx_id = insert_transaction(connection, **fields)
+    if tx_id is not None:
+        evaluate_for_event(connection, 'transactions_changed')
+    return tx_id
+
+
+def edit_transaction(connection, **fields) -> None:
+    update_transaction(connection, **fields)
+    evaluate_for_event(connection, 'transactions_changed')
+
+
+def import_transactions(connection, transactions: list[dict]) -> dict[str, int]:
+    stats = import_transaction_rows(connection, transactions)
+    if stats.get('imported'):
+        evaluate_for_event(connection, 'transactions_changed')
+    return stats
+
+
+def sync_recurring(connection, rule_id: int | None = None, up_to_date: str | None = None) -> dict[str, int]:
+    stats = sync_recurring_transactions(connection, rule_id=rule_id, up_to_date=up_to_date)
+    if stats.get('inserted'):
+        evaluate_for_event(connection, 'transactions_changed')
+    return stats
+
+
+#date all rules were last synced up to (gui thread only), dropped when rules change here or elsewhere
+_recurring_synced_up_to: str | None = None
+
+
+def _drop_recurring_sync(_event) -> None:
+    global _recurring_synced_up_to
+    _recurring_synced_up_to = None
+
+
+subscribe(RecurringRulesChanged, _drop_recurring_sync)
+subscribe(ExternalChange, _drop_recurring_sync)
+
+
+#called at startup and by the finance views on refresh, only opens a session when the date moved
+#past the last sync (a new day, a dashboard window ending later) or the rules changed since
+def sync_recurring_if_due(up_to_date: str | None = None) -> None:
+    global _recurring_synced_up_to
+    up_to = up_to_date or dt_date.today().isoformat()
+    if _recurring_synced_up_to is not None and up_to <= _recurring_synced_up_to:
+        return
+
+    with db_session() as connection:
+        sync_recurring(connection, rule_id=None, up_to_date=up_to)
+    _recurring_synced_up_to = up_to
@@ -1,4 +1,4 @@
-from db.xp import add_xp_event, has_xp_event_for_day, has_weekly_reward, week_start_iso
+from db.xp import add_xp_event, week_start_iso
 
 
 TODO_XP = 20
@@ -13,7 +13,8 @@ def todo_toggled(
     todo_id: int,
     title: str,
     completed: bool,
-) -> None:
+    commit: bool = True,
+) -> int:
     xp_amount = TODO_XP if completed else -TODO_XP
     add_xp_event(
         connection,
@@ -22,7 +23,9 @@ def todo_toggled(
         f'todo: {title}',
         source_id=todo_id,
         source_date=day,
+        commit=commit,
     )
+    return xp_amount
 
 
 def daily_habit_toggled(
@@ -31,7 +34,8 @@ def daily_habit_toggled(
     habit_id: int,
     title: str,
     done: bool,
-) -> None:
+    commit: bool = True,
+) -> int:
     xp_amount = DAILY_HABIT_XP if done else -DAILY_HABIT_XP
     add_xp_event(
         connection,
@@ -40,7 +44,9 @@ def daily_habit_toggled(
         f'habit: {title}',
         source_id=habit_id,
         source_date=day,
+        commit=commit,
     )
+    return xp_amount
 
 
 def weekly_habit_target_reached(
@@ -50,36 +56,32 @@ def weekly_habit_target_reached(
     title: str,
     new_done: int,
     target: int,
-) -> None:
+    commit: bool = True,
+) -> int | None:
     if not target:
-        return
+        return None
 
     if new_done < target:
-        return
+        return None
 
-    week_start = week_start_iso(day)
-
-    if has_weekly_reward(connection, habit_id, week_start):
-        return
-
-    add_xp_event(
+    #idempotent, a second reward for the same habit and week is ignored by the db
+    return add_xp_event(
         connection,
         'weekly_habit_target_reached',
         WEEKLY_HABIT_XP,
         f'weekly target reached: {title}',
         source_id=habit_id,
-        source_date=week_start,
+        source_date=week_start_iso(day),
+        commit=commit,
     )
 
 
-def journal_written(connection, day: str, text: str) -> None:
+def journal_written(connection, day: str, text: str) -> int | None:
     if not text.strip():
-        return
+        return None
 
-    if has_xp_event_for_day(connection, 'journal_written', day):
-        return
-
-    add_xp_event(
+    #idempotent, only the first save of the day inserts a reward
+    return add_xp_event(
         connection,
         'journal_written',
         JOURNAL_XP,
@@ -1,23 +1,71 @@
 import os 
-from PySide6.QtNetwork import QNetworkProxy
+import time
 
+#startup benchmark origin, taken before the qt and app imports
+STARTED = time.perf_counter()
+
+from PySide6.QtCore import QObject, QEvent, QTimer
 from PySide6.QtWidgets import QApplication, QMainWindow
 import sys
 
 
 from ui.main_window import MainWindow
-from db.core import connect_db, init_db
+from db.core import DB_PATH, connect_db, init_db
+from db.versions import watch_database
+from actions.achievements import evaluate_achievements_if_rules_changed
+from actions.actions import sync_recurring_if_due
+from helpers import profiling
+
+
+#PLANNER_STARTUP_BENCH=1 prints the time from startup to the first painted frame,
+#PLANNER_STARTUP_BENCH=exit quits right after, to compare startup changes over a few runs
+class FirstPaintProbe(QObject):
+    def __init__(self, app: QApplication, quit_after: bool):
+        super().__init__(app)
+        self.app = app
+        self.quit_after = quit_after
+        app.installEventFilter(self)
+
+    def eventFilter(self, obj, event) -> bool:
+        if event.type() == QEvent.Paint:
+            self.app.removeEventFilter(self)
+            #reported once the whole frame went through, not on the first widget of it
+            QTimer.singleShot(0, self.report)
+        return False
+
+    def report(self) -> None:
+        elapsed = time.perf_counter() - STARTED
+        profiling.record('startup: first paint', elapsed)
+        print(f'first paint after {elapsed * 1000:.0f} ms')
+        if self.quit_after:
+            self.app.quit()
 
 
 def main():
-    QNetworkProxy.setApplicationProxy(QNetworkProxy(QNetworkProxy.NoProxy)) #to make weather work
     os.environ['QT_LOGGING_RULES'] = 'qt.pointer.dispatch=false' #to get rid of annoying log message
-    db_connection = connect_db()
-    init_db(db_connection)    
+    #env var first so init_db is covered too, the settings key can only be read after it
+    profiling.configure()
+    profiling.record('startup: imports', time.perf_counter() - STARTED)
+
+    with profiling.timed('startup: init_db'):
+        db_connection = connect_db()
+        init_db(db_connection)    
+        profiling.configure(db_connection)
+    with profiling.timed('startup: achievements'):
+        evaluate_achievements_if_rules_changed(db_connection)
     db_connection.close()
-    app = QApplication(sys.argv)
-    window = MainWindow()
-    window.show()
+    with profiling.timed('startup: recurring'):
+        sync_recurring_if_due()
+    watch_database(DB_PATH)
+
+    with profiling.timed('startup: qapplication'):
+        app = QApplication(sys.argv)
+    bench = os.environ.get('PLANNER_STARTUP_BENCH')
+    if bench or profiling.is_enabled():
+        FirstPaintProbe(app, quit_after=bench == 'exit')
+    with profiling.timed('startup: main window'):
+        window = MainWindow()
+        window.show()
     return app.exec()
     
     
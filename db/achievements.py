@@ -1,30 +1,34 @@
 import sqlite3
 
+from helpers.events import AchievementsChanged, publish
+
+#rules are declarative: an achievement unlocks once <metric> <comparator> <threshold> holds
+#metrics are the fields of db.stats.StatsSnapshot exposed via actions.achievement_checks.METRICS
 DEFAULT_ACHIEVEMENTS = [
     # levels
-    ("level_5", "Getting Started", "Reach level 5", 0, "progress", 10),
-    ("level_25", "Committed", "Reach level 25", 0, "progress", 20),
-    ("level_50", "Lifestyle", "Reach level 50", 0, "progress", 30),
-    ("level_100", "Addict", "Reach level 100", 0, "progress", 40),
+    ("level_5", "Getting Started", "Reach level 5", 0, "progress", 10, "level", ">=", 5),
+    ("level_25", "Committed", "Reach level 25", 0, "progress", 20, "level", ">=", 25),
+    ("level_50", "Lifestyle", "Reach level 50", 0, "progress", 30, "level", ">=", 50),
+    ("level_100", "Addict", "Reach level 100", 0, "progress", 40, "level", ">=", 100),
 
     # streaks
-    ("daily_streak_7", "Locked In", "Maintain a 7-day daily streak", 0, "habits", 100),
-    ("daily_streak_30", "Routine Built", "Maintain a 30-day daily streak", 0, "habits", 110),
-    ("weekly_streak_4", "Weekly Grind", "Maintain a 4-week streak", 0, "habits", 120),
-    ("weekly_streak_12", "No Excuses", "Maintain a 12-week streak", 0, "habits", 130),
+    ("daily_streak_7", "Locked In", "Maintain a 7-day daily streak", 0, "habits", 100, "best_daily_streak", ">=", 7),
+    ("daily_streak_30", "Routine Built", "Maintain a 30-day daily streak", 0, "habits", 110, "best_daily_streak", ">=", 30),
+    ("weekly_streak_4", "Weekly Grind", "Maintain a 4-week streak", 0, "habits", 120, "best_weekly_streak", ">=", 4),
+    ("weekly_streak_12", "No Excuses", "Maintain a 12-week streak", 0, "habits", 130, "best_weekly_streak", ">=", 12),
 
     # todos
-    ("todos_10", "Little Wins", "Complete 10 to-dos", 0, "todos", 200),
-    ("todos_50", "Handling Business", "Complete 50 to-dos", 0, "todos", 210),
-    ("todos_200", "Heavy Lifting", "Complete 200 to-dos", 0, "todos", 220),
+    ("todos_10", "Little Wins", "Complete 10 to-dos", 0, "todos", 200, "todos_completed", ">=", 10),
+    ("todos_50", "Handling Business", "Complete 50 to-dos", 0, "todos", 210, "todos_completed", ">=", 50),
+    ("todos_200", "Heavy Lifting", "Complete 200 to-dos", 0, "todos", 220, "todos_completed", ">=", 200),
 
     # journal
-    ("journal_first", "First Entry", "Write your first journal entry", 0, "journal", 300),
-    ("journal_30", "Archive", "Write journal entries on 30 days", 0, "journal", 320),
+    ("journal_first", "First Entry", "Write your first journal entry", 0, "journal", 300, "journal_entries", ">=", 1),
+    ("journal_30", "Archive", "Write journal entries on 30 days", 0, "journal", 320, "journal_entries", ">=", 30),
 
     # finance more unserious stuff (big transactions for now)
-    ("spendthrift", "Spendthrift", "Spend at least ¥1,000,000 in a single transaction", 1, "finance", 400),
-    ("breadwinner", "Breadwinner", "Receive at least ¥1,000,000 in a single transaction", 1, "finance", 410),
+    ("spendthrift", "Spendthrift", "Spend at least ¥1,000,000 in a single transaction", 1, "finance", 400, "largest_expense", ">=", 1000000),
+    ("breadwinner", "Breadwinner", "Receive at least ¥1,000,000 in a single transaction", 1, "finance", 410, "largest_income", ">=", 1000000),
 
 ]
 
@@ -37,10 +41,22 @@ def init_achievement_tables(connection: sqlite3.Connection) -> None:
             description TEXT NOT NULL,
             hidden_description INTEGER NOT NULL DEFAULT 0,
             category TEXT NOT NULL DEFAULT '',
-            sort_order INTEGER NOT NULL DEFAULT 0
+            sort_order INTEGER NOT NULL DEFAULT 0,
+            metric TEXT,
+            comparator TEXT NOT NULL DEFAULT '>=',
+            threshold REAL
         )
         """
     )
+
+    #databases created before rules were stored in the table
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(achievements)").fetchall()}
+    if "metric" not in columns:
+        connection.execute("ALTER TABLE achievements ADD COLUMN metric TEXT")
+    if "comparator" not in columns:
+        connection.execute("ALTER TABLE achievements ADD COLUMN comparator TEXT NOT NULL DEFAULT '>='")
+    if "threshold" not in columns:
+        connection.execute("ALTER TABLE achievements ADD COLUMN threshold REAL")
     connection.execute(
         """
         CREATE TABLE IF NOT EXISTS achievements_unlocked (
@@ -50,22 +66,31 @@ def init_achievement_tables(connection: sqlite3.Connection) -> None:
         )
         """
     )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS index_achievements_unlocked_at ON achievements_unlocked(unlocked_at)"
+    )
     connection.commit()
 
+#rule columns are refreshed from the defaults so changed thresholds reach existing databases
 def seed_default_achievements(connection: sqlite3.Connection) -> None:
     connection.executemany(
         """
-        INSERT OR IGNORE INTO achievements (id, name, description, hidden_description, category, sort_order)
-        VALUES (?, ?, ?, ?, ?, ?)
+        INSERT INTO achievements (id, name, description, hidden_description, category, sort_order, metric, comparator, threshold)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+        metric = excluded.metric,
+        comparator = excluded.comparator,
+        threshold = excluded.threshold
         """,
         DEFAULT_ACHIEVEMENTS,
     )
     connection.commit()
+    publish(AchievementsChanged())
 
 def list_achievements(connection: sqlite3.Connection) -> list[dict]:
     cur = connection.execute(
         """
-        SELECT id, name, description, hidden_description, category, sort_order
+        SELECT id, name, description, hidden_description, category, sort_order, metric, comparator, threshold
         FROM achievements
         ORDER BY sort_order ASC, id ASC
         """
@@ -76,9 +101,35 @@ def list_unlocked_ids(connection: sqlite3.Connection) -> set[str]:
     cur = connection.execute("SELECT achievement_id FROM achievements_unlocked")
     return {str(r["achievement_id"]) for r in cur.fetchall()}
 
+#(total, unlocked) without loading the rows
+def count_achievements(connection: sqlite3.Connection) -> tuple[int, int]:
+    row = connection.execute(
+        """
+        SELECT
+        (SELECT COUNT(*) FROM achievements),
+        (SELECT COUNT(*) FROM achievements_unlocked)
+        """
+    ).fetchone()
+    return int(row[0] or 0), int(row[1] or 0)
+
 def unlock(connection: sqlite3.Connection, achievement_id: str) -> None:
     connection.execute(
         "INSERT OR IGNORE INTO achievements_unlocked (achievement_id) VALUES (?)",
         (achievement_id,),
     )
     connection.commit()
+    publish(AchievementsChanged())
+
+#unlocked_at is stored by the column default, ordering by the raw column uses the index
+def list_latest_unlocked(connection: sqlite3.Connection, limit: int = 2) -> list[dict]:
+    cur = connection.execute(
+        """
+        SELECT a.id, a.name, a.description, u.unlocked_at
+        FROM achievements_unlocked u
+        JOIN achievements a ON a.id = u.achievement_id
+        ORDER BY u.unlocked_at DESC, u.rowid DESC
+        LIMIT ?
+        """,
+        (limit,),
+    )
+    return [dict(r) for r in cur.fetchall()]
@@ -1,19 +1,24 @@
 import sqlite3
 from pathlib import Path
 from db.finance import init_finance_tables
-from db.todos import init_todo_tables
+from db.todos import init_todo_tables, register_todo_functions
 from db.journal import init_journal_tables
 from db.habits import init_habit_tables
 from db.settings import init_settings_table
 from db.xp import init_xp_tables
 from db.achievements import init_achievement_tables, seed_default_achievements
+from helpers import profiling
 
 DB_PATH = Path('data') / 'planner.db'
 
 def connect_db() -> sqlite3.Connection:
     DB_PATH.parent.mkdir(exist_ok=True)
-    connection = sqlite3.connect(DB_PATH)
+    #timed connections while profiling is on, see helpers/profiling.py
+    connection = sqlite3.connect(DB_PATH, factory=profiling.connection_factory())
     connection.row_factory = sqlite3.Row
+    #WAL lets the background journal writer commit while the ui thread keeps reading
+    connection.execute('PRAGMA journal_mode=WAL')
+    register_todo_functions(connection)
     return connection
 
 
@@ -1,6 +1,8 @@
 import sqlite3
 from datetime import date as dt_date, date, datetime, timedelta
 
+from helpers.events import TransactionsChanged, RecurringRulesChanged, CurrencyRatesChanged, publish
+
 #on the transactions table: 
 #amount is stored in JPY
 #optional data if transaction was originally in other currency:
@@ -34,6 +36,7 @@ def init_finance_tables(connection: sqlite3.Connection) -> None:
     connection.execute("CREATE INDEX IF NOT EXISTS index_tx_rr ON transactions(recurring_rule_id)")
     connection.execute("CREATE INDEX IF NOT EXISTS index_tx_source ON transactions(source)")
     connection.execute("CREATE INDEX IF NOT EXISTS index_tx_category ON transactions(category)")
+    connection.execute("CREATE INDEX IF NOT EXISTS index_tx_amount ON transactions(amount)")
 
     connection.execute(
         """
@@ -128,6 +131,7 @@ def set_fx_rate_to_jpy(connection: sqlite3.Connection, currency: str, fx_rate_to
         (cur, float(fx_rate_to_jpy)),
     )
     connection.commit()
+    publish(CurrencyRatesChanged(currency=cur))
 
 
 def convert_to_jpy(
@@ -171,6 +175,7 @@ def insert_transaction(
     currency: str | None = "JPY",
     amount_original: float | None = None,
     fx_rate_to_jpy: float | None = None,
+    notify: bool = True,
 ) -> int | None:
     amt_jpy, cur, amt_orig, fx = convert_to_jpy(
         connection=connection,
@@ -202,12 +207,23 @@ def insert_transaction(
         ),
     )
     connection.commit()
+    #bulk callers publish one event for the whole batch
+    if cur2.rowcount and notify:
+        publish(TransactionsChanged(start=tx_date, end=tx_date))
     return cur2.lastrowid if cur2.rowcount else None
 
 
+#date of a transaction for the change events
+def _transaction_day(connection: sqlite3.Connection, tx_id: int) -> str | None:
+    row = connection.execute("SELECT tx_date FROM transactions WHERE id = ?", (int(tx_id),)).fetchone()
+    return row[0] if row else None
+
+
 def delete_transaction(connection: sqlite3.Connection, tx_id: int) -> None:
+    day = _transaction_day(connection, tx_id)
     connection.execute("DELETE FROM transactions WHERE id = ?", (int(tx_id),))
     connection.commit()
+    publish(TransactionsChanged(start=day, end=day))
 
 
 def update_transaction(
@@ -230,6 +246,7 @@ def update_transaction(
         fallback_amount_jpy=amount,
     )
 
+    old_day = _transaction_day(connection, tx_id)
     connection.execute(
         """
         UPDATE transactions
@@ -246,12 +263,16 @@ def update_transaction(
         (tx_date, amt_jpy, cur, amt_orig, fx, category, name, description, int(tx_id)),
     )
     connection.commit()
+    days = [d for d in (old_day, tx_date) if d]
+    publish(TransactionsChanged(start=min(days, default=None), end=max(days, default=None)))
 
 
 # deprecated
 def update_transaction_category(connection: sqlite3.Connection, tx_id: int, category: str) -> None:
+    day = _transaction_day(connection, tx_id)
     connection.execute("UPDATE transactions SET category = ? WHERE id = ?", (category, int(tx_id)))
     connection.commit()
+    publish(TransactionsChanged(start=day, end=day))
 
 
 def get_transaction_by_id(connection: sqlite3.Connection, tx_id: int) -> dict | None:
@@ -342,6 +363,7 @@ def get_all_transactions(connection: sqlite3.Connection):
 
 def import_transactions(connection: sqlite3.Connection, transactions: list[dict]) -> dict[str, int]:
     stats = {"imported": 0, "duplicates": 0, "failed": 0}
+    imported_days: list[str] = []
 
     for tx in transactions:
         try:
@@ -358,6 +380,7 @@ def import_transactions(connection: sqlite3.Connection, transactions: list[dict]
                 currency=tx.get("currency", "JPY"),
                 amount_original=tx.get("amount_original"),
                 fx_rate_to_jpy=tx.get("fx_rate_to_jpy"),
+                notify=False,
             )
         except Exception:
             stats["failed"] += 1
@@ -367,7 +390,10 @@ def import_transactions(connection: sqlite3.Connection, transactions: list[dict]
             stats["duplicates"] += 1
         else:
             stats["imported"] += 1
+            imported_days.append(tx["tx_date"])
 
+    if imported_days:
+        publish(TransactionsChanged(start=min(imported_days), end=max(imported_days)))
     return stats
 
 #for finance analytics stuff 
@@ -433,7 +459,8 @@ def list_recent_transactions(connection: sqlite3.Connection, limit: int = 10) ->
         recurring_rule_id,
         currency,
         amount_original,
-        fx_rate_to_jpy
+        fx_rate_to_jpy,
+        created_at
         FROM transactions
         ORDER BY tx_date DESC, id DESC
         LIMIT ?
@@ -514,6 +541,7 @@ def create_recurring_rule(
         ),
     )
     connection.commit()
+    publish(RecurringRulesChanged(rule_id=int(cur2.lastrowid)))
     return int(cur2.lastrowid)
 
 
@@ -530,6 +558,7 @@ def stop_recurring_rule(connection: sqlite3.Connection, rule_id: int, end_date:
         (end_date, int(rule_id)),
     )
     connection.commit()
+    publish(RecurringRulesChanged(rule_id=int(rule_id)))
 
 
 def list_recurring_rules(connection: sqlite3.Connection, active_only: bool = False) -> list[dict]:
@@ -627,6 +656,7 @@ def update_recurring_rule(
         ),
     )
     connection.commit()
+    publish(RecurringRulesChanged(rule_id=int(rule_id)))
 
 
 def parse_iso_date(value: str) -> date:
@@ -660,6 +690,7 @@ def sync_recurring_transactions(
 
     inserted = 0
     duplicates = 0
+    inserted_days: list[str] = []
 
     with connection:
         for r in rules:
@@ -703,11 +734,14 @@ def sync_recurring_transactions(
 
                 if cur2.rowcount == 1:
                     inserted += 1
+                    inserted_days.append(tx_dt.isoformat())
                 else:
                     duplicates += 1
 
                 m = add_months(m, 1)
 
+    if inserted_days:
+        publish(TransactionsChanged(start=min(inserted_days), end=max(inserted_days)))
     return {"inserted": inserted, "duplicates": duplicates}
 
 
@@ -744,6 +778,19 @@ def has_breadwinner_transaction(connection: sqlite3.Connection, threshold_jpy: i
     return cur.fetchone() is not None
 
 
+#one subquery per aggregate: sqlite only answers a lone MIN or MAX with a single seek into
+#index_tx_amount, both in one SELECT scan the whole index
+def get_transaction_extremes(connection: sqlite3.Connection) -> tuple[float, float]:
+    row = connection.execute(
+        """
+        SELECT
+        (SELECT MIN(amount) FROM transactions),
+        (SELECT MAX(amount) FROM transactions)
+        """
+    ).fetchone()
+    return float(row[0] or 0), float(row[1] or 0)
+
+
 def last_day_of_month(value: date) -> date:
     if value.month == 12:
         return date(value.year, 12, 31)
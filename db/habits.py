@@ -1,7 +1,150 @@
+import threading
+from bisect import bisect_right
 from datetime import date as dt_date, timedelta
-from helpers.dates import month_range
 import sqlite3
 
+from helpers.events import HabitsChanged, HabitLogChanged, ExternalChange, subscribe, publish
+
+
+#year heatmap data, keyed by (year, habit_id or None for all daily habits)
+#a log write drops only its own year, a habit definition change drops every year
+_year_stats_cache: dict[tuple[int, int | None], tuple[int, dict[str, int]]] = {}
+
+
+#runs of consecutive done days (daily) or target-reaching weeks (weekly) for every habit
+#keyed by habit id, each entry is dropped on changes to that habit only
+_streak_cache: dict[int, dict] = {}
+
+#bumped on every invalidation; loads run on worker threads, and a result read before a write
+#committed must not be stored after that write invalidated the cache
+#the lock covers reading the caches, the generation check and the store, the query itself runs outside it
+_cache_generation = 0
+_cache_lock = threading.Lock()
+
+
+def invalidate_streak_cache(habit_id: int | None = None) -> None:
+    global _cache_generation
+    with _cache_lock:
+        _cache_generation += 1
+        if habit_id is None:
+            _streak_cache.clear()
+        else:
+            _streak_cache.pop(int(habit_id), None)
+
+
+def invalidate_habit_stats_cache(year: int | None = None) -> None:
+    global _cache_generation
+    with _cache_lock:
+        _cache_generation += 1
+        if year is None:
+            _year_stats_cache.clear()
+            return
+        for key in [key for key in _year_stats_cache if key[0] == year]:
+            del _year_stats_cache[key]
+
+
+#the caches listen on the change bus instead of being cleared by each write helper
+def _on_habits_changed(event: HabitsChanged) -> None:
+    invalidate_habit_stats_cache()
+    invalidate_streak_cache(event.habit_id)
+
+
+def _on_habit_log_changed(event: HabitLogChanged) -> None:
+    invalidate_habit_stats_cache(dt_date.fromisoformat(event.day).year)
+    if not update_streak_cache(event):
+        invalidate_streak_cache(event.habit_id)
+
+
+#applies one log write to the cached runs of its habit without reading habit_log again
+#returns False when the event doesn't carry the state this habit's runs need (then drop the entry)
+def update_streak_cache(event: HabitLogChanged) -> bool:
+    global _cache_generation
+    with _cache_lock:
+        #a history being built right now may have read the log before the write
+        _cache_generation += 1
+
+        entry = _streak_cache.get(int(event.habit_id))
+        if entry is None:
+            return True
+
+        day_date = dt_date.fromisoformat(event.day)
+        start_date = entry.get('start_date')
+        if entry['frequency'] == 'weekly':
+            done = event.week_done
+            period = day_date - timedelta(days=day_date.weekday())
+            step = timedelta(days=7)
+            ignored = start_date and (period + timedelta(days=6)).isoformat() < start_date
+        else:
+            done = event.day_done
+            period = day_date
+            step = timedelta(days=1)
+            ignored = start_date and event.day < start_date
+
+        if done is None:
+            return False
+        if ignored:
+            return True
+
+        runs = runs_with_period(entry['runs'], period, step, done)
+        _streak_cache[int(event.habit_id)] = {
+            **entry,
+            'runs': runs,
+            'best': max((r['length'] for r in runs), default=0),
+        }
+        return True
+
+
+#copy of runs with period added (present) or cut out, merging or splitting the neighbouring runs
+#run dicts are never changed in place, readers on other threads may still hold the old list
+def runs_with_period(runs: list[dict], period: dt_date, step: timedelta, present: bool) -> list[dict]:
+    iso = period.isoformat()
+    runs = list(runs)
+    index = bisect_right([r['start'] for r in runs], iso) - 1
+    inside = index >= 0 and runs[index]['end'] >= iso
+
+    def make_run(start: dt_date, end: dt_date) -> dict:
+        return {'start': start.isoformat(), 'end': end.isoformat(), 'length': (end - start).days // step.days + 1}
+
+    if present:
+        if inside:
+            return runs
+
+        before = runs[index] if index >= 0 and dt_date.fromisoformat(runs[index]['end']) + step == period else None
+        after_index = index + 1
+        after = None
+        if after_index < len(runs) and dt_date.fromisoformat(runs[after_index]['start']) - step == period:
+            after = runs[after_index]
+
+        start = dt_date.fromisoformat(before['start']) if before else period
+        end = dt_date.fromisoformat(after['end']) if after else period
+        first = index if before else after_index
+        last = after_index + 1 if after else after_index
+        runs[first:last] = [make_run(start, end)]
+        return runs
+
+    if not inside:
+        return runs
+
+    run = runs[index]
+    parts = []
+    if run['start'] < iso:
+        parts.append(make_run(dt_date.fromisoformat(run['start']), period - step))
+    if run['end'] > iso:
+        parts.append(make_run(period + step, dt_date.fromisoformat(run['end'])))
+    runs[index:index + 1] = parts
+    return runs
+
+
+#another process wrote, nothing tells which habits
+def _on_external_change(event: ExternalChange) -> None:
+    invalidate_habit_stats_cache()
+    invalidate_streak_cache()
+
+
+subscribe(HabitsChanged, _on_habits_changed)
+subscribe(HabitLogChanged, _on_habit_log_changed)
+subscribe(ExternalChange, _on_external_change)
+
 
 #frequency is supposed to be 'daily' or 'weekly'
 #weekly_target only for weekly (e.g. 3 workouts)
@@ -59,8 +202,41 @@ def list_active_habits(connection: sqlite3.Connection) -> list[dict]:
     return habits
 
 
+#active habits with their count on day and their total for day's week in one pass over habit_log
+#done_today matches is_daily_done, week_count/weekly_target match get_weekly_progress
+def list_active_habit_progress(connection: sqlite3.Connection, day: str) -> list[dict]:
+    day_date = dt_date.fromisoformat(day)
+    week_start = day_date - timedelta(days=day_date.weekday())
+    week_end = week_start + timedelta(days=6)
+
+    cursor = connection.execute(
+        '''
+        SELECT h.id, h.title, h.emoji, h.frequency, h.weekly_target, h.start_date,
+        COALESCE(MAX(CASE WHEN hl.date = ? THEN hl.count END), 0) AS today_count,
+        COALESCE(SUM(hl.count), 0) AS week_count
+        FROM habits h
+        LEFT JOIN habit_log hl
+        ON hl.habit_id = h.id
+        AND hl.date >= ?
+        AND hl.date <= ?
+        WHERE h.active = 1
+        GROUP BY h.id
+        ORDER BY h.id
+        ''',
+        (day, week_start.isoformat(), week_end.isoformat()),
+    )
+
+    habits = []
+    for row in cursor.fetchall():
+        habit = dict(row)
+        habit['done_today'] = int(habit['today_count'] or 0) >= 1
+        habits.append(habit)
+    return habits
+
+
 #intended for daily habit use, maybe restrict to that 
-def set_daily_done(connection: sqlite3.Connection, habit_id: int, day: str, done: bool) -> None:
+#commit=False leaves the commit to the caller, see actions.actions.toggle_daily_habit
+def set_daily_done(connection: sqlite3.Connection, habit_id: int, day: str, done: bool, commit: bool = True) -> None:
     cursor = connection.cursor()
 
     if done:
@@ -80,11 +256,14 @@ def set_daily_done(connection: sqlite3.Connection, habit_id: int, day: str, done
             (habit_id, day),
         )
 
-    connection.commit()
+    if commit:
+        connection.commit()
+    publish(HabitLogChanged(habit_id=int(habit_id), day=day, day_done=done))
 
 
 #intended for weekly habit
-def increment_habit_today(connection, habit_id: int, day: str):
+#returns the week's total after the increment and the weekly target, like get_weekly_progress
+def increment_habit_today(connection, habit_id: int, day: str, commit: bool = True) -> tuple[int, int]:
     cursor = connection.cursor()
 
     cursor.execute(
@@ -97,7 +276,34 @@ def increment_habit_today(connection, habit_id: int, day: str):
         (habit_id, day),
     )
 
-    connection.commit()
+    day_date = dt_date.fromisoformat(day)
+    week_start = day_date - timedelta(days=day_date.weekday())
+    cursor.execute(
+        '''
+        SELECT COALESCE(SUM(hl.count), 0), h.weekly_target
+        FROM habits h
+        LEFT JOIN habit_log hl
+        ON hl.habit_id = h.id
+        AND hl.date >= ?
+        AND hl.date <= ?
+        WHERE h.id = ?
+        GROUP BY h.id
+        ''',
+        (week_start.isoformat(), (week_start + timedelta(days=6)).isoformat(), habit_id),
+    )
+    row = cursor.fetchone()
+    done = int(row[0] or 0) if row else 0
+    target = int(row[1] or 0) if row else 0
+
+    if commit:
+        connection.commit()
+    publish(HabitLogChanged(
+        habit_id=int(habit_id),
+        day=day,
+        day_done=True,
+        week_done=bool(target) and done >= target,
+    ))
+    return done, target
 
 
 #fetch if a certain habit is completed
@@ -191,7 +397,7 @@ def decrement_habit_today(connection: sqlite3.Connection, habit_id: int, day: st
         )
 
     connection.commit()
-
+    publish(HabitLogChanged(habit_id=int(habit_id), day=day))
 
 
 #wrapper, maybe useful, might remove if not used later on
@@ -203,120 +409,176 @@ def is_weekly_done(connection: sqlite3.Connection, habit_id: int, day: str) -> b
     return done >= target
 
 
-
-#daily streak calculation 
+#streaks are derived from cached runs, see get_streak_history below
 def get_daily_streak(connection: sqlite3.Connection, habit_id: int, as_of_day: str) -> int:
-    cursor = connection.cursor()
-
-    cursor.execute(
-        '''
-        SELECT start_date
-        FROM habits
-        WHERE id = ?
-        ''',
-        (habit_id,),
-    )
-    row = cursor.fetchone()
-    start_date = row[0]
-
-    current = dt_date.fromisoformat(as_of_day)
-    streak = 0
-
-    while True:
-        day_iso = current.isoformat()
-
-        if start_date and day_iso < start_date:
-            break
-
-        cursor.execute(
-            '''
-            SELECT count
-            FROM habit_log
-            WHERE habit_id = ? AND date = ?
-            ''',
-            (habit_id, day_iso),
-        )
-
-        row = cursor.fetchone()
-        if not row or row[0] < 1:
-            break
+    history = get_streak_history(connection, [habit_id]).get(int(habit_id))
+    if not history or history['frequency'] == 'weekly':
+        return 0
+    return current_streak_from_runs(history['runs'], 'daily', as_of_day)
 
-        streak += 1
-        current -= timedelta(days=1)
 
-    return streak
+def get_weekly_streak(connection: sqlite3.Connection, habit_id: int, as_of_day: str) -> int:
+    history = get_streak_history(connection, [habit_id]).get(int(habit_id))
+    if not history or history['frequency'] != 'weekly':
+        return 0
+    return current_streak_from_runs(history['runs'], 'weekly', as_of_day)
 
 
-def get_weekly_streak(connection: sqlite3.Connection, habit_id: int, as_of_day: str) -> int:
-    cursor = connection.cursor()
+def current_streak_from_runs(runs: list[dict], frequency: str, as_of_day: str) -> int:
+    current = dt_date.fromisoformat(as_of_day)
+    if frequency == 'weekly':
+        current -= timedelta(days=current.weekday())  #monday
 
-    cursor.execute(
-        '''
-        SELECT weekly_target, start_date
-        FROM habits
-        WHERE id = ?
-        ''',
-        (habit_id,),
-    )
-    row = cursor.fetchone()
-    if not row:
+    #runs are sorted and disjoint, so the newest run starting on/before as_of is the only candidate
+    index = bisect_right([r['start'] for r in runs], current.isoformat()) - 1
+    if index < 0:
         return 0
 
-    target = int(row[0] or 0)
-    start_date = row[1]
-    if target <= 0:
+    run = runs[index]
+    if run['end'] < current.isoformat():
         return 0
 
-    current = dt_date.fromisoformat(as_of_day)
-    streak = 0
+    days = (current - dt_date.fromisoformat(run['start'])).days
+    return days // 7 + 1 if frequency == 'weekly' else days + 1
 
-    while True:
-        week_start = current - timedelta(days=current.weekday())  #monday
-        week_end = week_start + timedelta(days=6)
 
-        if start_date and week_end.isoformat() < start_date:
-            break
+def get_streak_history(connection: sqlite3.Connection, habit_ids: list[int] | None = None) -> dict[int, dict]:
+    if habit_ids is None:
+        cursor = connection.execute('SELECT id FROM habits')
+        habit_ids = [int(row[0]) for row in cursor.fetchall()]
 
-        cursor.execute(
-            '''
-            SELECT SUM(count)
-            FROM habit_log
-            WHERE habit_id = ?
-              AND date >= ?
-              AND date <= ?
-            ''',
-            (habit_id, week_start.isoformat(), week_end.isoformat()),
-        )
-        done = int(cursor.fetchone()[0] or 0)
+    wanted = [int(hid) for hid in habit_ids]
+    with _cache_lock:
+        found = {hid: _streak_cache[hid] for hid in wanted if hid in _streak_cache}
+        generation = _cache_generation
 
-        if done < target:
-            break
+    missing = [hid for hid in wanted if hid not in found]
+    if missing:
+        built = build_streak_history(connection, missing)
+        with _cache_lock:
+            if generation == _cache_generation:
+                _streak_cache.update(built)
+        found.update(built)
 
-        streak += 1
-        current = week_start - timedelta(days=1)  #go to previous week
+    return {hid: found[hid] for hid in wanted if hid in found}
 
-    return streak
 
+#one pass over habit_log ordered by (habit_id, date) for all requested habits at once
+def build_streak_history(connection: sqlite3.Connection, habit_ids: list[int]) -> dict[int, dict]:
+    placeholders = ', '.join('?' for _ in habit_ids)
+    cursor = connection.execute(
+        f'''
+        SELECT h.id, h.frequency, h.weekly_target, h.start_date, hl.date, hl.count
+        FROM habits h
+        LEFT JOIN habit_log hl ON hl.habit_id = h.id
+        WHERE h.id IN ({placeholders})
+        ORDER BY h.id, hl.date
+        ''',
+        habit_ids,
+    )
 
-def get_daily_habit_stats_for_month(connection: sqlite3.Connection, year: int, month: int) -> tuple[int, dict[str, int]]:
-    start_date, end_date = month_range(year, month)
-
-    cursor = connection.cursor()
+    history: dict[int, dict] = {}
+    builder = None
+
+    for habit_id, frequency, weekly_target, start_date, day, count in cursor.fetchall():
+        habit_id = int(habit_id)
+        if builder is None or builder.habit_id != habit_id:
+            if builder is not None:
+                history[builder.habit_id] = builder.finish()
+            builder = _RunBuilder(habit_id, frequency, int(weekly_target or 0), start_date)
+
+        if day is not None:
+            builder.add(day, int(count or 0))
+
+    if builder is not None:
+        history[builder.habit_id] = builder.finish()
+
+    return history
+
+
+class _RunBuilder:
+    def __init__(self, habit_id: int, frequency: str, weekly_target: int, start_date: str | None):
+        self.habit_id = habit_id
+        self.frequency = frequency
+        self.weekly_target = weekly_target
+        self.start_date = start_date
+
+        self.runs: list[dict] = []
+        self.week_start: dt_date | None = None
+        self.week_done = 0
+
+    def add(self, day: str, count: int) -> None:
+        day_date = dt_date.fromisoformat(day)
+
+        if self.frequency != 'weekly':
+            if count < 1 or (self.start_date and day < self.start_date):
+                return
+            self.extend(day_date, timedelta(days=1))
+            return
+
+        week_start = day_date - timedelta(days=day_date.weekday())
+        if self.start_date and (week_start + timedelta(days=6)).isoformat() < self.start_date:
+            return
+
+        if week_start != self.week_start:
+            self.close_week()
+            self.week_start = week_start
+            self.week_done = 0
+        self.week_done += count
+
+    def close_week(self) -> None:
+        if self.week_start is not None and self.weekly_target > 0 and self.week_done >= self.weekly_target:
+            self.extend(self.week_start, timedelta(days=7))
+
+    #period is either a day or a monday, step the distance between consecutive periods
+    def extend(self, period: dt_date, step: timedelta) -> None:
+        last = self.runs[-1] if self.runs else None
+        if last and dt_date.fromisoformat(last['end']) + step == period:
+            last['end'] = period.isoformat()
+            last['length'] += 1
+        else:
+            self.runs.append({'start': period.isoformat(), 'end': period.isoformat(), 'length': 1})
+
+    def finish(self) -> dict:
+        if self.frequency == 'weekly':
+            self.close_week()
+
+        return {
+            'frequency': self.frequency,
+            'start_date': self.start_date,
+            'runs': self.runs,
+            'best': max((r['length'] for r in self.runs), default=0),
+        }
+
+
+#same shape as the month stats but for any range and optionally one habit
+def get_daily_habit_stats_for_range(
+    connection: sqlite3.Connection,
+    start_date: str,
+    end_date: str,
+    habit_id: int | None = None,
+) -> tuple[int, dict[str, int]]:
+    habit_filter = ''
+    params: list = []
+    if habit_id is not None:
+        habit_filter = 'AND h.id = ?'
+        params.append(int(habit_id))
 
-    cursor.execute(
-        '''
+    cursor = connection.execute(
+        f'''
         SELECT COUNT(*)
-        FROM habits
-        WHERE active = 1 AND frequency = 'daily'
-        '''
+        FROM habits h
+        WHERE h.active = 1 AND h.frequency = 'daily' {habit_filter}
+        ''',
+        params,
     )
     total_daily = int(cursor.fetchone()[0] or 0)
 
     if total_daily == 0:
         return 0, {}
 
-    cursor.execute(
-        '''
+    cursor = connection.execute(
+        f'''
         SELECT hl.date, COUNT(*) AS done_count
         FROM habit_log hl
         JOIN habits h ON h.id = hl.habit_id
@@ -325,19 +587,40 @@ def get_daily_habit_stats_for_month(connection: sqlite3.Connection, year: int, m
         AND hl.count >= 1
         AND hl.date >= ?
         AND hl.date < ?
+        {habit_filter}
         GROUP BY hl.date
         ''',
-        (start_date.isoformat(), end_date.isoformat()),
+        (start_date, end_date, *params),
     )
 
-    done_by_day: dict[str, int] = {}
-    for row in cursor.fetchall():
-        day = row[0]
-        done_count = int(row[1] or 0)
-        done_by_day[str(day)] = done_count
-
+    done_by_day = {str(row[0]): int(row[1] or 0) for row in cursor.fetchall()}
     return total_daily, done_by_day
 
+
+def get_daily_habit_stats_for_year(
+    connection: sqlite3.Connection,
+    year: int,
+    habit_id: int | None = None,
+) -> tuple[int, dict[str, int]]:
+    key = (int(year), habit_id)
+    with _cache_lock:
+        cached = _year_stats_cache.get(key)
+        generation = _cache_generation
+    if cached is not None:
+        return cached
+
+    stats = get_daily_habit_stats_for_range(
+        connection,
+        dt_date(year, 1, 1).isoformat(),
+        dt_date(year + 1, 1, 1).isoformat(),
+        habit_id,
+    )
+    with _cache_lock:
+        if generation == _cache_generation:
+            _year_stats_cache[key] = stats
+    return stats
+
+
 def insert_habit(
     connection: sqlite3.Connection,
     title: str,
@@ -362,6 +645,7 @@ def insert_habit(
         ),
     )
     connection.commit()
+    publish(HabitsChanged(habit_id=int(cursor.lastrowid)))
     return int(cursor.lastrowid)
 
 
@@ -390,6 +674,7 @@ def set_habit_active(
         (1 if active else 0, habit_id),
     )
     connection.commit()
+    publish(HabitsChanged(habit_id=int(habit_id)))
 
 
 def delete_habit(connection: sqlite3.Connection, habit_id: int) -> None:
@@ -402,6 +687,7 @@ def delete_habit(connection: sqlite3.Connection, habit_id: int) -> None:
         (habit_id,),
     )
     connection.commit()
+    publish(HabitsChanged(habit_id=int(habit_id)))
     
 
 def update_habit(
@@ -429,6 +715,7 @@ def update_habit(
         ),
     )
     connection.commit()
+    publish(HabitsChanged(habit_id=int(habit_id)))
     
     
 def get_habit_title(connection: sqlite3.Connection, habit_id: int) -> str:
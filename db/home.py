@@ -0,0 +1,128 @@
+import sqlite3
+import time
+from dataclasses import dataclass, field
+
+from db.todos import get_todo_counts_for_day, list_next_open_todos
+from db.journal import get_journal_text_written
+from db.habits import list_active_habit_progress, get_streak_history, current_streak_from_runs
+from db.finance import get_mtd_summary, list_recent_transactions
+from db.xp import get_total_xp, level_for_total_xp, list_recent_xp_events
+from db.achievements import count_achievements, list_latest_unlocked
+
+
+NEXT_ITEMS = 4
+RECENT_ITEMS = 10
+
+
+#everything the home tab shows, loaded with a fixed number of queries
+#(todo counts, next todos, journal flag, habit progress, streak runs (cached), month summary,
+#xp ledger, recent xp, recent transactions, achievement counts, latest unlocks)
+@dataclass
+class HomeSnapshot:
+    day: str
+
+    todos_done: int = 0
+    todos_total: int = 0
+    next_todos: list[dict] = field(default_factory=list)
+
+    #notes text only, the other journal fields do not count here (the day view counts them)
+    journal_written: bool = False
+
+    daily_total: int = 0
+    daily_done: int = 0
+    weekly_total: int = 0
+    weekly_done: int = 0
+    best_daily_streak: int = 0
+    best_weekly_streak: int = 0
+    #open habits, weekly ones with their progress
+    next_habits: list[dict] = field(default_factory=list)
+
+    income: float = 0.0
+    expenses: float = 0.0
+    net: float = 0.0
+
+    total_xp: int = 0
+    level: int = 1
+    level_into: int = 0
+    level_step: int = 1
+
+    recent_xp: list[dict] = field(default_factory=list)
+    recent_transactions: list[dict] = field(default_factory=list)
+
+    achievements_total: int = 0
+    achievements_unlocked: int = 0
+    latest_unlocked: list[dict] = field(default_factory=list)
+
+    #section -> milliseconds
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+class _Timer:
+    def __init__(self, timings: dict[str, float]):
+        self.timings = timings
+        self.last = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self.timings[name] = round((now - self.last) * 1000, 3)
+        self.last = now
+
+
+def home_snapshot(connection: sqlite3.Connection, day: str) -> HomeSnapshot:
+    snapshot = HomeSnapshot(day=day)
+    started = time.perf_counter()
+    timer = _Timer(snapshot.timings)
+
+    snapshot.todos_done, snapshot.todos_total = get_todo_counts_for_day(connection, day)
+    snapshot.next_todos = list_next_open_todos(connection, day, NEXT_ITEMS)
+    timer.lap('todos')
+
+    snapshot.journal_written = get_journal_text_written(connection, day)
+    timer.lap('journal')
+
+    habits = list_active_habit_progress(connection, day)
+    history = get_streak_history(connection, [int(h['id']) for h in habits])
+
+    for h in habits:
+        runs = history.get(int(h['id']), {}).get('runs', [])
+        streak = current_streak_from_runs(runs, h['frequency'], day)
+
+        if h['frequency'] == 'weekly':
+            target = int(h['weekly_target'] or 0)
+            done = int(h['week_count'] or 0)
+            snapshot.weekly_total += 1
+            if target and done >= target:
+                snapshot.weekly_done += 1
+            elif target:
+                snapshot.next_habits.append({**h, 'done': done, 'target': target})
+            snapshot.best_weekly_streak = max(snapshot.best_weekly_streak, streak)
+        elif h['frequency'] == 'daily':
+            snapshot.daily_total += 1
+            if h['done_today']:
+                snapshot.daily_done += 1
+            else:
+                snapshot.next_habits.append(h)
+            snapshot.best_daily_streak = max(snapshot.best_daily_streak, streak)
+
+    #daily ones first, like the old list
+    snapshot.next_habits.sort(key=lambda h: h['frequency'] != 'daily')
+    timer.lap('habits')
+
+    summary = get_mtd_summary(connection, day)
+    snapshot.income = summary['income']
+    snapshot.expenses = summary['expenses']
+    snapshot.net = summary['net']
+    snapshot.recent_transactions = list_recent_transactions(connection, limit=RECENT_ITEMS)
+    timer.lap('finance')
+
+    snapshot.total_xp = get_total_xp(connection)
+    snapshot.level, snapshot.level_into, snapshot.level_step = level_for_total_xp(snapshot.total_xp)
+    snapshot.recent_xp = list_recent_xp_events(connection, limit=RECENT_ITEMS)
+    timer.lap('xp')
+
+    snapshot.achievements_total, snapshot.achievements_unlocked = count_achievements(connection)
+    snapshot.latest_unlocked = list_latest_unlocked(connection, limit=2)
+    timer.lap('achievements')
+
+    snapshot.timings['total'] = round((time.perf_counter() - started) * 1000, 3)
+    return snapshot
@@ -1,5 +1,95 @@
+import re
 import sqlite3
-from helpers.dates import month_range
+import threading
+import unicodedata
+import zlib
+from helpers.events import JournalChanged, SettingChanged, ExternalChange, publish, subscribe
+
+
+#free text columns that may be stored zlib compressed, the bit is set in journal.compressed
+TEXT_COLUMN_BITS = {'text': 1, 'went_well': 2, 'difficult': 4, 'remember': 8}
+
+#below this many utf-8 bytes compression does not pay for itself
+COMPRESS_MIN_BYTES = 512
+COMPRESSION_SETTING = 'journal_compression'
+
+
+#the setting is read once per database instead of on every autosave, set_setting publishes SettingChanged
+#and writes of other processes come in as ExternalChange, both drop the cached values
+#in memory databases are not cached, every connection to ':memory:' is its own database
+_compression_cache: dict[str, bool] = {}
+_compression_lock = threading.Lock()
+_compression_generation = 0
+
+
+def _drop_compression_cache(event) -> None:
+    global _compression_generation
+    if isinstance(event, SettingChanged) and event.key != COMPRESSION_SETTING:
+        return
+    with _compression_lock:
+        _compression_cache.clear()
+        _compression_generation += 1
+
+
+subscribe(SettingChanged, _drop_compression_cache)
+subscribe(ExternalChange, _drop_compression_cache)
+
+
+def _database_path(connection: sqlite3.Connection) -> str:
+    return connection.execute("PRAGMA database_list").fetchone()[2]
+
+
+def compression_enabled(connection: sqlite3.Connection) -> bool:
+    path = _database_path(connection)
+    with _compression_lock:
+        if path in _compression_cache:
+            return _compression_cache[path]
+        generation = _compression_generation
+
+    row = connection.execute(
+        "SELECT value FROM settings WHERE key = ?",
+        (COMPRESSION_SETTING,),
+    ).fetchone()
+    enabled = bool(row) and row[0] == '1'
+
+    with _compression_lock:
+        if path and generation == _compression_generation:
+            _compression_cache[path] = enabled
+    return enabled
+
+
+#str -> (stored value, compressed flag); short or blank values and ones that don't shrink stay text
+def encode_journal_text(value: str, compress: bool) -> tuple[str | bytes, bool]:
+    value = value or ''
+    if not compress or not value.strip():
+        return value, False
+
+    raw = value.encode('utf-8')
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return value, False
+
+    packed = zlib.compress(raw, 6)
+    if len(packed) >= len(raw):
+        return value, False
+    return packed, True
+
+
+def decode_journal_text(value, compressed: bool) -> str:
+    if value is None:
+        return ''
+    if compressed and isinstance(value, bytes):
+        return zlib.decompress(value).decode('utf-8')
+    return value
+
+
+#row with the raw column values + compressed flags -> same dict with plain text
+def _decode_row(row: sqlite3.Row) -> dict:
+    data = dict(row)
+    flags = int(data.pop('compressed', 0) or 0)
+    for name, bit in TEXT_COLUMN_BITS.items():
+        if name in data:
+            data[name] = decode_journal_text(data[name], bool(flags & bit))
+    return data
 
 
 def init_journal_tables(connection: sqlite3.Connection) -> None:
@@ -17,8 +107,141 @@ def init_journal_tables(connection: sqlite3.Connection) -> None:
             remember TEXT NOT NULL DEFAULT ''
         )
     """)
+
+    #generated flag so status queries don't have to ship the text columns around
+    #table_xinfo because table_info hides generated columns
+    columns = {row[1] for row in connection.execute("PRAGMA table_xinfo(journal)").fetchall()}
+    if 'compressed' not in columns:
+        connection.execute("ALTER TABLE journal ADD COLUMN compressed INTEGER NOT NULL DEFAULT 0")
+    if 'has_content' not in columns:
+        connection.execute(f"""
+            ALTER TABLE journal ADD COLUMN has_content INTEGER
+            GENERATED ALWAYS AS ({HAS_CONTENT_SQL}) VIRTUAL
+        """)
+    connection.execute("""
+        CREATE INDEX IF NOT EXISTS index_journal_status
+        ON journal(date, has_content, mood)
+    """)
+
+    init_journal_search(connection)
     connection.commit()
 
+
+#any of the text columns non blank, mood/sleep do not count
+#trims newlines and tabs too so it matches str.strip() for the usual whitespace
+#(compressed values are never blank, only non blank text gets compressed)
+_BLANK = "char(32, 9, 10, 13)"
+HAS_CONTENT_SQL = " OR ".join(
+    f"trim({name}, {_BLANK}) <> ''" for name in ('text', 'went_well', 'difficult', 'remember')
+)
+
+
+#full text index over the free text columns, contentless so it holds no second copy of the text
+#the fts rowid is the date as an integer (2024-01-31 -> 20240131), stable unlike journal's implicit rowid
+#contentless rows are removed with their indexed values: the triggers (plain sql, no app functions)
+#index rows stored as plain text, index_compressed_row the ones with compressed columns, which sql can't read
+#(a compressed row written from outside the app goes stale until rebuild_journal_search)
+JOURNAL_FTS_KEY = "CAST(replace({}.date, '-', '') AS INTEGER)"
+_FTS_COLUMNS = ', '.join(TEXT_COLUMN_BITS)
+
+
+def _fts_key(date: str) -> int:
+    return int(date.replace('-', ''))
+
+
+def _fts_date(key: int) -> str:
+    return f"{key // 10000:04d}-{key // 100 % 100:02d}-{key % 100:02d}"
+
+
+def _fts_write(connection: sqlite3.Connection, date: str, plain: dict, delete: bool = False) -> None:
+    command = "'delete', " if delete else ''
+    connection.execute(
+        f"""
+        INSERT INTO journal_fts ({'journal_fts, ' if delete else ''}rowid, {_FTS_COLUMNS})
+        VALUES ({command}?, {', '.join('?' for _ in TEXT_COLUMN_BITS)})
+        """,
+        (_fts_key(date), *(plain.get(name) or '' for name in TEXT_COLUMN_BITS)),
+    )
+
+
+#the python half of the index upkeep, for rows with compressed columns: unindex with the text before
+#the write (before it, a plain row written after would be removed too), index with the text after it
+def unindex_compressed_row(connection: sqlite3.Connection, date: str, plain: dict, flags: int) -> None:
+    if flags:
+        _fts_write(connection, date, plain, delete=True)
+
+
+def index_compressed_row(connection: sqlite3.Connection, date: str, plain: dict, flags: int) -> None:
+    if flags:
+        _fts_write(connection, date, plain)
+
+
+#refills the index from journal, decoding compressed columns in python
+def rebuild_journal_search(connection: sqlite3.Connection) -> None:
+    connection.execute("INSERT INTO journal_fts (journal_fts) VALUES ('delete-all')")
+    rows = connection.execute(f"SELECT date, {_FTS_COLUMNS}, compressed FROM journal").fetchall()
+    for data in map(_decode_row, rows):
+        _fts_write(connection, data['date'], data)
+
+
+def init_journal_search(connection: sqlite3.Connection) -> None:
+    row = connection.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'journal_fts'"
+    ).fetchone()
+    #older versions kept the text in the index or read it through a view needing an app function
+    if row and "content=''" not in row[0].replace(' ', ''):
+        connection.execute("DROP TABLE journal_fts")
+        row = None
+    connection.execute("DROP VIEW IF EXISTS journal_fts_source")
+    connection.execute("DROP INDEX IF EXISTS index_journal_fts_key")
+
+    connection.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS journal_fts USING fts5(
+            {_FTS_COLUMNS},
+            content = ''
+        )
+    """)
+
+    new_key = JOURNAL_FTS_KEY.format('new')
+    old_key = JOURNAL_FTS_KEY.format('old')
+
+    #recreated on every start so older trigger bodies get replaced
+    for name in ('journal_fts_insert', 'journal_fts_update', 'journal_fts_delete'):
+        connection.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+    delete_old = f"""
+            INSERT INTO journal_fts (journal_fts, rowid, {_FTS_COLUMNS})
+            SELECT 'delete', {old_key}, {', '.join(f'old.{name}' for name in TEXT_COLUMN_BITS)}
+            WHERE old.compressed = 0;
+    """
+    insert_new = f"""
+            INSERT INTO journal_fts (rowid, {_FTS_COLUMNS})
+            SELECT {new_key}, {', '.join(f'new.{name}' for name in TEXT_COLUMN_BITS)}
+            WHERE new.compressed = 0;
+    """
+
+    connection.execute(f"""
+        CREATE TRIGGER journal_fts_insert AFTER INSERT ON journal BEGIN
+            {insert_new}
+        END
+    """)
+    #mood/sleep only updates do not touch the index
+    connection.execute(f"""
+        CREATE TRIGGER journal_fts_update AFTER UPDATE OF date, text, went_well, difficult, remember, compressed ON journal BEGIN
+            {delete_old}
+            {insert_new}
+        END
+    """)
+    connection.execute(f"""
+        CREATE TRIGGER journal_fts_delete AFTER DELETE ON journal BEGIN
+            {delete_old}
+        END
+    """)
+
+    #new index, fill it once
+    if not row:
+        rebuild_journal_search(connection)
+
 #still all compatible with previous version but maybe check if smth is redundant now 
 def get_journal_entry(
     connection: sqlite3.Connection,
@@ -26,14 +249,14 @@ def get_journal_entry(
 ) -> str | None:
     cursor = connection.execute(
         """
-        SELECT text
+        SELECT text, compressed
         FROM journal
         WHERE date = ?
         """,
         (date,),
     )
     row = cursor.fetchone()
-    return row["text"] if row else None
+    return decode_journal_text(row["text"], bool(row["compressed"] & TEXT_COLUMN_BITS['text'])) if row else None
 
 
 def save_journal_entry(
@@ -46,117 +269,238 @@ def save_journal_entry(
     difficult: str | None = None,
     remember: str | None = None,
 ) -> None:
-    connection.execute(
-        """
-        INSERT OR IGNORE INTO journal (date, text)
-        VALUES (?, COALESCE(?, ''))
-        """,
-        (date, text),
-    )
-
-    fields = []
-    params: list = []
-
-    fields.append("text = ?")
-    params.append(text or "")
+    fields: dict = {'text': text or ''}
 
     if mood is not None:
-        fields.append("mood = ?")
-        params.append(int(mood))
+        fields['mood'] = int(mood)
 
     if sleep is not None:
-        fields.append("sleep = ?")
-        params.append(int(sleep))
+        fields['sleep'] = int(sleep)
 
     if went_well is not None:
-        fields.append("went_well = ?")
-        params.append(went_well or "")
+        fields['went_well'] = went_well or ''
 
     if difficult is not None:
-        fields.append("difficult = ?")
-        params.append(difficult or "")
+        fields['difficult'] = difficult or ''
 
     if remember is not None:
-        fields.append("remember = ?")
-        params.append(remember or "")
+        fields['remember'] = remember or ''
+
+    update_journal_fields(connection, date, fields)
+
+JOURNAL_FIELDS = ('text', 'mood', 'sleep', 'went_well', 'difficult', 'remember')
+
+
+#writes only the given columns, used by the write-behind autosave to persist diffs
+#text columns are compressed here when enabled, their flag bits are replaced, the others kept
+def update_journal_fields(connection: sqlite3.Connection, date: str, fields: dict) -> None:
+    columns = [name for name in JOURNAL_FIELDS if name in fields]
+    if not columns:
+        return
+
+    text_columns = [name for name in columns if name in TEXT_COLUMN_BITS]
+    compress = bool(text_columns) and compression_enabled(connection)
+
+    values = []
+    flags = 0
+    for name in columns:
+        value = fields[name]
+        if name in TEXT_COLUMN_BITS:
+            value, packed = encode_journal_text(value, compress)
+            if packed:
+                flags |= TEXT_COLUMN_BITS[name]
+        values.append(value)
+
+    #bits of the columns being written
+    touched = sum(TEXT_COLUMN_BITS[name] for name in text_columns)
 
-    params.append(date)
+    assignments = [f"{name} = excluded.{name}" for name in columns]
+    if touched:
+        assignments.append(f"compressed = (journal.compressed & ~{touched}) | excluded.compressed")
+
+    #the text before the write, only needed when the row has or gets compressed columns
+    old_plain = None
+    old_flags = 0
+    if touched:
+        old = connection.execute(
+            f"SELECT date, {_FTS_COLUMNS}, compressed FROM journal WHERE date = ?",
+            (date,),
+        ).fetchone()
+        old_flags = int(old['compressed'] or 0) if old else 0
+        if old_flags or flags:
+            old_plain = _decode_row(old) if old else {}
+            unindex_compressed_row(connection, date, old_plain, old_flags)
 
     connection.execute(
         f"""
-        UPDATE journal
-        SET {", ".join(fields)}
-        WHERE date = ?
+        INSERT INTO journal (date, {", ".join(columns)}, compressed)
+        VALUES (?, {", ".join("?" for _ in columns)}, ?)
+        ON CONFLICT(date) DO UPDATE SET
+        {", ".join(assignments)}
         """,
-        params,
+        (date, *values, flags),
     )
+
+    if old_plain is not None:
+        new_plain = {**old_plain, **{name: fields[name] or '' for name in text_columns}}
+        new_flags = (old_flags & ~touched) | flags
+        index_compressed_row(connection, date, new_plain, new_flags)
     connection.commit()
+    publish(JournalChanged(day=date))
 
 def get_journal_data(connection: sqlite3.Connection, date: str) -> dict | None:
     cursor = connection.execute(
         """
-        SELECT date, text, mood, sleep, went_well, difficult, remember
+        SELECT date, text, mood, sleep, went_well, difficult, remember, compressed
         FROM journal
         WHERE date = ?
         """,
         (date,),
     )
     row = cursor.fetchone()
-    return dict(row) if row else None
+    return _decode_row(row) if row else None
+
+
+def get_journal_has_content(connection: sqlite3.Connection, date: str) -> bool:
+    row = connection.execute(
+        "SELECT has_content FROM journal WHERE date = ?",
+        (date,),
+    ).fetchone()
+    return bool(row and row[0])
 
 
-# intended for usage with the calendar view
-def get_journal_status_for_month(connection, year: int, month: int) -> dict[str, bool]:
-    start_date, end_date = month_range(year, month)
+#notes only (the home tab mark), checked in sql so compressed notes are not decoded
+def get_journal_text_written(connection: sqlite3.Connection, date: str) -> bool:
+    row = connection.execute(
+        f"SELECT trim(text, {_BLANK}) <> '' FROM journal WHERE date = ?",
+        (date,),
+    ).fetchone()
+    return bool(row and row[0])
 
-    start_iso = start_date.isoformat()
-    end_iso = end_date.isoformat()
 
-    cursor = connection.cursor()
-    cursor.execute(
+#(date, mood, sleep) for days that have at least one of the two, end date exclusive
+def get_journal_mood_sleep_for_range(connection, start_iso: str, end_iso: str) -> list[tuple]:
+    cursor = connection.execute(
         """
-        SELECT date, text, mood, sleep, went_well, difficult, remember
+        SELECT date, mood, sleep
         FROM journal
         WHERE date >= ?
         AND date < ?
+        AND (mood IS NOT NULL OR sleep IS NOT NULL)
         """,
         (start_iso, end_iso),
     )
+    return [tuple(row) for row in cursor.fetchall()]
+
+#snippet markers, replaced by the ui after escaping the rest of the excerpt
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+
+#user input -> fts5 query, every word is quoted (no syntax errors from stray operators)
+#and the last one is a prefix match so results show up while typing
+def _fts_query(text: str) -> str:
+    words = [w.replace('"', '""') for w in text.split()]
+    if not words:
+        return ''
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
 
-    status: dict[str, bool] = {}
-    for day, text, mood, sleep, went_well, difficult, remember in cursor.fetchall():
-        has_text = bool((text or '').strip()) \
-            or bool((went_well or '').strip()) \
-            or bool((difficult or '').strip()) \
-            or bool((remember or '').strip())
+#the index is contentless, so the excerpt is cut in python from the decoded entry
+#tokens and folding follow fts5's unicode61 tokenizer (letters/digits, case and diacritics ignored)
+_TOKEN = re.compile(r'[^\W_]+')
+SNIPPET_TOKENS = 12
 
-        status[str(day)] = has_text
 
-    return status
+def _fold(word: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFKD', word.casefold()) if not unicodedata.combining(c))
 
-def get_journal_mood_for_month(connection, year: int, month: int) -> dict[str, int]:
-    start_date, end_date = month_range(year, month)
 
-    start_iso = start_date.isoformat()
-    end_iso = end_date.isoformat()
+#best column (most matching tokens) -> window of SNIPPET_TOKENS tokens around its first match
+def _snippet(plain: dict, query: str) -> str:
+    terms = [_fold(t) for t in _TOKEN.findall(query)]
+    if not terms:
+        return ''
+    exact, prefix = set(terms[:-1]), terms[-1]
 
-    cursor = connection.cursor()
-    cursor.execute(
+    def hit(token: str) -> bool:
+        folded = _fold(token)
+        return folded in exact or folded.startswith(prefix)
+
+    best = None
+    for name in TEXT_COLUMN_BITS:
+        value = plain.get(name) or ''
+        tokens = list(_TOKEN.finditer(value))
+        hits = [i for i, t in enumerate(tokens) if hit(t.group())]
+        if hits and (best is None or len(hits) > len(best[2])):
+            best = (value, tokens, hits)
+    if best is None:
+        value = plain.get('text') or ''
+        best = (value, list(_TOKEN.finditer(value)), [])
+
+    value, tokens, hits = best
+    if not tokens:
+        return ''
+    first = hits[0] if hits else 0
+    start = max(0, min(first - 2, len(tokens) - SNIPPET_TOKENS))
+    end = min(len(tokens), start + SNIPPET_TOKENS)
+
+    parts = ['…' if start > 0 else '']
+    position = tokens[start].start()
+    for i in range(start, end):
+        token = tokens[i]
+        parts.append(value[position:token.start()])
+        if i in hits:
+            parts.append(f'{SNIPPET_START}{token.group()}{SNIPPET_END}')
+        else:
+            parts.append(token.group())
+        position = token.end()
+    parts.append('…' if end < len(tokens) else '')
+    return ''.join(parts)
+
+
+def search_journal(
+    connection: sqlite3.Connection,
+    query: str,
+    limit: int = 20,
+    cursor: int | None = None,
+) -> tuple[list[dict], int | None]:
+    match = _fts_query(query or '')
+    if not match:
+        return [], None
+
+    offset = int(cursor or 0)
+    rows = connection.execute(
         """
-        SELECT date, mood
-        FROM journal
-        WHERE date >= ?
-        AND date < ?
-        AND mood IS NOT NULL
+        SELECT rowid, bm25(journal_fts) AS rank
+        FROM journal_fts
+        WHERE journal_fts MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
         """,
-        (start_iso, end_iso),
-    )
+        (match, limit + 1, offset),
+    ).fetchall()
 
-    moods: dict[str, int] = {}
-    for day, mood in cursor.fetchall():
-        try:
-            moods[str(day)] = int(mood)
-        except Exception:
-            continue
+    ranked = [(_fts_date(row['rowid']), row['rank']) for row in rows[:limit]]
+    dates = [day for day, _rank in ranked]
+    entries = {}
+    if dates:
+        found = connection.execute(
+            f"""
+            SELECT date, {_FTS_COLUMNS}, compressed
+            FROM journal
+            WHERE date IN ({', '.join('?' for _ in dates)})
+            """,
+            dates,
+        ).fetchall()
+        entries = {row['date']: _decode_row(row) for row in found}
 
-    return moods
+    results = [
+        {'date': day, 'rank': rank, 'snippet': _snippet(entries[day], query)}
+        for day, rank in ranked
+        if day in entries
+    ]
+    next_cursor = offset + limit if len(rows) > limit else None
+    return results, next_cursor
@@ -0,0 +1,152 @@
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from db.journal import (
+    TEXT_COLUMN_BITS,
+    COMPRESSION_SETTING,
+    compression_enabled,
+    encode_journal_text,
+    decode_journal_text,
+    get_journal_data,
+    unindex_compressed_row,
+    index_compressed_row,
+)
+from db.settings import set_setting
+
+
+#rewrites every journal row to match the compression setting (compress when on, decompress when off)
+#returns how many rows changed, each rewritten row is reindexed with the same plain text
+def recompress_journal(connection: sqlite3.Connection, batch_size: int = 500) -> int:
+    compress = compression_enabled(connection)
+    columns = list(TEXT_COLUMN_BITS)
+
+    rows = connection.execute(
+        f"SELECT date, {', '.join(columns)}, compressed FROM journal"
+    ).fetchall()
+
+    changed = 0
+    updates = []
+    for row in rows:
+        old_flags = int(row['compressed'] or 0)
+        new_flags = 0
+        values = []
+        plain = {}
+        for name, bit in TEXT_COLUMN_BITS.items():
+            plain[name] = decode_journal_text(row[name], bool(old_flags & bit))
+            value, packed = encode_journal_text(plain[name], compress)
+            if packed:
+                new_flags |= bit
+            values.append(value)
+
+        #same flags means the row is already stored in the wanted form
+        if new_flags == old_flags:
+            continue
+
+        updates.append(((*values, new_flags, row['date']), plain, old_flags))
+        if len(updates) >= batch_size:
+            changed += _write_batch(connection, columns, updates)
+            updates = []
+
+    if updates:
+        changed += _write_batch(connection, columns, updates)
+
+    #every rewrite left a delete + insert in the fts segments, merge them back into one
+    if changed:
+        connection.execute("INSERT INTO journal_fts (journal_fts) VALUES ('optimize')")
+        connection.commit()
+    return changed
+
+
+def _write_batch(connection: sqlite3.Connection, columns: list[str], updates: list[tuple[tuple, dict, int]]) -> int:
+    #the triggers only handle rows stored as plain text, the text itself is the same before and after
+    for params, plain, old_flags in updates:
+        unindex_compressed_row(connection, params[-1], plain, old_flags)
+    connection.executemany(
+        f"""
+        UPDATE journal
+        SET {', '.join(f'{name} = ?' for name in columns)}, compressed = ?
+        WHERE date = ?
+        """,
+        [params for params, _plain, _old_flags in updates],
+    )
+    for params, plain, _old_flags in updates:
+        index_compressed_row(connection, params[-1], plain, params[-2])
+    connection.commit()
+    return len(updates)
+
+
+def set_journal_compression(connection: sqlite3.Connection, enabled: bool) -> int:
+    set_setting(connection, COMPRESSION_SETTING, '1' if enabled else '0')
+    return recompress_journal(connection)
+
+
+#copies the db, measures file size and full journal read time, converts the copy, measures again
+def benchmark(db_path: Path, reads: int = 3) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix='journal-bench-'))
+    try:
+        copy = workdir / 'planner.db'
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(copy)
+        source.backup(target)
+        source.close()
+        target.close()
+
+        results = {}
+        for label, enabled in (('plain', False), ('compressed', True)):
+            connection = sqlite3.connect(copy)
+            connection.row_factory = sqlite3.Row
+
+            set_journal_compression(connection, enabled)
+            connection.execute('VACUUM')
+
+            days = [row[0] for row in connection.execute('SELECT date FROM journal').fetchall()]
+            best = None
+            for _ in range(reads):
+                start = time.perf_counter()
+                for day in days:
+                    get_journal_data(connection, day)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+
+            connection.close()
+            results[label] = {
+                'size_bytes': os.path.getsize(copy),
+                'rows': len(days),
+                'read_all_ms': round((best or 0) * 1000, 2),
+            }
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> None:
+    from db.core import DB_PATH, connect_db, init_db
+
+    parser = argparse.ArgumentParser(description='Journal compression tools')
+    parser.add_argument('command', choices=['enable', 'disable', 'benchmark'])
+    parser.add_argument('--db', type=Path, default=DB_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        for label, row in benchmark(args.db).items():
+            print(f"{label:>10}: {row['size_bytes'] / 1024:.0f} KiB, {row['rows']} rows, read all {row['read_all_ms']} ms")
+        return
+
+    if args.db == DB_PATH:
+        connection = connect_db()
+    else:
+        connection = sqlite3.connect(args.db)
+        connection.row_factory = sqlite3.Row
+    init_db(connection)
+    changed = set_journal_compression(connection, args.command == 'enable')
+    connection.close()
+    print(f'{changed} journal rows rewritten')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import sqlite3
+
+from helpers.dates import month_range
+
+
+#per day todo, daily habit and journal stats for any range in one round trip
+#a recursive cte generates every date of the range, the tables are grouped once and left joined onto it,
+#so days without any data still get a row (zeros, mood None)
+OVERVIEW_QUERY = '''
+WITH RECURSIVE days(day) AS (
+    SELECT :start WHERE :start < :end
+    UNION ALL
+    SELECT date(day, '+1 day') FROM days WHERE date(day, '+1 day') < :end
+),
+todo_stats AS (
+    SELECT date,
+    SUM(CASE WHEN completed = 1 THEN 1 ELSE 0 END) AS done,
+    COUNT(*) AS total
+    FROM todos
+    WHERE date >= :start
+    AND date < :end
+    GROUP BY date
+),
+daily_habits AS (
+    SELECT COUNT(*) AS total
+    FROM habits
+    WHERE active = 1 AND frequency = 'daily'
+),
+habit_stats AS (
+    SELECT hl.date, COUNT(*) AS done
+    FROM habit_log hl
+    JOIN habits h ON h.id = hl.habit_id
+    WHERE h.active = 1
+    AND h.frequency = 'daily'
+    AND hl.count >= 1
+    AND hl.date >= :start
+    AND hl.date < :end
+    GROUP BY hl.date
+)
+SELECT d.day,
+COALESCE(t.done, 0) AS todos_done,
+COALESCE(t.total, 0) AS todos_total,
+dh.total AS daily_total,
+COALESCE(hs.done, 0) AS daily_done,
+j.mood,
+COALESCE(j.has_content, 0) AS has_journal
+FROM days d
+CROSS JOIN daily_habits dh
+LEFT JOIN todo_stats t ON t.date = d.day
+LEFT JOIN habit_stats hs ON hs.date = d.day
+LEFT JOIN journal j ON j.date = d.day
+ORDER BY d.day
+'''
+
+
+#day -> {todos_done, todos_total, daily_total, daily_done, mood, has_journal}, end date exclusive
+#daily_total is the number of active daily habits and the same on every row
+def get_overview_for_range(connection: sqlite3.Connection, start_iso: str, end_iso: str) -> dict[str, dict]:
+    cursor = connection.execute(OVERVIEW_QUERY, {'start': start_iso, 'end': end_iso})
+
+    overview: dict[str, dict] = {}
+    for day, todos_done, todos_total, daily_total, daily_done, mood, has_journal in cursor.fetchall():
+        try:
+            mood = int(mood) if mood is not None else None
+        except Exception:
+            mood = None
+
+        overview[str(day)] = {
+            'todos_done': int(todos_done),
+            'todos_total': int(todos_total),
+            'daily_total': int(daily_total),
+            'daily_done': int(daily_done),
+            'mood': mood,
+            'has_journal': bool(has_journal),
+        }
+
+    return overview
+
+
+def get_month_overview(connection: sqlite3.Connection, year: int, month: int) -> dict[str, dict]:
+    start_date, end_date = month_range(year, month)
+    return get_overview_for_range(connection, start_date.isoformat(), end_date.isoformat())
+
+
+def get_year_overview(connection: sqlite3.Connection, year: int) -> dict[str, dict]:
+    return get_overview_for_range(connection, f'{year:04d}-01-01', f'{year + 1:04d}-01-01')
@@ -1,5 +1,7 @@
 import sqlite3
 
+from helpers.events import SettingChanged, publish
+
 
 def init_settings_table(connection: sqlite3.Connection) -> None:
     connection.execute(
@@ -19,6 +21,7 @@ def set_setting(connection: sqlite3.Connection, key: str, value: str) -> None:
         (key, value),
     )
     connection.commit()
+    publish(SettingChanged(key=key))
 
 
 def get_setting(connection: sqlite3.Connection, key: str) -> str | None:
@@ -0,0 +1,46 @@
+import sqlite3
+from dataclasses import dataclass, field
+
+from db.xp import get_total_xp, level_for_total_xp, list_xp_type_totals
+from db.habits import list_active_habits, get_streak_history, current_streak_from_runs
+from db.finance import get_transaction_extremes
+
+
+#everything the achievement checks look at, gathered in a fixed number of queries
+#(xp ledger row, per type counters, active habits, cached streak runs, transaction min/max)
+@dataclass
+class StatsSnapshot:
+    day: str
+    total_xp: int = 0
+    level: int = 1
+    event_counts: dict[str, int] = field(default_factory=dict)
+    positive_counts: dict[str, int] = field(default_factory=dict)
+    best_daily_streak: int = 0
+    best_weekly_streak: int = 0
+    min_transaction: float = 0.0
+    max_transaction: float = 0.0
+
+
+def load_stats_snapshot(connection: sqlite3.Connection, day: str) -> StatsSnapshot:
+    snapshot = StatsSnapshot(day=day)
+
+    snapshot.total_xp = get_total_xp(connection)
+    snapshot.level = level_for_total_xp(snapshot.total_xp)[0]
+
+    for event_type, row in list_xp_type_totals(connection).items():
+        snapshot.event_counts[event_type] = int(row['event_count'] or 0)
+        snapshot.positive_counts[event_type] = int(row['positive_count'] or 0)
+
+    habits = list_active_habits(connection)
+    history = get_streak_history(connection, [int(h['id']) for h in habits])
+    for h in habits:
+        runs = history.get(int(h['id']), {}).get('runs', [])
+        streak = current_streak_from_runs(runs, h['frequency'], day)
+        if h['frequency'] == 'weekly':
+            snapshot.best_weekly_streak = max(snapshot.best_weekly_streak, streak)
+        else:
+            snapshot.best_daily_streak = max(snapshot.best_daily_streak, streak)
+
+    snapshot.min_transaction, snapshot.max_transaction = get_transaction_extremes(connection)
+
+    return snapshot
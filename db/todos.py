@@ -1,5 +1,5 @@
 import sqlite3
-from helpers.dates import month_range
+from helpers.events import TodosChanged, publish
 
 
 def init_todo_tables(connection: sqlite3.Connection) -> None:
@@ -12,12 +12,80 @@ def init_todo_tables(connection: sqlite3.Connection) -> None:
             created_at TEXT NOT NULL DEFAULT (datetime('now'))
         )
     """)
+    #dated and backlog todos get separate partial indexes, with a plain index on date the
+    #planner would also use it for date IS NULL and sort the whole backlog
+    connection.execute("DROP INDEX IF EXISTS index_todos_date")
     connection.execute(
-        "CREATE INDEX IF NOT EXISTS index_todos_date ON todos(date)"
+        "CREATE INDEX IF NOT EXISTS index_todos_dated ON todos(date) WHERE date IS NOT NULL"
     )
+    #manager ordering (open first, dated by date, backlog last) and the backlog filter
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS index_todos_manager ON todos(completed, date IS NULL, COALESCE(date, ''))"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS index_todos_backlog ON todos(completed) WHERE date IS NULL"
+    )
+    init_todo_search(connection)
     connection.commit()
 
 
+#trigram index over titles for substring search, external content so titles are not stored twice
+#older sqlite builds without the trigram tokenizer fall back to LIKE scans
+def init_todo_search(connection: sqlite3.Connection) -> None:
+    exists = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'todos_fts'"
+    ).fetchone()
+    if exists:
+        return
+
+    try:
+        connection.execute("""
+            CREATE VIRTUAL TABLE todos_fts USING fts5(
+                title,
+                content = 'todos',
+                content_rowid = 'id',
+                tokenize = 'trigram'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return
+
+    connection.execute("""
+        CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN
+            INSERT INTO todos_fts (rowid, title) VALUES (new.id, new.title);
+        END
+    """)
+    connection.execute("""
+        CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF title ON todos BEGIN
+            INSERT INTO todos_fts (todos_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            INSERT INTO todos_fts (rowid, title) VALUES (new.id, new.title);
+        END
+    """)
+    connection.execute("""
+        CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN
+            INSERT INTO todos_fts (todos_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        END
+    """)
+    connection.execute("INSERT INTO todos_fts (todos_fts) VALUES ('rebuild')")
+
+
+#sqlite's LIKE and lower() only fold ascii, the search fallback compares python casefolded titles
+#registered by connect_db, connections opened elsewhere need it before searching with query_todos
+def register_todo_functions(connection: sqlite3.Connection) -> None:
+    connection.create_function(
+        'casefold',
+        1,
+        lambda value: value.casefold() if isinstance(value, str) else value,
+        deterministic=True,
+    )
+
+
+def has_todo_search_index(connection: sqlite3.Connection) -> bool:
+    return connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'todos_fts'"
+    ).fetchone() is not None
+
+
 def insert_todo(
     connection: sqlite3.Connection,
     title: str,
@@ -31,6 +99,7 @@ def insert_todo(
         (title, date),
     )
     connection.commit()
+    publish(TodosChanged(days=(date,)))
     return cursor.lastrowid
 
 
@@ -50,6 +119,35 @@ def list_todos_for_day(
     return [dict(row) for row in cursor.fetchall()]
 
 
+#(done, total) for one day in a single aggregate
+def get_todo_counts_for_day(connection: sqlite3.Connection, date: str) -> tuple[int, int]:
+    row = connection.execute(
+        """
+        SELECT COALESCE(SUM(completed), 0), COUNT(*)
+        FROM todos
+        WHERE date = ?
+        """,
+        (date,),
+    ).fetchone()
+    return int(row[0] or 0), int(row[1] or 0)
+
+
+#open todos for the day first, then the oldest open backlog items
+def list_next_open_todos(connection: sqlite3.Connection, date: str, limit: int = 4) -> list[dict]:
+    cursor = connection.execute(
+        """
+        SELECT id, title, date
+        FROM todos
+        WHERE completed = 0
+        AND (date = ? OR date IS NULL)
+        ORDER BY date IS NULL, id
+        LIMIT ?
+        """,
+        (date, limit),
+    )
+    return [dict(row) for row in cursor.fetchall()]
+
+
 def list_all_todos(
     connection: sqlite3.Connection,
 ) -> list[dict]:
@@ -67,11 +165,95 @@ def list_all_todos(
     return [dict(row) for row in cursor.fetchall()]
 
 
+#keyset cursor over the manager ordering: (completed, is backlog, date or '', id) of the last row
+TodoCursor = tuple[int, int, str, int]
+
+
+#position of a todo in the manager ordering, rows after the cursor sort above it
+def todo_sort_key(todo: dict) -> TodoCursor:
+    return (int(todo['completed']), int(todo['date'] is None), todo['date'] or '', int(todo['id']))
+
+#trigrams need at least 3 characters, shorter searches scan the titles with casefold()
+MIN_TRIGRAM_QUERY = 3
+
+
+#filtered page of todos for the manager -> (rows, cursor for the next page or None)
+#mode: 'all', 'backlog' (no date) or 'date' (todos on date)
+def query_todos(
+    connection: sqlite3.Connection,
+    search: str = '',
+    mode: str = 'all',
+    date: str | None = None,
+    limit: int = 200,
+    cursor: TodoCursor | None = None,
+) -> tuple[list[dict], TodoCursor | None]:
+    where = []
+    params: list = []
+
+    search = (search or '').strip()
+    if search:
+        if len(search) >= MIN_TRIGRAM_QUERY and has_todo_search_index(connection):
+            where.append("id IN (SELECT rowid FROM todos_fts WHERE todos_fts MATCH ?)")
+            params.append('"' + search.replace('"', '""') + '"')
+        else:
+            #case insensitive beyond ascii like the trigram index (ä matches Ä), LIKE only folds ascii
+            where.append("instr(casefold(title), ?) > 0")
+            params.append(search.casefold())
+
+    if mode == 'backlog':
+        where.append("date IS NULL")
+    elif mode == 'date':
+        where.append("date = ?")
+        params.append(date)
+    elif mode != 'all':
+        raise ValueError(f"Invalid mode: {mode}")
+
+    #backlog rows all share the date part of the key, spelled out without it so the partial index is used
+    if mode == 'backlog':
+        key_sql = "completed, id"
+        key_params = (cursor[0], cursor[3]) if cursor is not None else ()
+    else:
+        key_sql = "completed, date IS NULL, COALESCE(date, ''), id"
+        key_params = tuple(cursor or ())
+
+    if cursor is not None:
+        where.append(f"({key_sql}) > ({', '.join('?' for _ in key_params)})")
+        params.extend(key_params)
+
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ''
+
+    rows = connection.execute(
+        f"""
+        SELECT id, title, date, completed
+        FROM todos
+        {where_sql}
+        ORDER BY {key_sql}
+        LIMIT ?
+        """,
+        (*params, limit + 1),
+    ).fetchall()
+
+    todos = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit and todos:
+        next_cursor = todo_sort_key(todos[-1])
+    return todos, next_cursor
+
+
+#date of a todo for the change events, None for backlog or missing todos
+def _todo_day(connection: sqlite3.Connection, todo_id: int) -> str | None:
+    row = connection.execute("SELECT date FROM todos WHERE id = ?", (todo_id,)).fetchone()
+    return row[0] if row else None
+
+
+#commit=False leaves the commit to the caller, see actions.actions.toggle_todo
 def set_todo_completed(
     connection: sqlite3.Connection,
     todo_id: int,
     completed: bool,
+    commit: bool = True,
 ) -> None:
+    day = _todo_day(connection, todo_id)
     connection.execute(
         """
         UPDATE todos
@@ -80,28 +262,26 @@ def set_todo_completed(
         """,
         (1 if completed else 0, todo_id),
     )
-    connection.commit()
+    if commit:
+        connection.commit()
+    publish(TodosChanged(days=(day,)))
 
 
 def delete_todo(
     connection: sqlite3.Connection,
     todo_id: int,
 ) -> None:
+    day = _todo_day(connection, todo_id)
     connection.execute(
         "DELETE FROM todos WHERE id = ?",
         (todo_id,),
     )
     connection.commit()
+    publish(TodosChanged(days=(day,)))
     
 
-#intended for usage with the calendar view to show stats 
-def get_todo_stats_for_month(connection, year: int, month: int) -> dict[str, tuple[int, int]]:
-
-    start_date, end_date = month_range(year, month)
-
-    start_iso = start_date.isoformat()
-    end_iso = end_date.isoformat()
-
+#(done, total) per day with todos, end date exclusive
+def get_todo_stats_for_range(connection, start_iso: str, end_iso: str) -> dict[str, tuple[int, int]]:
     cursor = connection.cursor()
     cursor.execute(
         '''
@@ -133,6 +313,7 @@ def update_todo(
     title: str,
     date: str | None,
     ) -> None:
+    old_day = _todo_day(connection, todo_id)
     connection.execute(
         '''
         UPDATE todos
@@ -142,6 +323,7 @@ def update_todo(
         (title, date, todo_id),
     )
     connection.commit()
+    publish(TodosChanged(days=(old_day, date) if old_day != date else (date,)))
 
 
 def get_todo_title(connection: sqlite3.Connection, todo_id: int) -> str:
@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+from helpers.events import ChangeEvent, ExternalChange, subscribe, publish
+
+
+#change tracking for the views: a counter per table group, bumped by every change event the write
+#helpers publish (after their commit), views remember the counters they rendered and skip
+#reloading while they are equal
+#writes from other processes (the journal compression cli, a second app instance) are caught with
+#PRAGMA data_version on a long lived connection and published as ExternalChange, which bumps everything
+TABLES = ('todos', 'habits', 'journal', 'finance', 'xp', 'achievements', 'settings')
+
+_lock = threading.Lock()
+_counters: dict[str, int] = {name: 0 for name in TABLES}
+
+#events this process published, to tell our own commits apart from foreign ones
+_local_writes = 0
+
+_watcher: sqlite3.Connection | None = None
+_seen_data_version: int | None = None
+_seen_local_writes = 0
+
+
+def _on_change(event: ChangeEvent) -> None:
+    global _local_writes
+    with _lock:
+        for name in ((event.table,) if event.table else TABLES):
+            _counters[name] += 1
+        if not isinstance(event, ExternalChange):
+            _local_writes += 1
+
+
+subscribe(ChangeEvent, _on_change)
+
+
+#opens the watcher connection once, later calls are no-ops
+def watch_database(path: Path) -> None:
+    global _watcher, _seen_data_version, _seen_local_writes
+    with _lock:
+        if _watcher is not None:
+            return
+        _watcher = sqlite3.connect(path, check_same_thread=False)
+        _seen_data_version = _watcher.execute('PRAGMA data_version').fetchone()[0]
+        _seen_local_writes = _local_writes
+
+
+def stop_watching() -> None:
+    global _watcher
+    with _lock:
+        if _watcher is not None:
+            _watcher.close()
+            _watcher = None
+
+
+#data_version moves on every commit of another connection, and each db_session is another connection,
+#so a move with no event since the last poll means somebody outside this process wrote
+#one pragma on an idle connection, cheap enough to call on every showEvent
+def check_external() -> None:
+    global _seen_data_version, _seen_local_writes
+    with _lock:
+        if _watcher is None:
+            return
+
+        data_version = _watcher.execute('PRAGMA data_version').fetchone()[0]
+        external = data_version != _seen_data_version and _local_writes == _seen_local_writes
+
+        _seen_data_version = data_version
+        _seen_local_writes = _local_writes
+
+    if external:
+        publish(ExternalChange())
+
+
+def versions(*tables: str) -> tuple[int, ...]:
+    check_external()
+    with _lock:
+        return tuple(_counters[name] for name in tables)
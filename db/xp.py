@@ -1,6 +1,15 @@
 import sqlite3
+from bisect import bisect_right
 from datetime import date as dt_date, timedelta
 
+from helpers.events import XpChanged, publish
+
+#event types that may exist at most once per (source_id, source_date)
+ONCE_EVENT_TYPES = ('journal_written', 'weekly_habit_target_reached')
+#the WHERE of the partial index, repeated in add_xp_event's conflict target so it matches the index
+_ONCE_TYPES_SQL = ", ".join(f"'{t}'" for t in ONCE_EVENT_TYPES)
+
+
 #source id is the id of whatever triggered this (todo id, habit id or similar)
 #soure date is the date of the event that triggered this (for example the date of this todo), maybe unnecessary but ill keep this for now
 def init_xp_tables(connection: sqlite3.Connection) -> None:
@@ -23,8 +32,63 @@ def init_xp_tables(connection: sqlite3.Connection) -> None:
     connection.execute(
         "CREATE INDEX IF NOT EXISTS index_xp_events_type_date ON xp_events(event_type, source_date)"
     )
+
+    #once-only rewards are deduplicated by a partial unique index, add_xp_event skips them with ON CONFLICT DO NOTHING
+    #source_id is NULL for journal rewards and NULLs never collide in a unique index, hence the IFNULL
+    #the dedup is a one-time migration for databases from before the index existed, once the index
+    #is there add_xp_event keeps the table clean and the full pass is skipped on every later start
+    once_types = _ONCE_TYPES_SQL
+    migrate_once = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'index_xp_events_once'"
+    ).fetchone() is None
+    if migrate_once:
+        connection.execute(
+            f"""
+            DELETE FROM xp_events
+            WHERE event_type IN ({once_types})
+            AND id NOT IN (
+                SELECT MIN(id)
+                FROM xp_events
+                WHERE event_type IN ({once_types})
+                GROUP BY event_type, IFNULL(source_id, 0), source_date
+            )
+            """
+        )
+        connection.execute(
+            f"""
+            CREATE UNIQUE INDEX index_xp_events_once
+            ON xp_events(event_type, IFNULL(source_id, 0), source_date)
+            WHERE event_type IN ({once_types})
+            """
+        )
+
+    #running ledger so totals and counts are single row reads instead of scans over xp_events
+    #kept in sync by add_xp_event, rebuild_xp_totals recomputes both from scratch
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS xp_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_xp INTEGER NOT NULL DEFAULT 0,
+            event_count INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS xp_type_totals (
+            event_type TEXT PRIMARY KEY,
+            xp_total INTEGER NOT NULL DEFAULT 0,
+            event_count INTEGER NOT NULL DEFAULT 0,
+            positive_count INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
     connection.commit()
 
+    #first start after the ledger was added, or the migration above just ran
+    if migrate_once or connection.execute("SELECT 1 FROM xp_totals WHERE id = 1").fetchone() is None:
+        rebuild_xp_totals(connection)
+
 
 def add_xp_event(
     connection: sqlite3.Connection,
@@ -33,32 +97,93 @@ def add_xp_event(
     message: str,
     source_id: int | None = None,
     source_date: str | None = None,
-) -> int:
+    commit: bool = True,
+) -> int | None:
+    #ignored (returns None) when a once-only reward already exists, see index_xp_events_once
+    #the conflict target names that index, so NOT NULL / CHECK failures and other conflicts still raise
+    #commit=False leaves the commit to the caller, e.g. to write the xp and its cause in one transaction
     cursor = connection.execute(
-        """
+        f"""
         INSERT INTO xp_events (event_type, xp_amount, message, source_id, source_date)
         VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (event_type, IFNULL(source_id, 0), source_date)
+        WHERE event_type IN ({_ONCE_TYPES_SQL})
+        DO NOTHING
         """,
         (event_type, xp_amount, message, source_id, source_date),
     )
-    connection.commit()
+    if cursor.rowcount == 0:
+        if commit:
+            connection.commit()
+        return None
+
+    #same transaction as the insert, so the ledger can never drift from xp_events
+    connection.execute(
+        """
+        INSERT INTO xp_totals (id, total_xp, event_count)
+        VALUES (1, ?, 1)
+        ON CONFLICT(id) DO UPDATE SET
+        total_xp = total_xp + excluded.total_xp,
+        event_count = event_count + 1
+        """,
+        (xp_amount,),
+    )
+    connection.execute(
+        """
+        INSERT INTO xp_type_totals (event_type, xp_total, event_count, positive_count)
+        VALUES (?, ?, 1, ?)
+        ON CONFLICT(event_type) DO UPDATE SET
+        xp_total = xp_total + excluded.xp_total,
+        event_count = event_count + 1,
+        positive_count = positive_count + excluded.positive_count
+        """,
+        (event_type, xp_amount, 1 if xp_amount > 0 else 0),
+    )
+    if commit:
+        connection.commit()
+    publish(XpChanged())
     return int(cursor.lastrowid)
 
 
+#repair routine, recomputes the ledger from the full event log
+def rebuild_xp_totals(connection: sqlite3.Connection) -> None:
+    connection.execute("DELETE FROM xp_totals")
+    connection.execute("DELETE FROM xp_type_totals")
+    connection.execute(
+        """
+        INSERT INTO xp_totals (id, total_xp, event_count)
+        SELECT 1, COALESCE(SUM(xp_amount), 0), COUNT(*)
+        FROM xp_events
+        """
+    )
+    connection.execute(
+        """
+        INSERT INTO xp_type_totals (event_type, xp_total, event_count, positive_count)
+        SELECT event_type, SUM(xp_amount), COUNT(*), SUM(CASE WHEN xp_amount > 0 THEN 1 ELSE 0 END)
+        FROM xp_events
+        GROUP BY event_type
+        """
+    )
+    connection.commit()
+    publish(XpChanged())
+
+
 def get_total_xp(connection: sqlite3.Connection) -> int:
     cursor = connection.execute(
-        "SELECT COALESCE(SUM(xp_amount), 0) AS total FROM xp_events"
+        "SELECT total_xp AS total FROM xp_totals WHERE id = 1"
     )
     row = cursor.fetchone()
-    return int(row['total'] or 0)
+    return int(row['total'] or 0) if row else 0
 
 
+#created_at is always written by the column default, so it is already a sortable
+#'YYYY-MM-DD HH:MM:SS' key; wrapping it in datetime() would force a temp b-tree sort
 def list_recent_xp_events(connection: sqlite3.Connection, limit: int = 25) -> list[dict]:
     cursor = connection.execute(
         """
         SELECT id, created_at, event_type, xp_amount, message, source_id, source_date
         FROM xp_events
-        ORDER BY datetime(created_at) DESC, id DESC
+        ORDER BY created_at DESC, id DESC
         LIMIT ?
         """,
         (limit,),
@@ -66,20 +191,6 @@ def list_recent_xp_events(connection: sqlite3.Connection, limit: int = 25) -> li
     return [dict(row) for row in cursor.fetchall()]
 
 
-def has_xp_event_for_day(connection: sqlite3.Connection, event_type: str, day: str) -> bool:
-    cursor = connection.execute(
-        """
-        SELECT 1
-        FROM xp_events
-        WHERE event_type = ?
-        AND source_date = ?
-        LIMIT 1
-        """,
-        (event_type, day),
-    )
-    return cursor.fetchone() is not None
-
-
 def week_start_iso(day_iso: str) -> str:
     day = dt_date.fromisoformat(day_iso)
     # monday as start
@@ -87,53 +198,44 @@ def week_start_iso(day_iso: str) -> str:
     return start.isoformat()
 
 
-def has_weekly_reward(connection: sqlite3.Connection, habit_id: int, week_start: str) -> bool:
-    cursor = connection.execute(
-        """
-        SELECT 1
-        FROM xp_events
-        WHERE event_type = 'weekly_habit_target_reached'
-        AND source_id = ?
-        AND source_date = ?
-        LIMIT 1
-        """,
-        (habit_id, week_start),
-    )
-    return cursor.fetchone() is not None
-
 #first idea: to level up from level n one needs round(100 * 1.2^(n-1)) xp
+#steps[i] is the xp needed to go from level i+1 to i+2, thresholds[i] the total xp level i+1 starts at
+#built once at import and extended lazily, (6x + 2) // 5 is round(x * 1.2) without float overflow
+_level_steps: list[int] = [100]
+_level_thresholds: list[int] = [0, 100]
+
+
+def _extend_level_table(min_levels: int = 0, min_total_xp: int = -1) -> None:
+    while len(_level_steps) < min_levels or _level_thresholds[-1] <= min_total_xp:
+        step = (6 * _level_steps[-1] + 2) // 5
+        _level_steps.append(step)
+        _level_thresholds.append(_level_thresholds[-1] + step)
+
+
+_extend_level_table(min_levels=200)
+
+
 def xp_needed_for_level(level: int) -> int:
     if level <= 1:
         return 0
-    needed = 100
-    for _ in range(level - 2):
-        needed = int(round(needed * 1.2))
-    return needed
+    _extend_level_table(min_levels=level - 1)
+    return _level_steps[level - 2]
 
 
 def xp_needed_for_next_level(level: int) -> int:
     if level < 1:
         level = 1
-    needed = 100
-    for _ in range(level - 1):
-        needed = int(round(needed * 1.2))
-    return needed
+    _extend_level_table(min_levels=level)
+    return _level_steps[level - 1]
 
 
 def level_for_total_xp(total_xp: int) -> tuple[int, int, int]:
     if total_xp < 0:
         total_xp = 0
 
-    level = 1
-    remaining = total_xp
-
-    while True:
-        step = xp_needed_for_next_level(level)
-        if remaining >= step:
-            remaining -= step
-            level += 1
-        else:
-            return (level, remaining, step)
+    _extend_level_table(min_total_xp=total_xp)
+    index = bisect_right(_level_thresholds, total_xp) - 1
+    return (index + 1, total_xp - _level_thresholds[index], _level_steps[index])
 
 
 def badge_tier_for_level(level: int) -> int:
@@ -162,29 +264,35 @@ def next_badge_milestone(level: int) -> int | None:
 
 def count_xp_events_by_type(connection: sqlite3.Connection, event_type: str) -> int:
     cursor = connection.execute(
-        "SELECT COUNT(*) AS c FROM xp_events WHERE event_type = ?",
+        "SELECT event_count AS c FROM xp_type_totals WHERE event_type = ?",
         (event_type,),
     )
     row = cursor.fetchone()
-    return int(row["c"] or 0)
+    return int(row["c"] or 0) if row else 0
 
 
 def count_xp_events(connection: sqlite3.Connection) -> int:
-    cursor = connection.execute("SELECT COUNT(*) AS c FROM xp_events")
+    cursor = connection.execute("SELECT event_count AS c FROM xp_totals WHERE id = 1")
     row = cursor.fetchone()
-    return int(row["c"] or 0)
+    return int(row["c"] or 0) if row else 0
+
+
+def list_xp_type_totals(connection: sqlite3.Connection) -> dict[str, dict]:
+    cursor = connection.execute(
+        "SELECT event_type, xp_total, event_count, positive_count FROM xp_type_totals"
+    )
+    return {str(row["event_type"]): dict(row) for row in cursor.fetchall()}
 
 
 #addded to fix bug where unticking todos also counted for the achievements
 def count_positive_xp_events_by_type(connection, event_type: str) -> int:
     cursor = connection.execute(
         """
-        SELECT COUNT(*)
-        FROM xp_events
+        SELECT positive_count
+        FROM xp_type_totals
         WHERE event_type = ?
-        AND xp_amount > 0
         """,
         (event_type,),
     )
     row = cursor.fetchone()
-    return int(row[0] or 0)
+    return int(row[0] or 0) if row else 0
@@ -0,0 +1,167 @@
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import date as dt_date, timedelta
+
+import numpy as np
+
+from db.journal import get_journal_mood_sleep_for_range
+from db.habits import get_daily_habit_stats_for_range
+from db.todos import get_todo_stats_for_range
+from db.finance import get_timeseries_data
+
+
+#series names in display order, mood is the one everything else gets compared against
+SERIES = ('mood', 'sleep', 'habits', 'todos', 'spend')
+SERIES_LABELS = {
+    'mood': 'Mood',
+    'sleep': 'Sleep',
+    'habits': 'Daily habits done',
+    'todos': 'Todos completed',
+    'spend': 'Net spend',
+}
+
+#pairs with fewer overlapping days than this get no correlation
+MIN_SAMPLES = 10
+MAX_LAG = 3
+
+
+#one float array per metric, all aligned to the same day index, NaN where there is no data
+@dataclass
+class DailySeries:
+    start: dt_date
+    days: int
+    values: dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def weekdays(self) -> np.ndarray:
+        #0 = monday, like date.weekday()
+        return (np.arange(self.days) + self.start.weekday()) % 7
+
+
+def _day_index(start: dt_date, isos) -> np.ndarray:
+    if not len(isos):
+        return np.empty(0, dtype=np.int64)
+    return (np.array(isos, dtype='datetime64[D]') - np.datetime64(start, 'D')).astype(np.int64)
+
+
+def _scatter(days: int, index: np.ndarray, values, fill: float = np.nan) -> np.ndarray:
+    out = np.full(days, fill, dtype=float)
+    out[index] = np.asarray(values, dtype=float)
+    return out
+
+
+#five range queries, no per day work in python beyond building the index arrays
+def load_daily_series(connection: sqlite3.Connection, start: dt_date, end: dt_date) -> DailySeries:
+    days = max(0, (end - start).days)
+    start_iso, end_iso = start.isoformat(), end.isoformat()
+    series = DailySeries(start=start, days=days)
+
+    journal = get_journal_mood_sleep_for_range(connection, start_iso, end_iso)
+    index = _day_index(start, [row[0] for row in journal])
+    series.values['mood'] = _scatter(days, index, [np.nan if row[1] is None else row[1] for row in journal])
+    series.values['sleep'] = _scatter(days, index, [np.nan if row[2] is None else row[2] for row in journal])
+
+    #days before the first logged habit are unknown rather than 0%
+    total, done_by_day = get_daily_habit_stats_for_range(connection, start_iso, end_iso)
+    habits = np.full(days, np.nan)
+    if total and done_by_day:
+        index = _day_index(start, list(done_by_day))
+        habits = _scatter(days, index, np.fromiter(done_by_day.values(), dtype=float) / total)
+        first = int(index.min())
+        habits[first:] = np.nan_to_num(habits[first:], nan=0.0)
+    series.values['habits'] = habits
+
+    todo_stats = get_todo_stats_for_range(connection, start_iso, end_iso)
+    index = _day_index(start, list(todo_stats))
+    pairs = np.array(list(todo_stats.values()), dtype=float).reshape(-1, 2)
+    series.values['todos'] = _scatter(days, index, pairs[:, 0] / np.maximum(pairs[:, 1], 1))
+
+    #expenses are negative amounts, spend is their positive net
+    #after the first transaction a day without any spent 0
+    last_iso = (end - timedelta(days=1)).isoformat()
+    cashflow = get_timeseries_data(connection, start_iso, last_iso, 'day')
+    index = _day_index(start, [row['label'] for row in cashflow])
+    spend = _scatter(days, index, [-(row['income'] + row['expenses']) for row in cashflow])
+    if len(index):
+        first = int(index.min())
+        spend[first:] = np.nan_to_num(spend[first:], nan=0.0)
+    series.values['spend'] = spend
+
+    return series
+
+
+def _pearson(a: np.ndarray, b: np.ndarray) -> tuple[float | None, int]:
+    mask = ~(np.isnan(a) | np.isnan(b))
+    n = int(mask.sum())
+    if n < MIN_SAMPLES:
+        return None, n
+
+    x = a[mask] - a[mask].mean()
+    y = b[mask] - b[mask].mean()
+    denom = np.sqrt((x * x).sum() * (y * y).sum())
+    if denom == 0:
+        return None, n
+    return float((x * y).sum() / denom), n
+
+
+#pairwise correlation with NaN days dropped per pair -> {(a, b): (r or None, samples)}
+def correlations(series: DailySeries) -> dict[tuple[str, str], tuple[float | None, int]]:
+    result = {}
+    for i, a in enumerate(SERIES):
+        for b in SERIES[i + 1:]:
+            result[(a, b)] = _pearson(series.values[a], series.values[b])
+    return result
+
+
+#driver on day t against mood on day t + lag -> {driver: [(lag, r or None, samples), ...]}
+def lagged_effects(series: DailySeries, target: str = 'mood', max_lag: int = MAX_LAG) -> dict[str, list[tuple]]:
+    y = series.values[target]
+    result = {}
+    for name in SERIES:
+        if name == target:
+            continue
+        x = series.values[name]
+        rows = []
+        for lag in range(1, max_lag + 1):
+            if lag >= series.days:
+                break
+            r, n = _pearson(x[:-lag], y[lag:])
+            rows.append((lag, r, n))
+        result[name] = rows
+    return result
+
+
+#mean per weekday ignoring NaN days -> {name: array of 7 (NaN where there is no data)}
+def weekday_profiles(series: DailySeries) -> dict[str, np.ndarray]:
+    weekdays = series.weekdays
+    result = {}
+    for name in SERIES:
+        values = series.values[name]
+        mask = ~np.isnan(values)
+        sums = np.bincount(weekdays[mask], weights=values[mask], minlength=7)
+        counts = np.bincount(weekdays[mask], minlength=7)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[name] = np.where(counts > 0, sums / counts, np.nan)
+    return result
+
+
+@dataclass
+class Insights:
+    start: dt_date
+    end: dt_date
+    samples: dict[str, int]
+    correlations: dict[tuple[str, str], tuple[float | None, int]]
+    lagged: dict[str, list[tuple]]
+    weekdays: dict[str, np.ndarray]
+
+
+def compute_insights(connection: sqlite3.Connection, start: dt_date, end: dt_date) -> Insights:
+    series = load_daily_series(connection, start, end)
+    return Insights(
+        start=start,
+        end=end,
+        samples={name: int((~np.isnan(series.values[name])).sum()) for name in SERIES},
+        correlations=correlations(series),
+        lagged=lagged_effects(series),
+        weekdays=weekday_profiles(series),
+    )
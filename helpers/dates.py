@@ -1,6 +1,9 @@
-from datetime import date
+from datetime import date, timedelta
 import calendar
 
+#short weekday labels, monday first like date.weekday()
+WEEKDAY_NAMES = ['Mo', 'Tu', 'We', 'Th', 'Fr', 'Sa', 'Su']
+
 def last_day_of_month(year: int, month: int) -> date:
     last_day = calendar.monthrange(year, month)[1]
     return date(year, month, last_day)
@@ -21,3 +24,8 @@ def month_range(year: int, month: int):
     else:
         end = date(year, month + 1, 1)
     return start, end
+
+#monday of the week, as iso string
+def week_start(day: str) -> str:
+    value = date.fromisoformat(day)
+    return (value - timedelta(days=value.weekday())).isoformat()
@@ -1,10 +1,14 @@
+import time
+
 from db.core import connect_db
+from helpers import profiling
 
 #to use every time when a db session is to be created
 #added to seperate db session creation from UI
 class DBSession:
     def __enter__(self):
         self.conn = connect_db()
+        self.started = time.perf_counter()
         return self.conn
 
     def __exit__(self, exc_type, exc, tb):
@@ -14,6 +18,7 @@ class DBSession:
             else:
                 self.conn.rollback()
         finally:
+            profiling.record('db_session', time.perf_counter() - self.started)
             self.conn.close()
 
 def db_session():
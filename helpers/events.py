@@ -0,0 +1,160 @@
+import threading
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+
+from helpers.dates import week_start
+
+
+#in-process change notifications: the db write helpers publish one event per committed write,
+#caches and views subscribe to the event types they depend on and drop only the affected slice
+#handlers run synchronously on the publishing thread (the journal writer publishes from its worker),
+#ui code should subscribe through ui.event_relay.EventRelay which hands events to the gui thread
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    #table group for db.versions, see db.versions.TABLES
+    table = ''
+
+
+#days holds every date the write touched (old and new date on a move), None stands for the backlog
+@dataclass(frozen=True)
+class TodosChanged(ChangeEvent):
+    days: tuple[str | None, ...] = ()
+    table = 'todos'
+
+
+#habit definitions (created, edited, (de)activated, deleted); None means any habit
+@dataclass(frozen=True)
+class HabitsChanged(ChangeEvent):
+    habit_id: int | None = None
+    table = 'habits'
+
+
+#day_done / week_done are the state after the write (day logged, week target reached) when the
+#writer knows it, the streak cache then updates its runs instead of rebuilding them; None means unknown
+@dataclass(frozen=True)
+class HabitLogChanged(ChangeEvent):
+    habit_id: int = 0
+    day: str = ''
+    day_done: bool | None = None
+    week_done: bool | None = None
+    table = 'habits'
+
+    #monday of the logged week, weekly progress and weekly streaks are scoped by it
+    @property
+    def week(self) -> str:
+        return week_start(self.day)
+
+
+@dataclass(frozen=True)
+class JournalChanged(ChangeEvent):
+    day: str = ''
+    table = 'journal'
+
+
+#inclusive date range of the touched transactions, None bounds mean open ended
+@dataclass(frozen=True)
+class TransactionsChanged(ChangeEvent):
+    start: str | None = None
+    end: str | None = None
+    table = 'finance'
+
+    def overlaps(self, start: str | None, end: str | None) -> bool:
+        if self.start is not None and end is not None and self.start > end:
+            return False
+        if self.end is not None and start is not None and self.end < start:
+            return False
+        return True
+
+
+@dataclass(frozen=True)
+class RecurringRulesChanged(ChangeEvent):
+    rule_id: int | None = None
+    table = 'finance'
+
+
+@dataclass(frozen=True)
+class CurrencyRatesChanged(ChangeEvent):
+    currency: str = ''
+    table = 'finance'
+
+
+@dataclass(frozen=True)
+class XpChanged(ChangeEvent):
+    table = 'xp'
+
+
+@dataclass(frozen=True)
+class AchievementsChanged(ChangeEvent):
+    table = 'achievements'
+
+
+@dataclass(frozen=True)
+class SettingChanged(ChangeEvent):
+    key: str = ''
+    table = 'settings'
+
+
+#a write this process did not make (another process, a restored backup), nothing can be scoped
+@dataclass(frozen=True)
+class ExternalChange(ChangeEvent):
+    pass
+
+
+_lock = threading.Lock()
+_handlers: list[tuple[type, Callable[[ChangeEvent], None]]] = []
+
+#per thread queue while a deferred() block is open
+_local = threading.local()
+
+
+#handler(event) is called for every published event that is an instance of event_type
+def subscribe(event_type: type, handler: Callable[[ChangeEvent], None]) -> None:
+    with _lock:
+        _handlers.append((event_type, handler))
+
+
+def unsubscribe(handler: Callable[[ChangeEvent], None]) -> None:
+    with _lock:
+        _handlers[:] = [(t, h) for t, h in _handlers if h != handler]
+
+
+#for writes spanning several helpers in one transaction: events published inside the block are held
+#back and delivered after it exits (so after its commit), and dropped if it raises (rolled back)
+#usage: with deferred(), connection: ...
+@contextmanager
+def deferred():
+    if getattr(_local, 'queue', None) is not None:
+        #nested, the outer block delivers
+        yield
+        return
+
+    queue: list[ChangeEvent] = []
+    _local.queue = queue
+    try:
+        yield
+    finally:
+        _local.queue = None
+
+    for event in queue:
+        publish(event)
+
+
+#a failing subscriber must not break the write that published, so errors are only printed
+def publish(event: ChangeEvent) -> None:
+    queue = getattr(_local, 'queue', None)
+    if queue is not None:
+        queue.append(event)
+        return
+
+    with _lock:
+        handlers = [h for t, h in _handlers if isinstance(event, t)]
+
+    for handler in handlers:
+        try:
+            handler(event)
+        except Exception:
+            traceback.print_exc()
@@ -0,0 +1,114 @@
+import threading
+import time
+import traceback
+
+from helpers.db import db_session
+from actions.actions import save_journal_fields
+
+
+#write-behind queue for the journal autosave
+#the ui submits the full field state per day, the worker thread diffs it against what was
+#last persisted and writes only the changed columns; submits that arrive while a write is
+#running overwrite each other, so a burst of edits turns into a single write
+#a failed write goes back into the queue and is retried after retry_delay seconds
+class JournalWriter:
+    #consecutive failed writes after which flush() gives up waiting and raises
+    FLUSH_MAX_FAILURES = 3
+
+    def __init__(self, retry_delay: float = 1.0):
+        self._cond = threading.Condition()
+        self._persisted: dict[str, dict] = {}
+        self._pending: dict[str, dict] = {}
+        self._busy = False
+        self._closed = False
+        self._retry_delay = retry_delay
+        self._failures = 0
+        self._error: Exception | None = None
+
+        self._thread = threading.Thread(target=self._run, name='journal-writer', daemon=True)
+        self._thread.start()
+
+    #state as loaded from the db, the baseline for the next diff
+    def remember(self, day: str, fields: dict) -> None:
+        with self._cond:
+            if day not in self._pending:
+                self._persisted[day] = dict(fields)
+
+    def submit(self, day: str, fields: dict) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._pending[day] = dict(fields)
+            self._cond.notify_all()
+
+    #blocks until everything submitted so far is on disk
+    #raises the last error when the write keeps failing, the edits stay queued for the next retry
+    def flush(self) -> None:
+        with self._cond:
+            while self._pending or self._busy:
+                if self._failures >= self.FLUSH_MAX_FAILURES:
+                    raise self._error
+                self._cond.wait()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+
+                batch = self._pending
+                self._pending = {}
+                self._busy = True
+
+                changes = {}
+                for day, fields in batch.items():
+                    before = self._persisted.get(day, {})
+                    diff = {k: v for k, v in fields.items() if v is not None and before.get(k) != v}
+                    if diff:
+                        changes[day] = diff
+
+            try:
+                if changes:
+                    with db_session() as connection:
+                        for day, diff in changes.items():
+                            save_journal_fields(connection, day, diff)
+            except Exception as error:
+                traceback.print_exc()
+                with self._cond:
+                    #the baseline is unchanged, so the requeued state diffs to the same columns again
+                    #days submitted again in the meantime already carry the newer state
+                    for day, fields in batch.items():
+                        self._pending.setdefault(day, fields)
+                    self._failures += 1
+                    self._error = error
+                    self._busy = False
+                    self._cond.notify_all()
+
+                    deadline = time.monotonic() + self._retry_delay
+                    while not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    if self._closed:
+                        return
+                continue
+
+            with self._cond:
+                for day, diff in changes.items():
+                    self._persisted.setdefault(day, {}).update(diff)
+                self._failures = 0
+                self._error = None
+                self._busy = False
+                self._cond.notify_all()
@@ -0,0 +1,221 @@
+import atexit
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+
+#opt-in instrumentation: PLANNER_PROFILE=1 in the environment or the 'profile' setting set to 1
+#while on, every connection from connect_db times its statements, view refreshes / showEvents, background loads
+#and the startup phases are timed, and a report is written to data/profile_report.txt on exit
+#while off, all hooks are a single flag check
+ENV_VAR = 'PLANNER_PROFILE'
+SETTING_KEY = 'profile'
+REPORT_PATH = Path('data') / 'profile_report.txt'
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+REPORT_ROWS = 25
+
+_enabled = False
+_lock = threading.Lock()
+
+#normalized sql -> [count, seconds]
+_statements: dict[str, list] = {}
+#name -> [calls, seconds, max seconds]
+_timings: dict[str, list] = {}
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(report_path: Path = REPORT_PATH) -> None:
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+    atexit.register(write_report, report_path)
+
+
+#turns profiling on from the env var or the settings key, the connection is only needed for the latter
+def configure(connection=None) -> bool:
+    value = os.environ.get(ENV_VAR)
+    if value is None and connection is not None:
+        from db.settings import get_setting
+        value = get_setting(connection, SETTING_KEY)
+
+    if value and value.strip().lower() in TRUE_VALUES:
+        enable()
+    return _enabled
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+#literals are folded to ? so the same query with different ids ends up in one row
+#(that's what makes N+1 loops stand out), statements built with f-strings included
+def normalize_sql(sql: str) -> str:
+    sql = _LITERALS.sub('?', sql)
+    sql = _IN_LISTS.sub('(?, …)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+#count=0 adds the time spent fetching the rows of a statement that was already counted
+def record_statement(sql: str, seconds: float, count: int = 1) -> None:
+    with _lock:
+        entry = _statements.setdefault(sql, [0, 0.0])
+        entry[0] += count
+        entry[1] += seconds
+
+
+def record(name: str, seconds: float) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        entry = _timings.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+
+#each statement is timed around its execute and every fetch of its rows, so the time of a row is
+#charged to the statement that produced it; what python does with the rows in between is not
+#statements sqlite runs on its own (triggers, fts shadow tables) count towards the one that fired them
+class ProfilingCursor(sqlite3.Cursor):
+    sql: str | None = None
+
+    def _timed(self, sql: str, call, *args):
+        self.sql = normalize_sql(sql)
+        started = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            record_statement(self.sql, time.perf_counter() - started)
+
+    def _fetched(self, started: float) -> None:
+        if self.sql is not None:
+            record_statement(self.sql, time.perf_counter() - started, count=0)
+
+    def execute(self, sql, parameters=()):
+        return self._timed(sql, super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(sql, super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._timed(sql_script, super().executescript, sql_script)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._fetched(started)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self._fetched(started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._fetched(started)
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return super().__next__()
+        finally:
+            self._fetched(started)
+
+
+#Connection.execute and friends create their cursor in C and skip the cursor's python methods,
+#so they are routed through cursor() here
+class ProfilingConnection(sqlite3.Connection):
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+#factory for sqlite3.connect, connections opened before profiling was turned on stay untimed
+def connection_factory() -> type[sqlite3.Connection]:
+    return ProfilingConnection if _enabled else sqlite3.Connection
+
+
+@contextmanager
+def timed(name: str):
+    if not _enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+#for view methods (refresh, showEvent), recorded as ClassName.method
+def profiled(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not _enabled:
+            return method(self, *args, **kwargs)
+        with timed(f'{type(self).__name__}.{method.__name__}'):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def format_report() -> str:
+    with _lock:
+        statements = [(sql, count, seconds) for sql, (count, seconds) in _statements.items()]
+        timings = [(name, calls, seconds, longest) for name, (calls, seconds, longest) in _timings.items()]
+
+    lines = []
+
+    lines.append('slowest code paths (total ms, calls, avg ms, max ms)')
+    for name, calls, seconds, longest in sorted(timings, key=lambda t: t[2], reverse=True):
+        lines.append(
+            f'{seconds * 1000:10.1f} {calls:7d} {seconds * 1000 / calls:9.2f} {longest * 1000:9.2f}  {name}'
+        )
+
+    lines.append('')
+    lines.append('hot statements by total time (total ms, count, avg ms)')
+    for sql, count, seconds in sorted(statements, key=lambda s: s[2], reverse=True)[:REPORT_ROWS]:
+        lines.append(f'{seconds * 1000:10.1f} {count:7d} {seconds * 1000 / count:9.3f}  {sql[:200]}')
+
+    #a statement run hundreds of times per refresh is a loop issuing one query per row
+    lines.append('')
+    lines.append('most frequent statements (count, total ms)')
+    for sql, count, seconds in sorted(statements, key=lambda s: s[1], reverse=True)[:REPORT_ROWS]:
+        lines.append(f'{count:7d} {seconds * 1000:10.1f}  {sql[:200]}')
+
+    total_count = sum(s[1] for s in statements)
+    total_seconds = sum(s[2] for s in statements)
+    lines.append('')
+    lines.append(f'{total_count} statements, {len(statements)} distinct, {total_seconds * 1000:.1f} ms')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_report(path: Path = REPORT_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(format_report(), encoding='utf-8')
@@ -0,0 +1,30 @@
+import sqlite3
+
+import pytest
+
+from actions import achievements
+from db.core import init_db
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(':memory:')
+    connection.row_factory = sqlite3.Row
+    init_db(connection)
+    yield connection
+    connection.close()
+
+
+#the startup sweep runs once per rule set, new data is covered by the per-event evaluation
+def test_startup_sweep_runs_only_when_rules_change(connection, monkeypatch):
+    sweeps = []
+    sweep = achievements.evaluate_all_achievements
+    monkeypatch.setattr(achievements, 'evaluate_all_achievements', lambda *a: sweeps.append(1) or sweep(*a))
+
+    achievements.evaluate_achievements_if_rules_changed(connection)
+    achievements.evaluate_achievements_if_rules_changed(connection)
+    assert len(sweeps) == 1
+
+    connection.execute("UPDATE achievements SET threshold = 3 WHERE id = 'level_5'")
+    achievements.evaluate_achievements_if_rules_changed(connection)
+    assert len(sweeps) == 2
@@ -0,0 +1,100 @@
+import sqlite3
+
+import pytest
+
+from db.core import init_db
+from db.journal import (
+    save_journal_entry,
+    update_journal_fields,
+    search_journal,
+    compression_enabled,
+    COMPRESS_MIN_BYTES,
+    COMPRESSION_SETTING,
+    SNIPPET_START,
+    SNIPPET_END,
+)
+from db.journal_compression import set_journal_compression
+
+
+LONG_TEXT = 'walked along the harbour ' * (COMPRESS_MIN_BYTES // 10)
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(':memory:')
+    connection.row_factory = sqlite3.Row
+    init_db(connection)
+    yield connection
+    connection.close()
+
+
+def found(connection, query: str) -> list[str]:
+    results, _ = search_journal(connection, query)
+    return [row['date'] for row in results]
+
+
+#the triggers need no app functions, plain sql from any client keeps plain rows in sync
+def test_raw_sql_writes_update_the_index(connection):
+    connection.execute("INSERT INTO journal (date, text) VALUES ('2024-03-01', 'lighthouse')")
+    assert found(connection, 'lighthouse') == ['2024-03-01']
+
+    connection.execute("UPDATE journal SET text = 'breakwater' WHERE date = '2024-03-01'")
+    assert found(connection, 'lighthouse') == []
+    assert found(connection, 'breakwater') == ['2024-03-01']
+
+    connection.execute("DELETE FROM journal WHERE date = '2024-03-01'")
+    assert found(connection, 'breakwater') == []
+
+
+def test_compressed_entries_stay_searchable(connection):
+    save_journal_entry(connection, '2024-03-01', 'short note', remember=LONG_TEXT)
+    set_journal_compression(connection, True)
+    assert connection.execute("SELECT compressed FROM journal").fetchone()[0] != 0
+    assert found(connection, 'harbour') == ['2024-03-01']
+
+    #writing another column reindexes the row, the compressed one must keep its text
+    update_journal_fields(connection, '2024-03-01', {'text': 'different note'})
+    assert found(connection, 'harbour') == ['2024-03-01']
+    assert found(connection, 'different') == ['2024-03-01']
+
+    set_journal_compression(connection, False)
+    assert found(connection, 'harbour') == ['2024-03-01']
+
+
+def test_rewrites_leave_no_stale_tokens(connection):
+    save_journal_entry(connection, '2024-03-01', 'short note', remember=LONG_TEXT)
+    set_journal_compression(connection, True)
+    update_journal_fields(connection, '2024-03-01', {'remember': 'plain again'})
+    update_journal_fields(connection, '2024-03-01', {'text': LONG_TEXT})
+
+    assert found(connection, 'short') == []
+    assert found(connection, 'plain') == ['2024-03-01']
+    assert found(connection, 'harbour') == ['2024-03-01']
+
+
+def test_snippet_marks_matches_in_decoded_text(connection):
+    save_journal_entry(connection, '2024-03-01', 'nothing here', remember='Met Ärne at the café by the lighthouse')
+    set_journal_compression(connection, True)
+    save_journal_entry(connection, '2024-03-02', LONG_TEXT)
+
+    (first,), _ = search_journal(connection, 'arne cafe')
+    assert first['snippet'] == f'Met {SNIPPET_START}Ärne{SNIPPET_END} at the {SNIPPET_START}café{SNIPPET_END} by the lighthouse'
+
+    (second,), _ = search_journal(connection, 'harb')
+    assert second['date'] == '2024-03-02'
+    assert second['snippet'].startswith(f'…along the {SNIPPET_START}harbour{SNIPPET_END} walked')
+    assert second['snippet'].endswith('…')
+
+
+#the compression flag is cached per database file, not once for the process
+def test_compression_setting_is_per_database(tmp_path):
+    enabled = {}
+    for name, value in (('on.db', '1'), ('off.db', '0')):
+        connection = sqlite3.connect(tmp_path / name)
+        connection.row_factory = sqlite3.Row
+        init_db(connection)
+        connection.execute("INSERT INTO settings (key, value) VALUES (?, ?)", (COMPRESSION_SETTING, value))
+        connection.commit()
+        enabled[name] = compression_enabled(connection)
+        connection.close()
+    assert enabled == {'on.db': True, 'off.db': False}
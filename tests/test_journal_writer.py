@@ -0,0 +1,54 @@
+import sqlite3
+from contextlib import nullcontext
+
+import pytest
+
+from helpers import journal_writer
+from helpers.journal_writer import JournalWriter
+
+
+#save_journal_fields stand-in that hits a locked db on its first call
+class FailingOnce:
+    def __init__(self):
+        self.calls = 0
+        self.written = []
+
+    def __call__(self, connection, day, fields):
+        self.calls += 1
+        if self.calls == 1:
+            raise sqlite3.OperationalError('database is locked')
+        self.written.append((day, fields))
+
+
+@pytest.fixture
+def save(monkeypatch):
+    fake = FailingOnce()
+    monkeypatch.setattr(journal_writer, 'db_session', lambda: nullcontext(None))
+    monkeypatch.setattr(journal_writer, 'save_journal_fields', fake)
+    return fake
+
+
+def test_failed_write_is_retried_before_flush_returns(save):
+    writer = JournalWriter(retry_delay=0.01)
+    writer.remember('2024-03-01', {'text': '', 'mood': None})
+    writer.submit('2024-03-01', {'text': 'hello', 'mood': 3})
+    writer.flush()
+    writer.close()
+
+    assert save.calls == 2
+    assert save.written == [('2024-03-01', {'text': 'hello', 'mood': 3})]
+
+
+def test_flush_raises_when_writes_keep_failing(monkeypatch):
+    def locked(connection, day, fields):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(journal_writer, 'db_session', lambda: nullcontext(None))
+    monkeypatch.setattr(journal_writer, 'save_journal_fields', locked)
+
+    writer = JournalWriter(retry_delay=0.01)
+    writer.submit('2024-03-01', {'text': 'hello'})
+    with pytest.raises(sqlite3.OperationalError):
+        writer.flush()
+    with pytest.raises(sqlite3.OperationalError):
+        writer.close()
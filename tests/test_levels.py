@@ -0,0 +1,75 @@
+import timeit
+
+import pytest
+
+from db.xp import level_for_total_xp, xp_needed_for_level, xp_needed_for_next_level
+
+
+#the old float loop (round(needed * 1.2)) the integer table replaced; past level ~170 the steps
+#reach 2^51 and the float products start losing digits, so parity is only checked below that
+PARITY_LEVELS = 150
+
+
+def reference_step(level: int) -> int:
+    needed = 100
+    for _ in range(level - 1):
+        needed = int(round(needed * 1.2))
+    return needed
+
+
+def reference_level(total_xp: int) -> tuple[int, int, int]:
+    level = 1
+    remaining = total_xp
+    while True:
+        step = reference_step(level)
+        if remaining >= step:
+            remaining -= step
+            level += 1
+        else:
+            return (level, remaining, step)
+
+
+def test_steps_match_float_formula():
+    for level in range(1, PARITY_LEVELS + 1):
+        assert xp_needed_for_next_level(level) == reference_step(level)
+        assert xp_needed_for_level(level + 1) == reference_step(level)
+
+
+def test_level_for_total_xp_matches_loop():
+    threshold = 0
+    for level in range(1, PARITY_LEVELS):
+        step = reference_step(level)
+        for total_xp in (threshold, threshold + step // 2, threshold + step - 1):
+            assert level_for_total_xp(total_xp) == reference_level(total_xp)
+        threshold += step
+
+
+@pytest.mark.parametrize('total_xp', [-5, 0])
+def test_level_for_total_xp_floor(total_xp):
+    assert level_for_total_xp(total_xp) == (1, 0, 100)
+
+
+#total xp at which a level starts, the table grows lazily to cover it
+def total_xp_at(level: int) -> int:
+    return sum(xp_needed_for_next_level(n) for n in range(1, level))
+
+
+#bisect over the threshold table: a lookup at level 10 000 costs about the same as at level 5
+def benchmark(levels=(5, 100, 1000, 10_000), number=20_000) -> dict[int, float]:
+    results = {}
+    for level in levels:
+        total_xp = total_xp_at(level)
+        assert level_for_total_xp(total_xp)[0] == level
+        seconds = min(timeit.repeat(lambda: level_for_total_xp(total_xp), number=number, repeat=5))
+        results[level] = seconds / number
+    return results
+
+
+def test_lookup_time_is_flat():
+    results = benchmark()
+    assert results[10_000] < results[5] * 10
+
+
+if __name__ == '__main__':
+    for level, seconds in benchmark().items():
+        print(f'level {level:6d}  {seconds * 1e6:6.2f} us per level_for_total_xp')
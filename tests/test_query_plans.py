@@ -0,0 +1,56 @@
+import sqlite3
+
+import pytest
+
+from db.core import init_db
+from db.xp import list_recent_xp_events
+from db.achievements import list_latest_unlocked
+from db.finance import get_transaction_extremes
+
+
+#the recency lists on home and the progression tab must walk their created_at / unlocked_at index
+#backwards and stop after LIMIT rows; a temp b-tree means every row gets sorted again
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(':memory:')
+    connection.row_factory = sqlite3.Row
+    init_db(connection)
+    yield connection
+    connection.close()
+
+
+def query_plan(connection, sql: str, params=()) -> str:
+    rows = connection.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+    return '\n'.join(row['detail'] for row in rows)
+
+
+#records the sql a helper runs, so the test checks the query the app actually uses
+def traced_sql(connection, fn, *args) -> str:
+    statements = []
+    connection.set_trace_callback(statements.append)
+    try:
+        fn(connection, *args)
+    finally:
+        connection.set_trace_callback(None)
+    return next(s for s in statements if s.lstrip().upper().startswith('SELECT'))
+
+
+def test_recent_xp_events_use_created_at_index(connection):
+    plan = query_plan(connection, traced_sql(connection, list_recent_xp_events, 10))
+    assert 'USE TEMP B-TREE' not in plan
+    assert 'index_xp_events_created_at' in plan
+
+
+def test_latest_unlocked_use_unlocked_at_index(connection):
+    plan = query_plan(connection, traced_sql(connection, list_latest_unlocked, 2))
+    assert 'USE TEMP B-TREE' not in plan
+    assert 'index_achievements_unlocked_at' in plan
+
+
+#the amount filter bounds: each of MIN and MAX has to be a single seek, a SCAN reads the whole index
+def test_transaction_extremes_seek_amount_index(connection):
+    plan = query_plan(connection, traced_sql(connection, get_transaction_extremes))
+    assert 'SCAN transactions' not in plan
+    assert plan.count('SEARCH transactions USING COVERING INDEX index_tx_amount') == 2
@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+from db.core import init_db
+from db.todos import (
+    register_todo_functions,
+    insert_todo,
+    query_todos,
+    has_todo_search_index,
+    set_todo_completed,
+    todo_sort_key,
+)
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(':memory:')
+    connection.row_factory = sqlite3.Row
+    register_todo_functions(connection)
+    init_db(connection)
+    for title in ('Äpfel kaufen', 'Ölwechsel', 'Call Bob', '50% off_sale'):
+        insert_todo(connection, title)
+    yield connection
+    connection.close()
+
+
+def titles(connection, search: str) -> list[str]:
+    todos, _ = query_todos(connection, search)
+    return sorted(t['title'] for t in todos)
+
+
+#short searches skip the trigram index, they must fold case the same way it does
+@pytest.mark.parametrize('search, expected', [
+    ('ä', ['Äpfel kaufen']),
+    ('öl', ['Ölwechsel']),
+    ('CA', ['Call Bob']),
+    ('%', ['50% off_sale']),
+    ('_', ['50% off_sale']),
+])
+def test_short_search_is_case_insensitive(connection, search, expected):
+    assert titles(connection, search) == expected
+
+
+def test_long_search_uses_trigram_index(connection):
+    if not has_todo_search_index(connection):
+        pytest.skip('sqlite built without the trigram tokenizer')
+    assert titles(connection, 'äpf') == ['Äpfel kaufen']
+    assert titles(connection, 'ÖLW') == ['Ölwechsel']
+
+
+#the manager places toggled rows with todo_sort_key, it has to agree with the sql ordering and cursor
+@pytest.mark.parametrize('mode', ['all', 'backlog'])
+def test_sort_key_matches_query_order(connection, mode):
+    insert_todo(connection, 'Dentist', '2024-05-02')
+    insert_todo(connection, 'Taxes', '2024-04-30')
+    set_todo_completed(connection, 1, True)
+    set_todo_completed(connection, 5, True)
+
+    todos, cursor = query_todos(connection, mode=mode, limit=2)
+    rest, _ = query_todos(connection, mode=mode, cursor=cursor)
+    keys = [todo_sort_key(t) for t in todos + rest]
+
+    assert keys == sorted(keys)
+    assert cursor == keys[1]
@@ -0,0 +1,27 @@
+import sqlite3
+
+import pytest
+
+from db.core import init_db
+from db.xp import add_xp_event, get_total_xp
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(':memory:')
+    connection.row_factory = sqlite3.Row
+    init_db(connection)
+    yield connection
+    connection.close()
+
+
+def test_once_only_rewards_are_skipped(connection):
+    assert add_xp_event(connection, 'journal_written', 10, 'Journal', None, '2024-03-01') is not None
+    assert add_xp_event(connection, 'journal_written', 10, 'Journal', None, '2024-03-01') is None
+    assert get_total_xp(connection) == 10
+
+
+#only the once-only index is a tolerated conflict, broken rows still fail loudly
+def test_constraint_errors_still_raise(connection):
+    with pytest.raises(sqlite3.IntegrityError):
+        add_xp_event(connection, 'journal_written', None, 'Journal', None, '2024-03-01')
@@ -0,0 +1,144 @@
+import traceback
+from typing import Any, Callable
+
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtWidgets import QWidget, QMessageBox
+
+from helpers.db import db_session
+from helpers.profiling import timed
+
+
+#runs db reads on the thread pool so slow queries never block the window
+#each load opens its own connection on the worker thread (sqlite connections are per thread),
+#and the result comes back to the gui thread through a queued signal
+#a new load() on the same loader supersedes the previous one, results of older generations are dropped
+#loads can carry a key (view parameters + db.versions counters), is_fresh(key) tells the view
+#that exactly this data is already on screen or on the way, so it can skip the reload
+
+
+#loads are lambdas or bound methods, the qualname tells which view they belong to
+def _name(fn) -> str:
+    return getattr(fn, '__qualname__', repr(fn))
+
+
+class _TaskSignals(QObject):
+    finished = Signal(int, object)  # generation, result
+    failed = Signal(int, str)       # generation, traceback
+
+
+class _LoadTask(QRunnable):
+    def __init__(self, generation: int, fn: Callable[[Any], Any], signals: _TaskSignals):
+        super().__init__()
+        self.generation = generation
+        self.fn = fn
+        self.signals = signals
+
+    def run(self) -> None:
+        try:
+            with timed(f'load {_name(self.fn)}'), db_session() as connection:
+                result = self.fn(connection)
+        except Exception:
+            self.signals.failed.emit(self.generation, traceback.format_exc())
+            return
+        self.signals.finished.emit(self.generation, result)
+
+
+class AsyncLoader(QObject):
+    def __init__(self, view: QWidget):
+        super().__init__(view)
+        self._view = view
+        self._generation = 0
+        self._pending: dict[int, tuple] = {}
+        self._loading_key = None
+        self._rendered_key = None
+
+    def is_loading(self) -> bool:
+        return self._generation in self._pending
+
+    def is_fresh(self, key) -> bool:
+        if key is None:
+            return False
+        if self.is_loading():
+            return key == self._loading_key
+        return key == self._rendered_key
+
+    #the view patched its rows itself after a write, what is on screen now matches key
+    #ignored while a load is in flight, its result predates the write
+    def mark_fresh(self, key) -> None:
+        if not self.is_loading():
+            self._rendered_key = key
+
+    #forces the next load even when the key didn't change
+    def invalidate(self) -> None:
+        self._rendered_key = None
+
+    #fn(connection) runs on a worker and must only read the db (writes stay on the gui thread),
+    #on_done(result) runs on the gui thread
+    def load(
+        self,
+        fn: Callable[[Any], Any],
+        on_done: Callable[[Any], None],
+        on_error: Callable[[str], None] | None = None,
+        key=None,
+    ) -> int:
+        self._generation += 1
+        generation = self._generation
+        self._loading_key = key
+
+        signals = _TaskSignals()
+        signals.finished.connect(self._on_finished, Qt.QueuedConnection)
+        signals.failed.connect(self._on_failed, Qt.QueuedConnection)
+
+        #the signals object has to outlive the task, it is dropped once the result arrived
+        self._pending[generation] = (signals, on_done, on_error, key)
+        self._set_loading(True)
+
+        QThreadPool.globalInstance().start(_LoadTask(generation, fn, signals))
+        return generation
+
+    #drops whatever is in flight, the workers finish but their results are ignored
+    def cancel(self) -> None:
+        self._generation += 1
+        self._loading_key = None
+        self._set_loading(False)
+
+    #returns the callbacks for the current generation, None for superseded ones
+    def _take(self, generation: int):
+        entry = self._pending.pop(generation, None)
+        if generation != self._generation:
+            return None
+        self._set_loading(False)
+        return entry
+
+    def _on_finished(self, generation: int, result) -> None:
+        entry = self._take(generation)
+        if entry is None:
+            return
+        _signals, on_done, _on_error, key = entry
+        #unkeyed loads (paging) add to what is on screen and keep its key
+        if key is not None:
+            self._rendered_key = key
+        with timed(f'render {_name(on_done)}'):
+            on_done(result)
+
+    def _on_failed(self, generation: int, error: str) -> None:
+        entry = self._take(generation)
+        if entry is None:
+            return
+        _signals, _on_done, on_error, _key = entry
+        self._rendered_key = None
+        if on_error is not None:
+            on_error(error)
+            return
+
+        #same as the other failures in the ui: a message box with the error, the traceback as details
+        box = QMessageBox(QMessageBox.Critical, 'Loading failed', error.strip().splitlines()[-1], parent=self._view)
+        box.setDetailedText(error)
+        box.exec()
+
+    #lightweight loading state: busy cursor over the view while its data is on the way
+    def _set_loading(self, loading: bool) -> None:
+        if loading:
+            self._view.setCursor(Qt.BusyCursor)
+        else:
+            self._view.unsetCursor()
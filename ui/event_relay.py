@@ -0,0 +1,25 @@
+from typing import Callable
+
+from PySide6.QtCore import Qt, QObject, Signal
+
+from helpers.events import ChangeEvent, subscribe, unsubscribe
+
+
+#hands change events from helpers.events to a widget on the gui thread
+#events published on the gui thread are delivered right away, so a view that writes and then
+#refreshes already sees its own change; events from worker threads (journal writer) are queued
+#the subscription ends when the owning widget is destroyed
+class EventRelay(QObject):
+    received = Signal(object)
+
+    def __init__(self, owner: QObject, handler: Callable[[ChangeEvent], None], *event_types: type):
+        super().__init__(owner)
+        self.received.connect(handler, Qt.AutoConnection)
+
+        forward = self._forward
+        for event_type in event_types:
+            subscribe(event_type, forward)
+        self.destroyed.connect(lambda *_: unsubscribe(forward))
+
+    def _forward(self, event: ChangeEvent) -> None:
+        self.received.emit(event)
@@ -11,12 +11,40 @@ from PySide6.QtGui import QPainter, QColor, QCursor, QShowEvent
 
 from datetime import date, timedelta, datetime
 
-from helpers.db import db_session
-from db.finance import get_timeseries_data, list_transactions, sync_recurring_transactions
+from ui.async_loader import AsyncLoader
+from db.versions import versions
+from helpers.profiling import profiled
+from db.finance import get_timeseries_data, list_transactions
+from actions.actions import sync_recurring_if_due
 
 from helpers.currency import format_jpy
 from helpers.dates import last_day_of_month
 
+
+LATEST_LIMIT = 10
+
+
+#runs on the loader's worker thread: db reads only, no widgets
+def load_dashboard_data(connection, start_date: str, end_date: str, aggregation: str, exclude_recurring: bool) -> dict:
+    return {
+        'timeseries': get_timeseries_data(
+            connection,
+            start_date,
+            end_date,
+            aggregation,
+            exclude_recurring=exclude_recurring,
+        ),
+        'expenses': list_transactions(
+            connection,
+            start_date=start_date,
+            end_date=end_date,
+            tx_type="Expenses",
+            limit=5000,
+            exclude_recurring=exclude_recurring,
+        ),
+        'latest': list_transactions(connection, tx_type='All', limit=LATEST_LIMIT, exclude_recurring=exclude_recurring),
+    }
+
 class FinanceDashboardView(QWidget):
     def __init__(self):
         super().__init__()
@@ -154,8 +182,8 @@ class FinanceDashboardView(QWidget):
         self.next_btn.clicked.connect(self.shift_next)
         self.hide_recurring_cb.stateChanged.connect(self.hide_recurring_changed)
 
-        # initial
-        self.refresh(self.default_range)
+        # data is loaded on the thread pool, the first load happens in showEvent
+        self.loader = AsyncLoader(self)
 
     # ui helpers
     def make_range_button(self, text: str, checked: bool = False) -> QToolButton:
@@ -240,6 +268,7 @@ class FinanceDashboardView(QWidget):
         self.refresh(self.current_timeframe())
 
     # logic
+    @profiled
     def refresh(self, timeframe: str) -> None:
         start_date, end_date = self.timeframe_to_dates(timeframe, self.window_offset)
         aggregation = self.aggregation_for_timeframe(timeframe)
@@ -248,31 +277,32 @@ class FinanceDashboardView(QWidget):
         self.range_label.setText(self.format_range_label(timeframe, start_date, end_date))
         self.next_btn.setEnabled(self.window_offset > 0)
 
-        with db_session() as connection:
-
-            #recurring up to date
-            sync_recurring_transactions(connection, rule_id=None, up_to_date=end_date)
+        #recurring up to date, here and not in the loader: it writes and publishes change events
+        #(no db access unless the window reaches past the last sync or the rules changed)
+        sync_recurring_if_due(end_date)
 
-            timeseries_data = get_timeseries_data(
-                connection,
-                start_date,
-                end_date,
-                aggregation,
-                exclude_recurring=exclude,
-            )
+        key = (timeframe, start_date, end_date, exclude, versions('finance'))
+        if self.loader.is_fresh(key):
+            return
 
-            keys = agg_keys(start_date, end_date, aggregation)
-            labels = make_labels_unique(short_labels(timeframe, keys, aggregation))
-            tooltips = tooltips_for_agg(keys, aggregation)
+        self.loader.load(
+            lambda connection: load_dashboard_data(connection, start_date, end_date, aggregation, exclude),
+            lambda data: self.render(timeframe, start_date, end_date, aggregation, data),
+            key=key,
+        )
 
-            income, expenses, net = merge_timeseries(keys, timeseries_data)
+    def render(self, timeframe: str, start_date: str, end_date: str, aggregation: str, data: dict) -> None:
+        keys = agg_keys(start_date, end_date, aggregation)
+        labels = make_labels_unique(short_labels(timeframe, keys, aggregation))
+        tooltips = tooltips_for_agg(keys, aggregation)
 
-            self.update_summary(sum(income), sum(expenses))
-            self.update_cashflow_chart(labels, income, expenses, net, tooltips)
+        income, expenses, net = merge_timeseries(keys, data['timeseries'])
 
-            self.update_category_bars(connection, start_date, end_date, exclude_recurring=exclude)
-            self.refresh_latest_transactions(connection=connection, exclude_recurring=exclude)
+        self.update_summary(sum(income), sum(expenses))
+        self.update_cashflow_chart(labels, income, expenses, net, tooltips)
 
+        self.update_category_bars(data['expenses'])
+        self.refresh_latest_transactions(data['latest'])
 
     @staticmethod
     def format_range_label(timeframe: str, start_date: str, end_date: str) -> str:
@@ -433,16 +463,7 @@ class FinanceDashboardView(QWidget):
 
         return chart
 
-    def update_category_bars(self, connection, start_date: str, end_date: str, exclude_recurring: bool) -> None:
-        rows = list_transactions(
-            connection,
-            start_date=start_date,
-            end_date=end_date,
-            tx_type="Expenses",
-            limit=5000,
-            exclude_recurring=exclude_recurring,
-        )
-
+    def update_category_bars(self, rows: list[dict]) -> None:
         totals: dict[str, float] = {}
         total_exp = 0.0
 
@@ -525,11 +546,7 @@ class FinanceDashboardView(QWidget):
         else:
             self.summary_net_value.setStyleSheet('font-size: 22px; font-weight: 800;')
 
-    def refresh_latest_transactions(self, limit: int = 10, connection=None, exclude_recurring: bool = False) -> None:
-       
-
-        rows = list_transactions(connection, tx_type='All', limit=limit, exclude_recurring=exclude_recurring)
-
+    def refresh_latest_transactions(self, rows: list[dict]) -> None:
         self.latest_table.setRowCount(len(rows))
 
         income_color = QColor(0, 120, 215)
@@ -553,6 +570,7 @@ class FinanceDashboardView(QWidget):
             self.latest_table.setItem(i, 3, category_item)
             self.latest_table.setItem(i, 4, info_item)
 
+    @profiled
     def showEvent(self, event: QShowEvent) -> None:
         super().showEvent(event)
         self.refresh(self.current_timeframe())
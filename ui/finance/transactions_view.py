@@ -11,23 +11,47 @@ from datetime import date, timedelta
 from helpers.db import db_session
 from db.finance import (
     list_transactions,
-    insert_transaction,
+    delete_transaction,
     get_categories,
     get_transaction_by_id,
-    update_transaction,
-    import_transactions,
     create_recurring_rule,
     update_recurring_rule,
     stop_recurring_rule,
     list_recurring_rules,
-    sync_recurring_transactions,
+)
+from actions.actions import (
+    add_transaction,
+    edit_transaction,
+    import_transactions,
+    sync_recurring,
+    sync_recurring_if_due,
 )
 
 from ui.dialogs.add_transaction_dialog import AddTransactionDialog
 from ui.dialogs.csv_import_config_dialog import CsvImportConfigDialog
 from ui.constants import DEFAULT_CATEGORIES
-from csv_parser import parse_transactions_from_csv
 from helpers.currency import format_jpy
+from ui.async_loader import AsyncLoader
+from db.versions import versions
+from helpers.profiling import profiled
+
+
+TRANSACTION_LIMIT = 500
+
+
+#runs on the loader's worker thread: db reads only, no widgets
+def load_transactions_data(connection, filters: dict) -> dict:
+    return {
+        'categories': get_categories(connection),
+        'rows': list_transactions(
+            connection,
+            start_date=filters['start_date'],
+            end_date=filters['end_date'],
+            tx_type=filters['type'],
+            category=filters['category'],
+            limit=TRANSACTION_LIMIT,
+        ),
+    }
 
 
 class RecurringRuleDialog(QDialog):
@@ -189,6 +213,7 @@ class ManageRecurringDialog(QDialog):
         self.edit_btn.setEnabled(has)
         self.stop_btn.setEnabled(has)
 
+    @profiled
     def refresh(self):
         with db_session() as connection:
             rules = list_recurring_rules(connection, active_only=False)
@@ -206,7 +231,7 @@ class ManageRecurringDialog(QDialog):
 
     def sync_all(self):
         with db_session() as connection:
-            stats = sync_recurring_transactions(connection, rule_id=None, up_to_date=None)
+            stats = sync_recurring(connection, rule_id=None, up_to_date=None)
         QMessageBox.information(self, "Sync", f"Inserted: {stats['inserted']}\nDuplicates: {stats['duplicates']}")
         self.refresh()
 
@@ -239,7 +264,7 @@ class ManageRecurringDialog(QDialog):
                 active=data["active"],
                 end_date=data["end_date"],
             )
-            stats = sync_recurring_transactions(connection, rule_id=rid, up_to_date=None)
+            stats = sync_recurring(connection, rule_id=rid, up_to_date=None)
 
         QMessageBox.information(self, "Updated", f"Synced\nInserted: {stats['inserted']}\nDuplicates: {stats['duplicates']}")
         self.refresh()
@@ -355,9 +380,9 @@ class FinanceTransactionsView(QWidget):
         self.category.currentIndexChanged.connect(self.refresh)
         self.transaction_table.itemSelectionChanged.connect(self.update_action_buttons)
 
-        # initial
-        self.reload_categories()
-        self.refresh()
+        # initial, rows arrive from the loader once the view is shown
+        self.loader = AsyncLoader(self)
+        self.set_categories([])
         self.update_action_buttons()
 
     # helpers
@@ -376,10 +401,8 @@ class FinanceTransactionsView(QWidget):
         self.edit_transaction_button.setEnabled(has)
         self.delete_transaction_button.setEnabled(has)
 
-    def reload_categories(self):
-        with db_session() as connection:
-            categories_db = get_categories(connection)
-
+    #fills the category filter, returns False when the selected category is gone
+    def set_categories(self, categories_db: list[str]) -> bool:
         merged = []
         for c in (DEFAULT_CATEGORIES + categories_db + ['Uncategorized']):
             if c and c not in merged:
@@ -396,6 +419,7 @@ class FinanceTransactionsView(QWidget):
         idx = self.category.findText(current)
         self.category.setCurrentIndex(idx if idx >= 0 else 0)
         self.category.blockSignals(False)
+        return idx >= 0
 
     # filters
     def get_filters(self):
@@ -408,21 +432,26 @@ class FinanceTransactionsView(QWidget):
         }
 
     # refresh
+    @profiled
     def refresh(self):
+        #recurring up to date, here and not in the loader: it writes and publishes change events
+        #(no db access unless the day changed or the rules changed since the last sync)
+        sync_recurring_if_due()
+
         filters = self.get_filters()
-        with db_session() as connection:
-            sync_recurring_transactions(connection, rule_id=None, up_to_date=None)
+        key = (tuple(filters.items()), versions('finance'))
+        if self.loader.is_fresh(key):
+            return
 
-            rows = list_transactions(
-                connection,
-                start_date=filters['start_date'],
-                end_date=filters['end_date'],
-                tx_type=filters['type'],
-                category=filters['category'],
-                limit=500,
-            )
+        self.loader.load(lambda connection: load_transactions_data(connection, filters), self.render, key=key)
+
+    def render(self, data: dict):
+        #the selected category disappeared, the rows were filtered by it so load again with 'All'
+        if not self.set_categories(data['categories']):
+            self.refresh()
+            return
 
-        self.fill_table(rows)
+        self.fill_table(data['rows'])
         self.update_action_buttons()
 
     def fill_table(self, rows):
@@ -496,7 +525,7 @@ class FinanceTransactionsView(QWidget):
 
             tx = dialog.get_data()
 
-            insert_transaction(
+            add_transaction(
                 connection,
                 tx_date=tx["tx_date"],
                 amount=tx["amount"],
@@ -508,7 +537,6 @@ class FinanceTransactionsView(QWidget):
                 source="manual",
             )
 
-        self.reload_categories()
         self.refresh()
 
     def open_edit_dialog_from_button(self) -> None:
@@ -549,7 +577,7 @@ class FinanceTransactionsView(QWidget):
 
             edited = dialog.get_data()
 
-            update_transaction(
+            edit_transaction(
                 connection,
                 tx_id=int(tx_id),
                 tx_date=edited["tx_date"],
@@ -561,7 +589,6 @@ class FinanceTransactionsView(QWidget):
                 description=edited["description"],
             )
 
-        self.reload_categories()
         self.refresh()
 
     def delete_selected_transaction(self) -> None:
@@ -585,10 +612,8 @@ class FinanceTransactionsView(QWidget):
             return
 
         with db_session() as connection:
-            connection.execute("DELETE FROM transactions WHERE id = ?", (int(tx_id),))
-            connection.commit()
+            delete_transaction(connection, int(tx_id))
 
-        self.reload_categories()
         self.refresh()
 
     #recurring transaction 
@@ -623,17 +648,15 @@ class FinanceTransactionsView(QWidget):
                     end_date=data["end_date"],
                 )
 
-            stats = sync_recurring_transactions(connection, rule_id=rid, up_to_date=None)
+            stats = sync_recurring(connection, rule_id=rid, up_to_date=None)
 
         QMessageBox.information(self, "Recurring", f"Created & synced\nInserted: {stats['inserted']}\nDuplicates: {stats['duplicates']}")
-        self.reload_categories()
         self.refresh()
 
     def open_manage_recurring_dialog(self):
         categories = self.get_merged_categories()
         dialog = ManageRecurringDialog(categories, parent=self)
         dialog.exec()
-        self.reload_categories()
         self.refresh()
 
     def get_merged_categories(self) -> list[str]:
@@ -663,6 +686,9 @@ class FinanceTransactionsView(QWidget):
         if not file_path:
             return
 
+        #pulls in pandas, only worth it once somebody actually imports a file
+        from csv_parser import parse_transactions_from_csv
+
         try:
             if cfg["use_paypal"]:
                 transactions = parse_transactions_from_csv(
@@ -700,12 +726,11 @@ class FinanceTransactionsView(QWidget):
             f"Imported: {stats.get('imported', 0)}\nDuplicates skipped: {stats.get('duplicates', 0)}\nFailed: {stats.get('failed', 0)}",
         )
 
-        self.reload_categories()
         self.refresh()
 
+    @profiled
     def showEvent(self, event: QShowEvent) -> None:
         super().showEvent(event)
-        self.reload_categories()
         self.refresh()
 
 
@@ -1,7 +1,7 @@
 from datetime import date as dt_date
 from datetime import datetime
 
-from PySide6.QtCore import Signal, Qt
+from PySide6.QtCore import Signal, Qt, QTimer
 from PySide6.QtGui import QPainter, QColor, QShowEvent
 from PySide6.QtWidgets import (
     QWidget,
@@ -18,32 +18,15 @@ from PySide6.QtWidgets import (
     QInputDialog,
 )
 
-from PySide6.QtCharts import (
-    QChart,
-    QChartView,
-    QBarSeries,
-    QBarSet,
-    QBarCategoryAxis,
-    QValueAxis,
-)
-
-from db.todos import list_todos_for_day, list_all_todos, insert_todo
-from db.journal import get_journal_entry
-from db.habits import (
-    list_active_habits,
-    is_daily_done,
-    get_weekly_progress,
-    get_daily_streak,
-    get_weekly_streak,
-)
-from db.finance import get_timeseries_data, list_recent_transactions, get_categories, insert_transaction
+from db.todos import insert_todo
+from db.finance import get_categories
+from db.home import home_snapshot, HomeSnapshot
+from actions.actions import add_transaction
 
 from ui.home.weather_widget import WeatherWidget
 
-from db.xp import get_total_xp, level_for_total_xp, list_recent_xp_events
 from ui.xp.level_badge import LevelBadge
 
-from db.achievements import list_achievements, list_unlocked_ids
 from ui.xp.achievement_grid import AchievementTile
 
 from ui.todos.calendar_widget import CalendarWidget
@@ -52,6 +35,12 @@ from ui.dialogs.add_transaction_dialog import AddTransactionDialog
 from ui.constants import DEFAULT_CATEGORIES
 
 from helpers.db import db_session
+from ui.async_loader import AsyncLoader
+from ui.event_relay import EventRelay
+from db.versions import check_external
+from helpers.profiling import profiled
+from helpers.dates import week_start
+from helpers.events import ChangeEvent, TodosChanged, HabitLogChanged, JournalChanged
 
 
 TITLE_STYLE = 'font-size: 26px; font-weight: 800;'
@@ -75,8 +64,17 @@ class HomeView(QWidget):
         super().__init__()
 
         self.day = dt_date.today().isoformat()
+        self.loader = AsyncLoader(self)
+
+        #bumped by change events that touch what home shows, part of the refresh key
+        self._changes = 0
+        self._relay = EventRelay(self, self.on_data_changed, ChangeEvent)
+
+        #the month chart (QtCharts) and the weather fetch (QtNetwork) wait until the window painted once
+        self._started = False
+        self.chart_view = None
+        self._month_totals = (0.0, 0.0)
 
-        self.build_finance_chart()
         self.build_ui()
 
     def build_ui(self):
@@ -158,9 +156,11 @@ class HomeView(QWidget):
         self.finance_lines.setStyleSheet(MID_STYLE)
         self.finance_layout.addWidget(self.finance_lines)
 
-        self.chart_view.setMinimumHeight(170)
-        self.chart_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.finance_layout.addWidget(self.chart_view, 1)
+        #placeholder of the same size until build_finance_chart swaps the chart in
+        self.chart_slot = QWidget()
+        self.chart_slot.setMinimumHeight(170)
+        self.chart_slot.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.finance_layout.addWidget(self.chart_slot, 1)
 
         finance_btn_row = QHBoxLayout()
         self.finance_layout.addLayout(finance_btn_row)
@@ -367,6 +367,15 @@ class HomeView(QWidget):
         return frame, layout
 
     def build_finance_chart(self):
+        from PySide6.QtCharts import (
+            QChart,
+            QChartView,
+            QBarSeries,
+            QBarSet,
+            QBarCategoryAxis,
+            QValueAxis,
+        )
+
         self.income_set = QBarSet('Income')
         self.expense_set = QBarSet('Expenses')
 
@@ -402,6 +411,36 @@ class HomeView(QWidget):
 
         self.chart_view = QChartView(chart)
         self.chart_view.setRenderHint(QPainter.Antialiasing)
+        self.chart_view.setMinimumHeight(170)
+        self.chart_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        self.finance_layout.replaceWidget(self.chart_slot, self.chart_view)
+        self.chart_slot.deleteLater()
+        self.chart_slot = None
+
+        self.set_month_chart(*self._month_totals)
+
+    def set_month_chart(self, income: float, expenses: float) -> None:
+        self._month_totals = (income, expenses)
+        if self.chart_view is None:
+            return
+
+        self.income_set.remove(0, self.income_set.count())
+        self.expense_set.remove(0, self.expense_set.count())
+
+        self.income_set.append(income)
+        self.expense_set.append(expenses)
+
+        max_abs = max(abs(income), abs(expenses), 10.0)
+        self.axis_y.setRange(-max_abs * 1.15, max_abs * 1.15)
+
+    #runs once, right after the first paint
+    def finish_startup(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        self.build_finance_chart()
+        self.weather_widget.refresh()
 
     def open_add_todo_today(self) -> None:
         text, confirmed = QInputDialog.getText(
@@ -452,7 +491,7 @@ class HomeView(QWidget):
 
             tx = dialog.get_data()
 
-            insert_transaction(
+            add_transaction(
                 connection,
                 tx_date=tx["tx_date"],
                 amount=tx["amount"],
@@ -492,122 +531,89 @@ class HomeView(QWidget):
 
         self.latest_achievement_layout.addStretch(1)
 
-    #maybe change to several helper methods but i guess it's still straightforward enough this way
+    @profiled
     def refresh(self):
         self.day = dt_date.today().isoformat()
         self.date_label.setText(self.day)
 
+        #not db data, it keeps its own fetch interval
+        if self._started:
+            self.weather_widget.refresh()
+
+        day = self.day
+        check_external()
+        key = (day, self._changes)
+        if self.loader.is_fresh(key):
+            return
+
+        self.loader.load(lambda connection: home_snapshot(connection, day), self.on_snapshot, key=key)
+
+    #todos, habit logs and the journal only matter for today (and the backlog, the current week,
+    #earlier days for streaks), finance, xp and achievements show recent rows of any date
+    def on_data_changed(self, event: ChangeEvent):
+        day = dt_date.today().isoformat()
+        if isinstance(event, TodosChanged):
+            touched = day in event.days or None in event.days
+        elif isinstance(event, HabitLogChanged):
+            touched = event.day <= day or event.week == week_start(day)
+        elif isinstance(event, JournalChanged):
+            touched = event.day == day
+        else:
+            touched = event.table != 'settings'
+        if touched:
+            self._changes += 1
+
+    def on_snapshot(self, snapshot: HomeSnapshot):
+        self.render_snapshot(snapshot)
+
+        # load time per section, handy when the home tab feels slow
+        self.date_label.setToolTip(
+            '\n'.join(f'{name}: {ms:.1f} ms' for name, ms in snapshot.timings.items())
+        )
+
+    #everything below works on the snapshot only, no db access
+    def render_snapshot(self, snapshot: HomeSnapshot):
         def _habit_label(h: dict) -> str:
             title = h.get("title") or ""
             emoji = (h.get("emoji") or "").strip()
             return f"{emoji} {title}" if emoji else title
 
-        with db_session() as connection:
-            todos_today = list_todos_for_day(connection, self.day)
-            total_todos = len(todos_today)
-            done_todos = sum(1 for t in todos_today if t.get("completed"))
-
-            journal_text = get_journal_entry(connection, self.day) or ""
-            journal_mark = "✓" if journal_text.strip() else "-"
-
-            habits = list_active_habits(connection)
-            daily = [h for h in habits if h.get("frequency") == "daily"]
-            weekly = [h for h in habits if h.get("frequency") == "weekly"]
-
-            #to avoid having to double get the data from db
-            daily_done_map = {h["id"]: is_daily_done(connection, h["id"], self.day) for h in daily}
-            weekly_prog_map = {h["id"]: get_weekly_progress(connection, h["id"], self.day) for h in weekly}
-
-            daily_done = sum(1 for done in daily_done_map.values() if done)
-
-            weekly_done = 0
-            for h in weekly:
-                done, target = weekly_prog_map[h["id"]]
-                if target and done >= target:
-                    weekly_done += 1
-
-            best_daily = 0
-            for h in daily:
-                s = get_daily_streak(connection, h["id"], self.day)
-                if s > best_daily:
-                    best_daily = s
-
-            best_weekly = 0
-            for h in weekly:
-                s = get_weekly_streak(connection, h["id"], self.day)
-                if s > best_weekly:
-                    best_weekly = s
-
-            #build next todos list 
-            next_todos: list[tuple[str, str]] = []
-            for t in todos_today:
-                if not t.get("completed"):
-                    next_todos.append(("today", t.get("title") or ""))
-
-            if len(next_todos) < 4:
-                all_todos = list_all_todos(connection)
-                for t in all_todos:
-                    if t.get("date") is None and not t.get("completed"):
-                        next_todos.append(("backlog", t.get("title") or ""))
-                    if len(next_todos) >= 4:
-                        break
-
-            #next habits list 
-            next_habits: list[str] = []
-
-            for h in daily:
-                if not daily_done_map[h["id"]]:
-                    next_habits.append(_habit_label(h))
-
-            for h in weekly:
-                done, target = weekly_prog_map[h["id"]]
-                if target and done < target:
-                    next_habits.append(f"{_habit_label(h)} ({done}/{target})")
-
-            today = dt_date.fromisoformat(self.day)
-            start_month = dt_date(today.year, today.month, 1).isoformat()
-
-            series_data = get_timeseries_data(
-                connection=connection,
-                start_date=start_month,
-                end_date=self.day,
-                aggregation="day",
-            )
+        done_todos, total_todos = snapshot.todos_done, snapshot.todos_total
+        journal_mark = "✓" if snapshot.journal_written else "-"
 
-            income_total = 0.0
-            expenses_total = 0.0
-            for row in series_data:
-                income_total += float(row.get("income", 0) or 0)
-                expenses_total += float(row.get("expenses", 0) or 0)
+        daily_done, weekly_done = snapshot.daily_done, snapshot.weekly_done
+        best_daily, best_weekly = snapshot.best_daily_streak, snapshot.best_weekly_streak
 
-            net = income_total + expenses_total
+        next_todos = [
+            ("backlog" if t.get("date") is None else "today", t.get("title") or "")
+            for t in snapshot.next_todos
+        ]
 
-            total_xp = get_total_xp(connection)
-            level, into, step = level_for_total_xp(total_xp)
+        next_habits: list[str] = []
+        for h in snapshot.next_habits:
+            if h["frequency"] == "weekly":
+                next_habits.append(f"{_habit_label(h)} ({h['done']}/{h['target']})")
+            else:
+                next_habits.append(_habit_label(h))
 
-            recent_xp = list_recent_xp_events(connection, limit=10)
-            recent_tx = list_recent_transactions(connection, limit=10)
+        income_total = snapshot.income
+        expenses_total = snapshot.expenses
+        net = snapshot.net
 
-            achs = list_achievements(connection)
-            unlocked = list_unlocked_ids(connection)
+        total_xp = snapshot.total_xp
+        level, into, step = snapshot.level, snapshot.level_into, snapshot.level_step
 
-            latest_rows = connection.execute(
-                """
-                SELECT a.name, a.description, u.unlocked_at
-                FROM achievements_unlocked u
-                JOIN achievements a ON a.id = u.achievement_id
-                ORDER BY datetime(u.unlocked_at) DESC
-                LIMIT 2
-                """
-            ).fetchall()
+        recent_xp = snapshot.recent_xp
+        recent_tx = snapshot.recent_transactions
+        latest_rows = snapshot.latest_unlocked
 
         self.today_todos.setText(f"📝 {done_todos}/{total_todos}" if total_todos else "📝 -")
 
         habits_parts = []
-        if daily:
-            habits_parts.append(f"D {daily_done}/{len(daily)}")
-        if weekly:
-            habits_parts.append(f"W {weekly_done}/{len(weekly)}")
+        if snapshot.daily_total:
+            habits_parts.append(f"D {daily_done}/{snapshot.daily_total}")
+        if snapshot.weekly_total:
+            habits_parts.append(f"W {weekly_done}/{snapshot.weekly_total}")
         self.today_habits.setText(("🔁 " + "  |  ".join(habits_parts)) if habits_parts else "🔁 -")
 
         self.today_journal.setText(f"📓 {journal_mark}")
@@ -631,14 +637,7 @@ class HomeView(QWidget):
         self.finance_net.setText(f"Net: {net:,.2f}")
         self.finance_lines.setText(f"Income: {income_total:,.2f}\nExpenses: {expenses_total:,.2f}")
 
-        self.income_set.remove(0, self.income_set.count())
-        self.expense_set.remove(0, self.expense_set.count())
-
-        self.income_set.append(float(income_total))
-        self.expense_set.append(float(expenses_total))
-
-        max_abs = max(abs(income_total), abs(expenses_total), 10.0)
-        self.axis_y.setRange(-max_abs * 1.15, max_abs * 1.15)
+        self.set_month_chart(float(income_total), float(expenses_total))
 
         items: list[tuple[object, str]] = []
 
@@ -669,8 +668,6 @@ class HomeView(QWidget):
             for _, text in items[:10]:
                 self.activity_list.addItem(QListWidgetItem(text))
 
-        self.weather_widget.refresh()
-
         self.xp_badge.set_level(level)
         self.xp_level_label.setText(f"level {level}")
 
@@ -678,17 +675,20 @@ class HomeView(QWidget):
         self.xp_progress.setValue(into)
         self.xp_progress_label.setText(f"{into} / {step} xp   (total {total_xp})")
 
-        self._set_latest_achievements([dict(r) for r in latest_rows])
+        self._set_latest_achievements(latest_rows)
 
-        total_ach = len(achs)
-        unlocked_count = len(unlocked)
+        total_ach = snapshot.achievements_total
+        unlocked_count = snapshot.achievements_unlocked
         self.achievement_count_label.setText(
             f"{unlocked_count}/{total_ach} achievements unlocked" if total_ach else ""
         )
 
+    @profiled
     def showEvent(self, event: QShowEvent) -> None:
         super().showEvent(event)
         self.refresh()
+        if not self._started:
+            QTimer.singleShot(0, self.finish_startup)
 
 
 def parse_dt(date_str: str | None, time_str: str | None = None) -> datetime:
@@ -2,7 +2,6 @@ import json
 from datetime import datetime, timedelta
 
 from PySide6.QtCore import QUrl
-from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QInputDialog, QSizePolicy
 
 from db.settings import get_setting, set_setting 
@@ -23,14 +22,22 @@ class WeatherWidget(QWidget):
     def __init__(self):
         super().__init__()
 
-        self.network = QNetworkAccessManager(self)
+        #created on the first fetch, QtNetwork is only imported then (the home view fetches after its first paint)
+        self.network = None
 
         self.last_fetch_utc = None
         self.cache_minutes = 45
 
         self.build_ui()
         self.load_location_from_settings()
-        self.refresh(force=True)
+
+    def network_manager(self):
+        if self.network is None:
+            from PySide6.QtNetwork import QNetworkAccessManager, QNetworkProxy
+
+            QNetworkProxy.setApplicationProxy(QNetworkProxy(QNetworkProxy.NoProxy)) #to make weather work
+            self.network = QNetworkAccessManager(self)
+        return self.network
 
     def build_ui(self) -> None:
         layout = QVBoxLayout(self)
@@ -156,12 +163,16 @@ class WeatherWidget(QWidget):
             '&timezone=auto'
         )
 
+        from PySide6.QtNetwork import QNetworkRequest
+
         request = QNetworkRequest(QUrl(url))
-        reply = self.network.get(request)
+        reply = self.network_manager().get(request)
         reply.finished.connect(lambda: self.on_reply_finished(reply))
 
 
     def on_reply_finished(self, reply) -> None:
+        from PySide6.QtNetwork import QNetworkReply
+
         err = reply.error()
 
         raw = bytes(reply.readAll()).decode('utf-8', errors='replace')
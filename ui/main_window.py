@@ -1,8 +1,27 @@
-from PySide6.QtWidgets import QMainWindow, QTabWidget
-from ui.finance.finance_tab import FinanceTab
-from ui.todos.todos_container import TodosContainer
+from typing import Callable
+
+from PySide6.QtWidgets import QMainWindow, QTabWidget, QWidget
 from ui.home.home_view import HomeView
-from ui.xp.xp_view import XPView
+
+HOME, FINANCE, ACTIVITY, PROGRESSION = range(4)
+
+
+#the tabs besides home are built when they are first opened, their modules are imported only then
+#(QtCharts for the finance dashboard, numpy for the insights, ...) so the window shows up sooner
+def build_finance_tab() -> QWidget:
+    from ui.finance.finance_tab import FinanceTab
+    return FinanceTab()
+
+
+def build_todos_container() -> QWidget:
+    from ui.todos.todos_container import TodosContainer
+    return TodosContainer()
+
+
+def build_xp_view() -> QWidget:
+    from ui.xp.xp_view import XPView
+    return XPView()
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -15,32 +34,54 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.tabs)
 
         self.home_view = HomeView()
-        self.finance_tab = FinanceTab()
-        self.todos_container = TodosContainer()
-        self.xp_view = XPView()
-
         self.tabs.addTab(self.home_view, 'Home')
-        self.tabs.addTab(self.finance_tab, 'Finance')
-        self.tabs.addTab(self.todos_container, 'Activity')
-        self.tabs.addTab(self.xp_view, 'Progression')
+
+        #index -> factory, entries are dropped once the tab is built
+        self._tab_factories: dict[int, Callable[[], QWidget]] = {
+            FINANCE: build_finance_tab,
+            ACTIVITY: build_todos_container,
+            PROGRESSION: build_xp_view,
+        }
+        self.tabs.addTab(QWidget(), 'Finance')
+        self.tabs.addTab(QWidget(), 'Activity')
+        self.tabs.addTab(QWidget(), 'Progression')
+
+        self.tabs.currentChanged.connect(self.ensure_tab)
 
         self.wire_home()
         self.home_view.refresh()
 
+    #swaps the placeholder at index for the real tab on first use
+    def ensure_tab(self, index: int) -> QWidget:
+        factory = self._tab_factories.pop(index, None)
+        if factory is None:
+            return self.tabs.widget(index)
+
+        widget = factory()
+        title = self.tabs.tabText(index)
+        current = self.tabs.currentIndex()
+
+        self.tabs.blockSignals(True)
+        placeholder = self.tabs.widget(index)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, widget, title)
+        self.tabs.setCurrentIndex(current)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+
+        return widget
+
+    def show_tab(self, index: int) -> QWidget:
+        widget = self.ensure_tab(index)
+        self.tabs.setCurrentIndex(index)
+        return widget
+
     def wire_home(self):
-        self.home_view.open_todos.connect(
-            lambda: self.tabs.setCurrentWidget(self.todos_container)
-        )
-        self.home_view.open_finance.connect(
-            lambda: self.tabs.setCurrentWidget(self.finance_tab)
-        )
-        self.home_view.open_xp.connect(
-            lambda: self.tabs.setCurrentWidget(self.xp_view)
-        )
-        
+        self.home_view.open_todos.connect(lambda: self.show_tab(ACTIVITY))
+        self.home_view.open_finance.connect(lambda: self.show_tab(FINANCE))
+        self.home_view.open_xp.connect(lambda: self.show_tab(PROGRESSION))
+
         def open_day(day: str):
-            self.tabs.setCurrentWidget(self.todos_container)
-            self.todos_container.open_day(day)
+            self.show_tab(ACTIVITY).open_day(day)
 
         self.home_view.open_day.connect(open_day)
-
@@ -1,4 +1,6 @@
 import calendar
+import threading
+from collections import OrderedDict
 from datetime import date as dt_date
 
 from PySide6.QtCore import Qt, Signal
@@ -12,10 +14,95 @@ from PySide6.QtWidgets import (
     QSizePolicy
 )
 
-from helpers.db import db_session
-from db.todos import get_todo_stats_for_month
-from db.habits import get_daily_habit_stats_for_month
-from db.journal import get_journal_mood_for_month
+from ui.async_loader import AsyncLoader
+from db.versions import check_external
+from db.overview import get_month_overview
+from helpers.events import (
+    TodosChanged,
+    HabitsChanged,
+    HabitLogChanged,
+    JournalChanged,
+    ExternalChange,
+    subscribe,
+)
+from helpers.profiling import profiled
+
+
+#month stats keyed by (year, month), least recently used months are evicted
+#shared by every calendar, the widget lives in a dialog and is rebuilt each time it opens
+MONTH_CACHE_SIZE = 12
+
+_month_cache: OrderedDict[tuple[int, int], dict] = OrderedDict()
+_month_cache_lock = threading.Lock()
+
+#bumped on every invalidation, a month loaded before a write must not be stored after it
+_month_cache_generation = 0
+
+
+def cached_month(year: int, month: int) -> dict | None:
+    with _month_cache_lock:
+        stats = _month_cache.get((year, month))
+        if stats is not None:
+            _month_cache.move_to_end((year, month))
+        return stats
+
+
+def store_month(stats: dict, generation: int) -> None:
+    with _month_cache_lock:
+        if generation != _month_cache_generation:
+            return
+        key = (stats['year'], stats['month'])
+        _month_cache[key] = stats
+        _month_cache.move_to_end(key)
+        while len(_month_cache) > MONTH_CACHE_SIZE:
+            _month_cache.popitem(last=False)
+
+
+def invalidate_month_cache(days: tuple[str | None, ...] | None = None) -> None:
+    global _month_cache_generation
+    with _month_cache_lock:
+        _month_cache_generation += 1
+        if days is None:
+            _month_cache.clear()
+            return
+        for day in days:
+            if day is None:
+                continue
+            day_date = dt_date.fromisoformat(day)
+            _month_cache.pop((day_date.year, day_date.month), None)
+
+
+#the cache listens on the change bus, events arrive on the publishing thread (hence the lock)
+def _on_data_changed(event) -> None:
+    if isinstance(event, TodosChanged):
+        invalidate_month_cache(event.days)
+    elif isinstance(event, (HabitLogChanged, JournalChanged)):
+        invalidate_month_cache((event.day,))
+    else:
+        #habit definitions change the daily total of every month
+        invalidate_month_cache()
+
+
+subscribe(TodosChanged, _on_data_changed)
+subscribe(HabitsChanged, _on_data_changed)
+subscribe(HabitLogChanged, _on_data_changed)
+subscribe(JournalChanged, _on_data_changed)
+subscribe(ExternalChange, _on_data_changed)
+
+
+def adjacent_months(year: int, month: int) -> list[tuple[int, int]]:
+    previous = (year - 1, 12) if month == 1 else (year, month - 1)
+    following = (year + 1, 1) if month == 12 else (year, month + 1)
+    return [previous, following]
+
+
+#runs on the loader's worker thread: per day stats for one month, one query
+def load_month_stats(connection, year: int, month: int) -> dict:
+    return {
+        'year': year,
+        'month': month,
+        'days': get_month_overview(connection, year, month),
+    }
 
 
 class CalendarWidget(QWidget):
@@ -32,6 +119,10 @@ class CalendarWidget(QWidget):
         self.month = selected_date.month
         self.selected_day = selected_date.isoformat()
 
+        self.loader = AsyncLoader(self)
+        #separate loader so a prefetch never supersedes the month on screen
+        self.prefetch_loader = AsyncLoader(self)
+
         self.build_ui()
         self.render_month()
 
@@ -94,14 +185,58 @@ class CalendarWidget(QWidget):
         for row in range(6):
             self.grid.setRowStretch(row, 1)
 
+    @profiled
     def render_month(self):
         self.month_label.setText(f'{self.year:04d}-{self.month:02d}')
 
+        #picks up writes of other processes, they clear the cache through ExternalChange
+        check_external()
+
         #get data for info per day tile
-        with db_session() as connection:
-            todo_stats = get_todo_stats_for_month(connection, self.year, self.month)
-            journal_moods = get_journal_mood_for_month(connection, self.year, self.month)
-            total_daily, daily_done_by_day = get_daily_habit_stats_for_month(connection, self.year, self.month)
+        year, month = self.year, self.month
+        stats = cached_month(year, month)
+        if stats is not None:
+            #a slower load for a month we already left must not paint over this one
+            self.loader.cancel()
+            self.paint_month(stats)
+            self.prefetch_adjacent()
+            return
+
+        generation = _month_cache_generation
+        key = (year, month, generation)
+        if self.loader.is_fresh(key):
+            return
+
+        def on_done(stats: dict):
+            store_month(stats, generation)
+            self.paint_month(stats)
+            self.prefetch_adjacent()
+
+        self.loader.load(lambda connection: load_month_stats(connection, year, month), on_done, key=key)
+
+    #loads the previous and next month in the background so paging is instant
+    def prefetch_adjacent(self):
+        months = [m for m in adjacent_months(self.year, self.month) if cached_month(*m) is None]
+        if not months:
+            return
+
+        generation = _month_cache_generation
+        key = (tuple(months), generation)
+        if self.prefetch_loader.is_fresh(key):
+            return
+
+        def on_done(results: list[dict]):
+            for stats in results:
+                store_month(stats, generation)
+
+        self.prefetch_loader.load(
+            lambda connection: [load_month_stats(connection, y, m) for y, m in months],
+            on_done,
+            key=key,
+        )
+
+    def paint_month(self, stats: dict):
+        overview = stats['days']
 
         cal = calendar.Calendar(firstweekday=calendar.MONDAY)
         month_days = list(cal.itermonthdates(self.year, self.month))
@@ -124,11 +259,16 @@ class CalendarWidget(QWidget):
 
             tile.set_day(day_iso, day_date.day, in_current_month, selected)
 
-            #displaying stats per day
-            todo_done, todo_total = todo_stats.get(day_iso, (0, 0))
-            daily_done = daily_done_by_day.get(day_iso, 0)
+            #displaying stats per day, days of the neighbouring months have no row and show no info
+            day_stats = overview.get(day_iso)
+            if day_stats is None:
+                tile.set_info_lines([])
+                continue
 
-            mood_val = journal_moods.get(day_iso)  # 1..5
+            todo_done, todo_total = day_stats['todos_done'], day_stats['todos_total']
+            daily_done, total_daily = day_stats['daily_done'], day_stats['daily_total']
+
+            mood_val = day_stats['mood']  # 1..5
             mood_emoji = '😶'
             if mood_val == 1:
                 mood_emoji = '😞'
@@ -151,9 +291,15 @@ class CalendarWidget(QWidget):
 
             tile.set_info_lines(info_lines)
 
+    #only the old and the new selected tile change their border
     def select_day(self, day_iso: str):
+        previous = self.selected_day
         self.selected_day = day_iso
-        self.render_month()
+
+        for tile in self.tiles:
+            if tile.day_iso in (previous, day_iso):
+                tile.set_selected(tile.day_iso == day_iso)
+
         self.day_selected.emit(day_iso)
 
     def prev_month(self):
@@ -218,6 +364,11 @@ class DayTile(QWidget):
         self.setEnabled(True)
         self.render()
 
+    def set_selected(self, selected: bool):
+        if selected != self.is_selected:
+            self.is_selected = selected
+            self.apply_style()
+
     def set_info_lines(self, lines: list[str]):
         self.info_lines = lines
         self.render()
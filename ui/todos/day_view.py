@@ -4,8 +4,7 @@ from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QLabel,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QPushButton,
     QTextEdit,
     QHBoxLayout,
@@ -17,8 +16,9 @@ from PySide6.QtWidgets import (
     QFrame,
     QProgressBar,
     QButtonGroup,
+    QMessageBox,
 )
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QTimer, QCoreApplication
 from PySide6.QtGui import QShowEvent
 
 from helpers.db import db_session
@@ -26,23 +26,67 @@ from db.todos import (
     list_todos_for_day,
     insert_todo,
 )
-from db.journal import (
-    get_journal_data,
-    save_journal_entry,
-)
+from db.journal import get_journal_data, get_journal_has_content
+from helpers.journal_writer import JournalWriter
 from db.habits import (
-    list_active_habits,
-    is_daily_done,
-    get_weekly_progress,
-    get_daily_streak,
-    get_weekly_streak
+    list_active_habit_progress,
+    get_streak_history,
+    current_streak_from_runs,
 )
 
 from ui.todos.calendar_widget import CalendarWidget
+from ui.todos.list_models import TodoListModel, TodoDelegate
+from ui.async_loader import AsyncLoader
+from ui.event_relay import EventRelay
+from db.versions import check_external
+from helpers.profiling import profiled
+from helpers.dates import week_start
+from helpers.events import (
+    TodosChanged,
+    HabitsChanged,
+    HabitLogChanged,
+    JournalChanged,
+    ExternalChange,
+)
 
 from actions.actions import *
 
 
+#runs on the loader's worker thread: everything the day page shows, no widgets
+#habit progress comes from one grouped query and the streaks from the cached run history, like the home tab
+def load_day_data(connection, day: str) -> dict:
+    habits = [h for h in list_active_habit_progress(connection, day) if h['start_date'] <= day]
+    history = get_streak_history(connection, [int(h['id']) for h in habits])
+
+    daily = []
+    weekly = []
+    for habit in habits:
+        runs = history.get(int(habit['id']), {}).get('runs', [])
+        streak = current_streak_from_runs(runs, habit['frequency'], day)
+        if habit['frequency'] == 'daily':
+            daily.append({
+                **habit,
+                'done': habit['done_today'],
+                'streak': streak,
+            })
+        elif habit['frequency'] == 'weekly':
+            weekly.append({
+                **habit,
+                'done': int(habit['week_count'] or 0),
+                'target': int(habit['weekly_target'] or 0),
+                'streak': streak,
+            })
+
+    return {
+        'day': day,
+        'todos': list_todos_for_day(connection, day),
+        'journal': get_journal_data(connection, day),
+        'journal_written': get_journal_has_content(connection, day),
+        'daily': daily,
+        'weekly': weekly,
+    }
+
+
 class DayView(QWidget):
     def __init__(self, day: str | None = None):
         super().__init__()
@@ -52,10 +96,33 @@ class DayView(QWidget):
         self._mood_value: int | None = None
         self._sleep_value: int | None = None
 
+        self._habit_state: dict[int, dict] = {}
+        self._habit_rows: dict[int, dict] = {}
+
         self._journal_save_timer = QTimer(self)
         self._journal_save_timer.setSingleShot(True)
         self._journal_save_timer.timeout.connect(self._save_journal_all_fields)
 
+        #disk writes for the journal happen on a worker thread, flushed on day switch and on quit
+        self._journal_writer = JournalWriter()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.close_journal)
+
+        self.loader = AsyncLoader(self)
+
+        #bumped by change events that touch the shown day, part of the refresh key
+        self._changes = 0
+        self._relay = EventRelay(
+            self,
+            self.on_data_changed,
+            TodosChanged,
+            HabitsChanged,
+            HabitLogChanged,
+            JournalChanged,
+            ExternalChange,
+        )
+
         self.build_ui()
         self.refresh()
 
@@ -129,7 +196,14 @@ class DayView(QWidget):
         todos_label.setStyleSheet('font-weight: 600; margin-top: 4px')
         left_layout.addWidget(todos_label)
 
-        self.todo_list = QListWidget()
+        self.todo_model = TodoListModel(self)
+        self.todo_delegate = TodoDelegate(self)
+        self.todo_delegate.check_toggled.connect(self.toggle_todo, Qt.QueuedConnection)
+
+        self.todo_list = QListView()
+        self.todo_list.setModel(self.todo_model)
+        self.todo_list.setItemDelegate(self.todo_delegate)
+        self.todo_list.setUniformItemSizes(True)
         left_layout.addWidget(self.todo_list, 1)
 
         add_button = QPushButton('+ Add Todo')
@@ -275,45 +349,45 @@ class DayView(QWidget):
 
     # ___data part___
 
+    @profiled
     def refresh(self):
-        self.load_todos()
-        self.load_habits()
-        self.load_journal()
-        self.update_summary()
-
-    def load_todos(self):
-        self.todo_list.clear()
-
-        with db_session() as connection:
-            todos = list_todos_for_day(connection, self.day)
-
-
-        for row in todos:
-            item = QListWidgetItem()
-            widget = self.make_todo_row(row)
-            item.setSizeHint(widget.sizeHint())
-            self.todo_list.addItem(item)
-            self.todo_list.setItemWidget(item, widget)
+        # pending edits must be on disk before the worker reads the journal back
+        self.flush_journal()
 
-    def make_todo_row(self, row: dict) -> QWidget:
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(0, 0, 0, 0)
-
-        checkbox = QCheckBox()
-        checkbox.setProperty('todo_id', row['id'])
-        checkbox.setChecked(bool(row['completed']))
-        checkbox.toggled.connect(self.toggle_todo)
-
-        label = QLabel(row['title'])
-        if row['completed']:
-            label.setStyleSheet('color: #888; text-decoration: line-through;')
-
-        layout.addWidget(checkbox)
-        layout.addWidget(label)
-        layout.addStretch()
+        check_external()
+        day = self.day
+        key = (day, self._changes)
+        if self.loader.is_fresh(key):
+            return
 
-        return widget
+        self.set_journal_editable(False)
+        self.loader.load(lambda connection: load_day_data(connection, day), self.render_day, key=key)
+
+    def on_data_changed(self, event):
+        if self.affects_day(event):
+            self._changes += 1
+
+    #log entries count for the day itself, its week (weekly progress) and every later day (streaks)
+    def affects_day(self, event) -> bool:
+        if isinstance(event, TodosChanged):
+            return self.day in event.days
+        if isinstance(event, HabitLogChanged):
+            return event.day <= self.day or event.week == week_start(self.day)
+        if isinstance(event, JournalChanged):
+            return event.day == self.day
+        return True
+
+    def render_day(self, data: dict):
+        self.todo_model.set_rows(data['todos'])
+        self.load_habits(data['daily'], data['weekly'])
+        self.load_journal(data['journal'])
+        self.set_journal_editable(True)
+        self.update_summary(data['journal_written'])
+
+    #the journal is read only while a load is in flight, so typing can't be overwritten by it
+    def set_journal_editable(self, editable: bool):
+        for box in (self.journal_edit, self.ref_went_well, self.ref_difficult, self.ref_remember):
+            box.setReadOnly(not editable)
 
     def make_card(self, title: str) -> tuple[QFrame, QVBoxLayout]:
         frame = QFrame()
@@ -331,19 +405,13 @@ class DayView(QWidget):
 
         return frame, layout
 
-    def toggle_todo(self, checked: bool):
-        checkbox = self.sender()
-        if not checkbox:
-            return
-
-        todo_id = checkbox.property('todo_id')
-        if todo_id is None:
-            return
-
+    def toggle_todo(self, todo: dict, checked: bool):
         with db_session() as connection:
-            toggle_todo(connection, self.day, int(todo_id), checked)
+            result = toggle_todo(connection, self.day, int(todo['id']), checked, title=todo['title'])
 
-        self.refresh()
+        # patch the one row and the counters instead of reloading the whole day
+        self.todo_model.update_row(result['todo_id'], {'completed': 1 if result['completed'] else 0})
+        self.update_counters()
 
     def add_todo(self):
         text, confirmed = QInputDialog.getText(
@@ -384,30 +452,42 @@ class DayView(QWidget):
         difficult = self.ref_difficult.toPlainText()
         remember = self.ref_remember.toPlainText()
 
-        with db_session() as connection:
-
-            save_journal_entry(
-                connection,
-                self.day,
-                notes,
-                mood=self._mood_value,
-                sleep=self._sleep_value,
-                went_well=went_well,
-                difficult=difficult,
-                remember=remember,
-            )
-
-            # XP behavior stays exactly like before: XP tied to "notes" text
-            save_journal(connection, self.day, notes)
+        # only changed fields get written, on the writer thread; XP stays tied to "notes" text
+        self._journal_writer.submit(
+            self.day,
+            {
+                'text': notes,
+                'mood': self._mood_value,
+                'sleep': self._sleep_value,
+                'went_well': went_well,
+                'difficult': difficult,
+                'remember': remember,
+            },
+        )
 
         # Option A: Journal ✓ only if there is any TEXT (mood/sleep do NOT count)
         has_text = bool(notes.strip()) or bool(went_well.strip()) or bool(difficult.strip()) or bool(remember.strip())
         self.summary_journal_value.setText('📓 ✓' if has_text else '📓 -')
 
-    def load_journal(self):
-        with db_session() as connection:
-            data = get_journal_data(connection, self.day)
-
+    def flush_journal(self):
+        if self._journal_save_timer.isActive():
+            self._journal_save_timer.stop()
+            self._save_journal_all_fields()
+        try:
+            self._journal_writer.flush()
+        except Exception as error:
+            #the edits stay queued and the writer keeps retrying them
+            QMessageBox.warning(self, 'Journal not saved', str(error))
+
+    def close_journal(self):
+        self.flush_journal()
+        try:
+            self._journal_writer.close()
+        except Exception:
+            #already shown by flush_journal
+            pass
+
+    def load_journal(self, data: dict | None):
         notes = ''
         went_well = ''
         difficult = ''
@@ -426,6 +506,18 @@ class DayView(QWidget):
         self._mood_value = int(mood) if mood is not None else None
         self._sleep_value = int(sleep) if sleep is not None else None
 
+        self._journal_writer.remember(
+            self.day,
+            {
+                'text': notes,
+                'mood': self._mood_value,
+                'sleep': self._sleep_value,
+                'went_well': went_well,
+                'difficult': difficult,
+                'remember': remember,
+            },
+        )
+
         # block signals while setting
         self.ref_went_well.blockSignals(True)
         self.ref_difficult.blockSignals(True)
@@ -467,6 +559,8 @@ class DayView(QWidget):
 
     #___day switching logic___
     def set_day(self, day: str):
+        # edits belong to the old day, so they have to go out before self.day changes
+        self.flush_journal()
         self.day = day
         self.date_label.setText(day)
         self.refresh()
@@ -528,6 +622,7 @@ class DayView(QWidget):
         layout.addWidget(streak_label)
         layout.addStretch()
 
+        self._habit_rows[habit_id] = {'label': label, 'streak': streak_label}
         return row
 
     def toggle_daily_habit(self, checked: bool):
@@ -539,10 +634,22 @@ class DayView(QWidget):
         if habit_id is None:
             return
 
+        title = self._habit_state.get(int(habit_id), {}).get('title')
         with db_session() as connection:
-            toggle_daily_habit(connection, self.day, int(habit_id), checked)
+            result = toggle_daily_habit(connection, self.day, int(habit_id), checked, title=title)
 
-        self.refresh()
+        state = self._habit_state.get(result['habit_id'])
+        if state is not None:
+            state['done'] = result['done']
+            state['streak'] = result['streak']
+
+        widgets = self._habit_rows.get(result['habit_id'], {})
+        if 'label' in widgets:
+            widgets['label'].setStyleSheet('color: #888; text-decoration: line-through;' if result['done'] else '')
+        if 'streak' in widgets:
+            widgets['streak'].setText(f"🔥 {result['streak']}" if result['streak'] > 0 else '')
+
+        self.update_counters()
 
     def make_weekly_habit_row(self, habit_id: int, title: str, emoji: str | None, done: int, target: int, streak: int) -> QWidget:
         row = QWidget()
@@ -584,6 +691,12 @@ class DayView(QWidget):
         layout.addWidget(streak_label)
         layout.addWidget(plus_button)
 
+        self._habit_rows[habit_id] = {
+            'progress': progress,
+            'count': count_label,
+            'streak': streak_label,
+            'plus': plus_button,
+        }
         return row
 
     def increment_weekly_habit(self):
@@ -595,10 +708,24 @@ class DayView(QWidget):
         if habit_id is None:
             return
 
+        title = self._habit_state.get(int(habit_id), {}).get('title')
         with db_session() as connection:
-            increment_weekly_habit(connection, self.day, int(habit_id))
+            result = increment_weekly_habit(connection, self.day, int(habit_id), title=title)
 
-        self.refresh()
+        done, target, streak = result['done'], result['target'], result['streak']
+
+        state = self._habit_state.get(result['habit_id'])
+        if state is not None:
+            state.update(done=done, target=target, streak=streak)
+
+        widgets = self._habit_rows.get(result['habit_id'])
+        if widgets:
+            widgets['progress'].setValue(min(done, widgets['progress'].maximum()))
+            widgets['count'].setText(f'{done} / {target}')
+            widgets['streak'].setText(f'🔥 {streak}' if streak > 0 else '')
+            widgets['plus'].setEnabled(not (target > 0 and done >= target))
+
+        self.update_counters()
 
     def clear_card_body(self, layout: QVBoxLayout):
         while layout.count() > 1:
@@ -607,31 +734,29 @@ class DayView(QWidget):
             if widget:
                 widget.deleteLater()
 
-    def load_habits(self):
+    def load_habits(self, daily: list[dict], weekly: list[dict]):
         self.clear_card_body(self.daily_habits_layout)
         self.clear_card_body(self.weekly_habits_layout)
 
-        with db_session() as connection:
-            habits = list_active_habits(connection)
-            habits = [h for h in habits if h['start_date'] <= self.day]
-
-            daily = [h for h in habits if h['frequency'] == 'daily']
-            weekly = [h for h in habits if h['frequency'] == 'weekly']
-
-            for habit in daily:
-                done = is_daily_done(connection, habit['id'], self.day)
-                streak = get_daily_streak(connection, habit['id'], self.day)
-                self.daily_habits_layout.addWidget(
-                    self.make_daily_habit_row(habit['id'], habit['title'], habit['emoji'], done, streak)
-                )
+        # per habit state for the summary counters, patched by the toggle handlers
+        self._habit_state = {}
+        self._habit_rows = {}
 
-            for habit in weekly:
-                done, target = get_weekly_progress(connection, habit['id'], self.day)
-                streak = get_weekly_streak(connection, habit['id'], self.day)
-                self.weekly_habits_layout.addWidget(
-                    self.make_weekly_habit_row(habit['id'], habit['title'], habit['emoji'], done, target, streak)
-                )
+        for habit in daily:
+            done, streak = habit['done'], habit['streak']
+            self._habit_state[habit['id']] = {'frequency': 'daily', 'title': habit['title'], 'done': done, 'streak': streak}
+            self.daily_habits_layout.addWidget(
+                self.make_daily_habit_row(habit['id'], habit['title'], habit['emoji'], done, streak)
+            )
 
+        for habit in weekly:
+            done, target, streak = habit['done'], habit['target'], habit['streak']
+            self._habit_state[habit['id']] = {
+                'frequency': 'weekly', 'title': habit['title'], 'done': done, 'target': target, 'streak': streak,
+            }
+            self.weekly_habits_layout.addWidget(
+                self.make_weekly_habit_row(habit['id'], habit['title'], habit['emoji'], done, target, streak)
+            )
 
         if not daily:
             empty = QLabel('No daily habits active')
@@ -675,68 +800,46 @@ class DayView(QWidget):
 
         return frame, label_value
 
-    def update_summary(self):
-        with db_session() as connection:
+    def update_summary(self, has_text: bool):
+        self.summary_journal_value.setText('📓 ✓' if has_text else '📓 -')
+
+        self.update_counters()
+
+    # todo/habit/streak cards from the loaded rows, no db access
+    def update_counters(self):
+        todos = self.todo_model.rows()
+        total_todos = len(todos)
+        done_todos = sum(1 for t in todos if t['completed'])
+        self.summary_todos_value.setText(f'📝 {done_todos}/{total_todos}' if total_todos else '📝 -')
+
+        daily = [h for h in self._habit_state.values() if h['frequency'] == 'daily']
+        weekly = [h for h in self._habit_state.values() if h['frequency'] == 'weekly']
+
+        daily_done = sum(1 for h in daily if h['done'])
+        weekly_done = sum(1 for h in weekly if h['target'] > 0 and h['done'] >= h['target'])
+
+        daily_total = len(daily)
+        weekly_total = len(weekly)
+
+        if daily_total or weekly_total:
+            parts = []
+            if daily_total:
+                parts.append(f'D {daily_done}/{daily_total}')
+            if weekly_total:
+                parts.append(f'W {weekly_done}/{weekly_total}')
+            self.summary_habits_value.setText('🔁 ' + '   '.join(parts))
+        else:
+            self.summary_habits_value.setText('-')
+
+        best_daily = max((h['streak'] for h in daily), default=0)
+        best_weekly = max((h['streak'] for h in weekly), default=0)
 
-            todos = list_todos_for_day(connection, self.day)
-            total_todos = len(todos)
-            done_todos = sum(1 for t in todos if t['completed'])
-            self.summary_todos_value.setText(f'📝 {done_todos}/{total_todos}' if total_todos else '📝 -')
-
-            habits = list_active_habits(connection)
-            daily = [h for h in habits if h['frequency'] == 'daily']
-            weekly = [h for h in habits if h['frequency'] == 'weekly']
-
-            daily_done = 0
-            for h in daily:
-                if is_daily_done(connection, h['id'], self.day):
-                    daily_done += 1
-
-            weekly_done = 0
-            for h in weekly:
-                done, target = get_weekly_progress(connection, h['id'], self.day)
-                if target > 0 and done >= target:
-                    weekly_done += 1
-
-            daily_total = len(daily)
-            weekly_total = len(weekly)
-
-            if daily_total or weekly_total:
-                parts = []
-                if daily_total:
-                    parts.append(f'D {daily_done}/{daily_total}')
-                if weekly_total:
-                    parts.append(f'W {weekly_done}/{weekly_total}')
-                self.summary_habits_value.setText('🔁 ' + '   '.join(parts))
-            else:
-                self.summary_habits_value.setText('-')
-
-            best_daily = 0
-            for h in daily:
-                s = get_daily_streak(connection, h['id'], self.day)
-                if s > best_daily:
-                    best_daily = s
-
-            best_weekly = 0
-            for h in weekly:
-                s = get_weekly_streak(connection, h['id'], self.day)
-                if s > best_weekly:
-                    best_weekly = s
-
-            if best_daily or best_weekly:
-                self.summary_streaks_value.setText(f'🔥 D{best_daily}  W{best_weekly}')
-            else:
-                self.summary_streaks_value.setText('-')
-
-            jd = get_journal_data(connection, self.day) or {}
-            notes = (jd.get("text") or "")
-            ww = (jd.get("went_well") or "")
-            df = (jd.get("difficult") or "")
-            rm = (jd.get("remember") or "")
-
-            has_text = bool(notes.strip()) or bool(ww.strip()) or bool(df.strip()) or bool(rm.strip())
-            self.summary_journal_value.setText('📓 ✓' if has_text else '📓 -')
+        if best_daily or best_weekly:
+            self.summary_streaks_value.setText(f'🔥 D{best_daily}  W{best_weekly}')
+        else:
+            self.summary_streaks_value.setText('-')
 
+    @profiled
     def showEvent(self, event: QShowEvent) -> None:
         super().showEvent(event)
         self.refresh()
@@ -0,0 +1,240 @@
+from datetime import date as dt_date, timedelta
+
+from PySide6.QtCore import Qt, Signal, QRectF
+from PySide6.QtGui import QPainter, QColor, QShowEvent
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QToolButton,
+    QComboBox,
+    QToolTip,
+    QSizePolicy,
+)
+
+from helpers.db import db_session
+from helpers.dates import WEEKDAY_NAMES
+from db.habits import list_all_habits, get_daily_habit_stats_for_year
+from db.versions import versions
+from helpers.profiling import profiled
+
+
+CELL = 14
+GAP = 3
+LEFT_MARGIN = 28
+TOP_MARGIN = 18
+
+#light grey for no data, then green steps by completion ratio
+EMPTY_COLOR = QColor('#ebedf0')
+LEVEL_COLORS = [QColor('#c6e48b'), QColor('#7bc96f'), QColor('#239a3b'), QColor('#196127')]
+
+
+class HabitHeatmapView(QWidget):
+    day_selected = Signal(str)  # 'YYYY-MM-DD'
+
+    def __init__(self):
+        super().__init__()
+
+        self.year = dt_date.today().year
+        self.habit_id: int | None = None
+        self._shown_versions = None
+
+        self.build_ui()
+
+    def build_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(18, 14, 18, 14)
+        layout.setSpacing(12)
+
+        header = QHBoxLayout()
+        layout.addLayout(header)
+
+        prev_btn = QToolButton()
+        prev_btn.setText('◀')
+        prev_btn.clicked.connect(self.prev_year)
+        header.addWidget(prev_btn)
+
+        self.year_label = QLabel('')
+        self.year_label.setAlignment(Qt.AlignCenter)
+        self.year_label.setStyleSheet('font-size: 18px; font-weight: 700;')
+        header.addWidget(self.year_label, 1)
+
+        next_btn = QToolButton()
+        next_btn.setText('▶')
+        next_btn.clicked.connect(self.next_year)
+        header.addWidget(next_btn)
+
+        self.habit_input = QComboBox()
+        self.habit_input.setMinimumWidth(200)
+        self.habit_input.currentIndexChanged.connect(self.on_habit_changed)
+        header.addWidget(self.habit_input, 0)
+
+        self.grid = HeatmapGrid()
+        self.grid.day_clicked.connect(self.day_selected.emit)
+        layout.addWidget(self.grid, 0)
+
+        self.summary_label = QLabel('')
+        self.summary_label.setStyleSheet('color: #666; font-size: 12px;')
+        layout.addWidget(self.summary_label)
+
+        layout.addStretch(1)
+
+    def load_habits(self):
+        with db_session() as connection:
+            habits = [h for h in list_all_habits(connection) if h['frequency'] == 'daily' and h['active']]
+
+        self.habit_input.blockSignals(True)
+        self.habit_input.clear()
+        self.habit_input.addItem('All daily habits', None)
+        for h in habits:
+            title = f"{h['emoji']} {h['title']}" if h.get('emoji') else h['title']
+            self.habit_input.addItem(title, int(h['id']))
+
+        index = self.habit_input.findData(self.habit_id)
+        if index < 0:
+            index = 0
+            self.habit_id = None
+        self.habit_input.setCurrentIndex(index)
+        self.habit_input.blockSignals(False)
+
+    @profiled
+    def refresh(self):
+        self.year_label.setText(str(self.year))
+
+        #cached per year in db.habits, so paging back and forth is free
+        with db_session() as connection:
+            total, done_by_day = get_daily_habit_stats_for_year(connection, self.year, self.habit_id)
+
+        self.grid.set_data(self.year, total, done_by_day)
+
+        days_done = sum(1 for v in done_by_day.values() if v > 0)
+        if total:
+            self.summary_label.setText(f'{days_done} days with at least one habit done in {self.year}')
+        else:
+            self.summary_label.setText('No active daily habits')
+
+    def on_habit_changed(self, _index: int):
+        self.habit_id = self.habit_input.currentData()
+        self.refresh()
+
+    def prev_year(self):
+        self.year -= 1
+        self.refresh()
+
+    def next_year(self):
+        self.year += 1
+        self.refresh()
+
+    @profiled
+    def showEvent(self, event: QShowEvent) -> None:
+        super().showEvent(event)
+
+        #habit list and year stats only change with habit writes
+        shown = versions('habits')
+        if shown == self._shown_versions:
+            return
+        self._shown_versions = shown
+
+        self.load_habits()
+        self.refresh()
+
+
+class HeatmapGrid(QWidget):
+    day_clicked = Signal(str)
+
+    def __init__(self, parent: QWidget | None = None):
+        super().__init__(parent)
+
+        self.year = dt_date.today().year
+        self.total = 0
+        self.done_by_day: dict[str, int] = {}
+        self.first_monday = dt_date(self.year, 1, 1)
+
+        self.setMouseTracking(True)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.setMinimumSize(LEFT_MARGIN + 54 * (CELL + GAP), TOP_MARGIN + 7 * (CELL + GAP))
+
+    def set_data(self, year: int, total: int, done_by_day: dict[str, int]):
+        self.year = year
+        self.total = total
+        self.done_by_day = done_by_day
+
+        jan_first = dt_date(year, 1, 1)
+        self.first_monday = jan_first - timedelta(days=jan_first.weekday())
+        self.update()
+
+    def cell_rect(self, day: dt_date) -> QRectF:
+        offset = (day - self.first_monday).days
+        col = offset // 7
+        row = offset % 7
+        return QRectF(LEFT_MARGIN + col * (CELL + GAP), TOP_MARGIN + row * (CELL + GAP), CELL, CELL)
+
+    def day_at(self, x: float, y: float) -> dt_date | None:
+        col = int((x - LEFT_MARGIN) // (CELL + GAP))
+        row = int((y - TOP_MARGIN) // (CELL + GAP))
+        if x < LEFT_MARGIN or y < TOP_MARGIN or row > 6 or col > 53:
+            return None
+
+        day = self.first_monday + timedelta(days=col * 7 + row)
+        if day.year != self.year:
+            return None
+        return day
+
+    def color_for(self, day_iso: str) -> QColor:
+        done = self.done_by_day.get(day_iso, 0)
+        if not self.total or done <= 0:
+            return EMPTY_COLOR
+
+        ratio = min(1.0, done / self.total)
+        index = min(len(LEVEL_COLORS) - 1, int(ratio * len(LEVEL_COLORS) - 1e-9))
+        return LEVEL_COLORS[index]
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        painter.setPen(QColor('#777777'))
+        for row in (0, 2, 4):
+            name = WEEKDAY_NAMES[row]
+            painter.drawText(
+                QRectF(0, TOP_MARGIN + row * (CELL + GAP), LEFT_MARGIN - 4, CELL),
+                Qt.AlignRight | Qt.AlignVCenter,
+                name,
+            )
+
+        day = dt_date(self.year, 1, 1)
+        last_month = 0
+        while day.year == self.year:
+            rect = self.cell_rect(day)
+
+            if day.month != last_month:
+                last_month = day.month
+                painter.setPen(QColor('#777777'))
+                painter.drawText(QRectF(rect.x(), 0, 40, TOP_MARGIN - 2), Qt.AlignLeft | Qt.AlignBottom, day.strftime('%b'))
+
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.color_for(day.isoformat()))
+            painter.drawRoundedRect(rect, 3, 3)
+
+            day += timedelta(days=1)
+
+    def mouseMoveEvent(self, event) -> None:
+        pos = event.position()
+        day = self.day_at(pos.x(), pos.y())
+        if day is None:
+            QToolTip.hideText()
+            return
+
+        done = self.done_by_day.get(day.isoformat(), 0)
+        text = f'{day.isoformat()}: {done}/{self.total}' if self.total else day.isoformat()
+        QToolTip.showText(event.globalPosition().toPoint(), text, self)
+
+    def mousePressEvent(self, event) -> None:
+        if event.button() != Qt.LeftButton:
+            return
+
+        pos = event.position()
+        day = self.day_at(pos.x(), pos.y())
+        if day is not None:
+            self.day_clicked.emit(day.isoformat())
@@ -0,0 +1,192 @@
+from datetime import date as dt_date, timedelta
+
+import numpy as np
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QShowEvent
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QComboBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QScrollArea,
+)
+
+from helpers.db import db_session
+from helpers.dates import WEEKDAY_NAMES
+from helpers.analytics import compute_insights, SERIES, SERIES_LABELS, MAX_LAG
+from db.versions import versions
+from helpers.profiling import profiled
+
+
+RANGES = [
+    ('Last 3 months', 91),
+    ('Last year', 365),
+    ('Last 5 years', 5 * 365),
+]
+
+
+#green for positive, red for negative, stronger tint for stronger correlation
+def correlation_color(r: float | None) -> QColor:
+    if r is None:
+        return QColor('#f4f4f4')
+    strength = int(min(1.0, abs(r)) * 160)
+    if r >= 0:
+        return QColor(255 - strength, 255, 255 - strength)
+    return QColor(255, 255 - strength, 255 - strength)
+
+
+def correlation_text(r: float | None, n: int) -> str:
+    if r is None:
+        return f'– ({n}d)'
+    return f'{r:+.2f}'
+
+
+def format_value(name: str, value: float) -> str:
+    if np.isnan(value):
+        return '–'
+    if name in ('habits', 'todos'):
+        return f'{value * 100:.0f}%'
+    if name == 'spend':
+        return f'¥{value:,.0f}'
+    return f'{value:.1f}'
+
+
+def make_table(rows: int, cols: int) -> QTableWidget:
+    table = QTableWidget(rows, cols)
+    table.setEditTriggers(QTableWidget.NoEditTriggers)
+    table.setSelectionMode(QTableWidget.NoSelection)
+    table.setFocusPolicy(Qt.NoFocus)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+    table.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+    table.setMinimumHeight(30 * (rows + 1))
+    return table
+
+
+def set_cell(table: QTableWidget, row: int, col: int, text: str, color: QColor | None = None):
+    item = QTableWidgetItem(text)
+    item.setTextAlignment(Qt.AlignCenter)
+    if color is not None:
+        item.setBackground(color)
+    table.setItem(row, col, item)
+
+
+class InsightsView(QWidget):
+    def __init__(self):
+        super().__init__()
+
+        self._rendered_key = None
+        self.build_ui()
+
+    def build_ui(self):
+        outer = QVBoxLayout(self)
+        outer.setContentsMargins(0, 0, 0, 0)
+
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setFrameShape(QScrollArea.NoFrame)
+        outer.addWidget(scroll)
+
+        content = QWidget()
+        scroll.setWidget(content)
+
+        layout = QVBoxLayout(content)
+        layout.setContentsMargins(18, 14, 18, 14)
+        layout.setSpacing(12)
+
+        header = QHBoxLayout()
+        layout.addLayout(header)
+
+        title = QLabel('Insights')
+        title.setStyleSheet('font-size: 18px; font-weight: 700;')
+        header.addWidget(title, 1)
+
+        self.range_input = QComboBox()
+        for label, days in RANGES:
+            self.range_input.addItem(label, days)
+        self.range_input.setCurrentIndex(1)
+        self.range_input.currentIndexChanged.connect(lambda _: self.refresh())
+        header.addWidget(self.range_input, 0)
+
+        self.samples_label = QLabel('')
+        self.samples_label.setStyleSheet('color: #666; font-size: 12px;')
+        self.samples_label.setWordWrap(True)
+        layout.addWidget(self.samples_label)
+
+        labels = [SERIES_LABELS[name] for name in SERIES]
+
+        layout.addWidget(self.make_section_label('Correlations (same day)'))
+        self.corr_table = make_table(len(SERIES), len(SERIES))
+        self.corr_table.setHorizontalHeaderLabels(labels)
+        self.corr_table.setVerticalHeaderLabels(labels)
+        layout.addWidget(self.corr_table)
+
+        layout.addWidget(self.make_section_label('Effect on mood in the following days'))
+        drivers = [name for name in SERIES if name != 'mood']
+        self.lag_table = make_table(len(drivers), MAX_LAG)
+        self.lag_table.setHorizontalHeaderLabels([f'+{lag} day' + ('s' if lag > 1 else '') for lag in range(1, MAX_LAG + 1)])
+        self.lag_table.setVerticalHeaderLabels([SERIES_LABELS[name] for name in drivers])
+        layout.addWidget(self.lag_table)
+
+        layout.addWidget(self.make_section_label('Average by weekday'))
+        self.weekday_table = make_table(len(SERIES), 7)
+        self.weekday_table.setHorizontalHeaderLabels(WEEKDAY_NAMES)
+        self.weekday_table.setVerticalHeaderLabels(labels)
+        layout.addWidget(self.weekday_table)
+
+        layout.addStretch(1)
+
+    def make_section_label(self, text: str) -> QLabel:
+        label = QLabel(text)
+        label.setStyleSheet('font-weight: 600; margin-top: 4px;')
+        return label
+
+    @profiled
+    def refresh(self):
+        end = dt_date.today() + timedelta(days=1)
+        start = end - timedelta(days=int(self.range_input.currentData()))
+
+        key = (start, end, versions('habits', 'todos', 'journal', 'finance'))
+        if key == self._rendered_key:
+            return
+        self._rendered_key = key
+
+        with db_session() as connection:
+            insights = compute_insights(connection, start, end)
+
+        self.samples_label.setText(
+            'Days with data: ' + ', '.join(f'{SERIES_LABELS[name]} {insights.samples[name]}' for name in SERIES)
+        )
+
+        for i, a in enumerate(SERIES):
+            for j, b in enumerate(SERIES):
+                if i == j:
+                    set_cell(self.corr_table, i, j, '', QColor('#e9e9e9'))
+                    continue
+                r, n = insights.correlations.get((a, b)) or insights.correlations[(b, a)]
+                set_cell(self.corr_table, i, j, correlation_text(r, n), correlation_color(r))
+
+        drivers = [name for name in SERIES if name != 'mood']
+        for row, name in enumerate(drivers):
+            for col in range(MAX_LAG):
+                lagged = insights.lagged.get(name, [])
+                if col < len(lagged):
+                    _lag, r, n = lagged[col]
+                    set_cell(self.lag_table, row, col, correlation_text(r, n), correlation_color(r))
+                else:
+                    set_cell(self.lag_table, row, col, '–')
+
+        for row, name in enumerate(SERIES):
+            profile = insights.weekdays[name]
+            for col in range(7):
+                set_cell(self.weekday_table, row, col, format_value(name, profile[col]))
+
+    @profiled
+    def showEvent(self, event: QShowEvent) -> None:
+        super().showEvent(event)
+        self.refresh()
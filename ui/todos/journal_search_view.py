@@ -0,0 +1,128 @@
+import html
+
+from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QListWidget,
+    QListWidgetItem,
+)
+
+from helpers.db import db_session
+from db.journal import search_journal, SNIPPET_START, SNIPPET_END
+
+
+PAGE_SIZE = 20
+
+
+#fts5 snippet -> rich text, the entry text itself is escaped so only the match markers become markup
+def snippet_html(snippet: str) -> str:
+    text = html.escape(snippet or '')
+    return text.replace(SNIPPET_START, '<b>').replace(SNIPPET_END, '</b>')
+
+
+class JournalSearchView(QWidget):
+    day_selected = Signal(str)  # 'YYYY-MM-DD'
+
+    def __init__(self):
+        super().__init__()
+
+        self._query = ''
+        self._cursor: int | None = None
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.timeout.connect(self.run_search)
+
+        self.build_ui()
+
+    def build_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(18, 14, 18, 14)
+        layout.setSpacing(12)
+
+        title = QLabel('Search journal')
+        title.setStyleSheet('font-size: 18px; font-weight: 700;')
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('Search entries, went well, difficult, remember...')
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(lambda _: self._search_timer.start(180))
+        self.search_input.returnPressed.connect(self.run_search)
+        layout.addWidget(self.search_input)
+
+        self.status_label = QLabel('')
+        self.status_label.setStyleSheet('color: #666; font-size: 12px;')
+        layout.addWidget(self.status_label)
+
+        self.results_list = QListWidget()
+        self.results_list.setSpacing(2)
+        self.results_list.itemActivated.connect(self.on_item_activated)
+        self.results_list.itemClicked.connect(self.on_item_activated)
+        layout.addWidget(self.results_list, 1)
+
+        footer = QHBoxLayout()
+        footer.addStretch(1)
+        self.more_btn = QPushButton('Load more')
+        self.more_btn.clicked.connect(self.load_more)
+        self.more_btn.hide()
+        footer.addWidget(self.more_btn)
+        footer.addStretch(1)
+        layout.addLayout(footer)
+
+    def run_search(self):
+        self._search_timer.stop()
+        self._query = self.search_input.text().strip()
+        self._cursor = None
+        self.results_list.clear()
+        self.load_page()
+
+    def load_more(self):
+        if self._cursor is not None:
+            self.load_page()
+
+    def load_page(self):
+        if not self._query:
+            self.status_label.setText('')
+            self.more_btn.hide()
+            return
+
+        with db_session() as connection:
+            rows, self._cursor = search_journal(connection, self._query, PAGE_SIZE, self._cursor)
+
+        for row in rows:
+            self.add_result(row)
+
+        count = self.results_list.count()
+        if count == 0:
+            self.status_label.setText('No matching entries')
+        else:
+            more = '+' if self._cursor is not None else ''
+            self.status_label.setText(f'{count}{more} matching entries')
+        self.more_btn.setVisible(self._cursor is not None)
+
+    def add_result(self, row: dict):
+        item = QListWidgetItem()
+        item.setData(Qt.UserRole, row['date'])
+
+        label = QLabel(f"<b>{row['date']}</b><br>{snippet_html(row['snippet'])}")
+        label.setTextFormat(Qt.RichText)
+        label.setWordWrap(True)
+        label.setContentsMargins(6, 4, 6, 4)
+        #clicks go through to the list item
+        label.setAttribute(Qt.WA_TransparentForMouseEvents)
+
+        self.results_list.addItem(item)
+        item.setSizeHint(label.sizeHint())
+        self.results_list.setItemWidget(item, label)
+
+    def on_item_activated(self, item: QListWidgetItem):
+        day = item.data(Qt.UserRole)
+        if day:
+            self.day_selected.emit(day)
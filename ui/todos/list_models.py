@@ -0,0 +1,321 @@
+from PySide6.QtCore import Qt, Signal, QAbstractListModel, QModelIndex, QRect, QSize, QEvent
+from PySide6.QtGui import QColor, QFont
+from PySide6.QtWidgets import (
+    QApplication,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionButton,
+    QStyleOptionViewItem,
+)
+
+
+#list views here have one painted row per item instead of a widget tree per row,
+#so the widget count stays constant no matter how many todos/habits are listed
+
+ROW_ROLE = Qt.UserRole + 1
+
+ROW_HEIGHT = 34
+PADDING = 8
+CHECK_SIZE = 18
+BUTTON_WIDTH = 64
+BUTTON_HEIGHT = 26
+MUTED = QColor('#888888')
+META = QColor('#666666')
+
+
+#rows are plain dicts keyed by 'id', like the db helpers return them
+class RowListModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: list[dict] = []
+        self._positions: dict[int, int] = {}
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+
+        row = self._rows[index.row()]
+        if role == ROW_ROLE:
+            return row
+        if role == Qt.DisplayRole:
+            return self.display_text(row)
+        if role == Qt.ToolTipRole:
+            return self.tooltip(row) or None
+        return None
+
+    def display_text(self, row: dict) -> str:
+        return str(row.get('title') or '')
+
+    def tooltip(self, row: dict) -> str:
+        return ''
+
+    def rows(self) -> list[dict]:
+        return list(self._rows)
+
+    def set_rows(self, rows: list[dict]) -> None:
+        self.beginResetModel()
+        self._rows = [dict(r) for r in rows]
+        self._reindex()
+        self.endResetModel()
+
+    #rows already in the model are skipped, a page can return a row that was moved after loading
+    def append_rows(self, rows: list[dict]) -> None:
+        rows = [r for r in rows if int(r['id']) not in self._positions]
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(dict(r) for r in rows)
+        self._reindex()
+        self.endInsertRows()
+
+    def row_by_id(self, row_id: int) -> dict | None:
+        position = self._positions.get(int(row_id))
+        return None if position is None else self._rows[position]
+
+    #patches one row in place, only that row gets repainted
+    def update_row(self, row_id: int, changes: dict) -> None:
+        position = self._positions.get(int(row_id))
+        if position is None:
+            return
+        self._rows[position].update(changes)
+        index = self.index(position)
+        self.dataChanged.emit(index, index)
+
+    #moves one row so it ends up at position (counted without the row itself)
+    def move_row(self, row_id: int, position: int) -> None:
+        current = self._positions.get(int(row_id))
+        if current is None or position == current:
+            return
+        #qt counts the destination before the row is taken out
+        self.beginMoveRows(QModelIndex(), current, current, QModelIndex(), position + 1 if position > current else position)
+        self._rows.insert(position, self._rows.pop(current))
+        self._reindex()
+        self.endMoveRows()
+
+    def remove_row(self, row_id: int) -> None:
+        position = self._positions.get(int(row_id))
+        if position is None:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position)
+        del self._rows[position]
+        self._reindex()
+        self.endRemoveRows()
+
+    def _reindex(self) -> None:
+        self._positions = {int(r['id']): i for i, r in enumerate(self._rows)}
+
+
+class TodoListModel(RowListModel):
+    pass
+
+
+class HabitListModel(RowListModel):
+    def display_text(self, row: dict) -> str:
+        title = str(row.get('title') or '')
+        return f"{row['emoji']} {title}" if row.get('emoji') else title
+
+    def tooltip(self, row: dict) -> str:
+        return str(row.get('history_tooltip') or '')
+
+
+#paints a checkbox, the row content and push buttons on the right, and turns clicks on them
+#into signals from editorEvent; views should connect with Qt.QueuedConnection when the slot
+#resets the model, so the reset doesn't happen inside the delegate's event handling
+class RowDelegate(QStyledItemDelegate):
+    check_toggled = Signal(object, bool)   # row dict, new checked state
+    button_clicked = Signal(str, object)   # button name, row dict
+
+    #(name, label) pairs, laid out right to left from the row's right edge
+    buttons: tuple[tuple[str, str], ...] = ()
+    #checkbox label, empty for a bare box on the left of the row
+    check_text = ''
+    check_width = CHECK_SIZE
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        #(row id, control) of the last press on a control, a click only counts if it is released there too
+        self._pressed: tuple[int, str] | None = None
+
+    def is_checked(self, row: dict) -> bool:
+        return False
+
+    def paint_content(self, painter, option: QStyleOptionViewItem, row: dict, rect: QRect) -> None:
+        pass
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def layout_rects(self, rect: QRect) -> tuple[QRect, dict[str, QRect], QRect]:
+        top = rect.top() + (rect.height() - BUTTON_HEIGHT) // 2
+        right = rect.right() - PADDING
+
+        button_rects = {}
+        for name, _label in reversed(self.buttons):
+            button_rects[name] = QRect(right - BUTTON_WIDTH + 1, top, BUTTON_WIDTH, BUTTON_HEIGHT)
+            right -= BUTTON_WIDTH + 6
+
+        check_top = rect.top() + (rect.height() - CHECK_SIZE) // 2
+        if self.check_text:
+            #labelled checkbox sits between the content and the buttons
+            check_rect = QRect(right - self.check_width + 1, check_top, self.check_width, CHECK_SIZE)
+            right -= self.check_width + PADDING
+            left = rect.left() + PADDING
+        else:
+            check_rect = QRect(rect.left() + PADDING, check_top, CHECK_SIZE, CHECK_SIZE)
+            left = check_rect.right() + PADDING + 2
+
+        content_rect = QRect(left, rect.top(), max(0, right - left), rect.height())
+        return check_rect, button_rects, content_rect
+
+    def paint(self, painter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        row = index.data(ROW_ROLE)
+        if row is None:
+            return
+
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+
+        painter.save()
+
+        #selection / hover background only, the text is ours
+        background = QStyleOptionViewItem(option)
+        self.initStyleOption(background, index)
+        background.text = ''
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, background, painter, widget)
+
+        check_rect, button_rects, content_rect = self.layout_rects(option.rect)
+
+        check = QStyleOptionButton()
+        check.rect = check_rect
+        check.text = self.check_text
+        check.state = QStyle.State_Enabled | (QStyle.State_On if self.is_checked(row) else QStyle.State_Off)
+        if self.check_text:
+            style.drawControl(QStyle.CE_CheckBox, check, painter, widget)
+        else:
+            style.drawPrimitive(QStyle.PE_IndicatorCheckBox, check, painter, widget)
+
+        for name, label in self.buttons:
+            button = QStyleOptionButton()
+            button.rect = button_rects[name]
+            button.text = label
+            button.state = QStyle.State_Enabled | QStyle.State_Raised
+            style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+
+        self.paint_content(painter, option, row, content_rect)
+
+        painter.restore()
+
+    #'check', a button name or None for the control under pos
+    def control_at(self, rect: QRect, pos) -> str | None:
+        check_rect, button_rects, _content = self.layout_rects(rect)
+        if check_rect.adjusted(-4, -4, 4, 4).contains(pos):
+            return 'check'
+        return next((name for name, button_rect in button_rects.items() if button_rect.contains(pos)), None)
+
+    def editorEvent(self, event, model, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease, QEvent.MouseButtonDblClick):
+            return False
+        if event.button() != Qt.LeftButton:
+            return False
+
+        row = index.data(ROW_ROLE)
+        if row is None:
+            return False
+
+        control = self.control_at(option.rect, event.position().toPoint())
+        hit = None if control is None else (int(row['id']), control)
+
+        if event.type() != QEvent.MouseButtonRelease:
+            self._pressed = hit
+            #presses on the controls are swallowed so they don't change the selection
+            return hit is not None
+
+        pressed, self._pressed = self._pressed, None
+        if hit is None:
+            return False
+        #released over a control the press did not start on (dragged onto it)
+        if hit != pressed:
+            return True
+
+        if control == 'check':
+            self.check_toggled.emit(row, not self.is_checked(row))
+        else:
+            self.button_clicked.emit(control, row)
+        return True
+
+    def draw_text(self, painter, rect: QRect, text: str, color: QColor | None = None, align=Qt.AlignLeft,
+                  strike: bool = False, small: bool = False) -> None:
+        font = QFont(painter.font())
+        font.setStrikeOut(strike)
+        if small:
+            font.setPointSizeF(max(7.0, font.pointSizeF() - 1.5))
+        painter.setFont(font)
+        if color is not None:
+            painter.setPen(color)
+        elided = painter.fontMetrics().elidedText(text, Qt.ElideRight, max(0, rect.width()))
+        painter.drawText(rect, align | Qt.AlignVCenter, elided)
+
+
+#todo row: checkbox, title (struck through when done), optional date and edit/delete buttons
+class TodoDelegate(RowDelegate):
+    def __init__(self, parent=None, show_date: bool = False, editable: bool = False):
+        super().__init__(parent)
+        self.show_date = show_date
+        if editable:
+            self.buttons = (('delete', 'Delete'), ('edit', 'Edit'))
+
+    def is_checked(self, row: dict) -> bool:
+        return bool(row.get('completed'))
+
+    def paint_content(self, painter, option, row, rect):
+        done = bool(row.get('completed'))
+        text_color = MUTED if done else option.palette.text().color()
+
+        title_rect = QRect(rect)
+        if self.show_date:
+            date_rect = QRect(rect.right() - 90, rect.top(), 90, rect.height())
+            title_rect.setRight(date_rect.left() - PADDING)
+            self.draw_text(painter, date_rect, row.get('date') or 'Backlog', META, Qt.AlignRight, small=True)
+
+        title = f"✓ {row['title']}" if done and self.show_date else row['title']
+        self.draw_text(painter, title_rect, title, text_color, strike=done)
+
+
+#habit manager row: name, meta, current/best streak, labelled active box, delete/edit buttons
+class HabitDelegate(RowDelegate):
+    buttons = (('delete', 'Delete'), ('edit', 'Edit'))
+    check_text = 'Active'
+    check_width = 72
+
+    def is_checked(self, row: dict) -> bool:
+        return bool(row.get('active'))
+
+    def paint_content(self, painter, option, row, rect):
+        name = f"{row['emoji']} {row['title']}" if row.get('emoji') else row['title']
+
+        meta = [row['frequency']]
+        if row['frequency'] == 'weekly':
+            meta.append(f"target {int(row.get('weekly_target') or 0)}")
+        if row.get('start_date'):
+            meta.append(f"start {row['start_date']}")
+
+        streak = int(row.get('streak') or 0)
+        best = int(row.get('best') or 0)
+
+        streak_width = 46
+        best_rect = QRect(rect.right() - streak_width, rect.top(), streak_width, rect.height())
+        streak_rect = QRect(best_rect.left() - streak_width - 4, rect.top(), streak_width, rect.height())
+
+        text_right = streak_rect.left() - PADDING
+        half = max(0, (text_right - rect.left()) // 2)
+        name_rect = QRect(rect.left(), rect.top(), half, rect.height())
+        meta_rect = QRect(rect.left() + half + PADDING, rect.top(), max(0, half - PADDING), rect.height())
+
+        self.draw_text(painter, name_rect, name, option.palette.text().color())
+        self.draw_text(painter, meta_rect, ' • '.join(meta), META, small=True)
+        self.draw_text(painter, streak_rect, f'🔥 {streak}' if streak > 0 else '', META, small=True)
+        self.draw_text(painter, best_rect, f'🏆 {best}' if best > 0 else '', META, small=True)
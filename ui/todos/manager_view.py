@@ -1,6 +1,8 @@
+from bisect import bisect_left
 from datetime import date as dt_date
 
-from PySide6.QtCore import Qt, Signal, QDate, QTimer
+from PySide6.QtCore import Qt, QDate, QTimer
+from PySide6.QtGui import QShowEvent
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -14,8 +16,7 @@ from PySide6.QtWidgets import (
     QSpinBox,
     QCheckBox,
     QDateEdit,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QMessageBox,
 )
 
@@ -25,15 +26,22 @@ from db.habits import (
     list_all_habits,
     set_habit_active,
     delete_habit,
-    get_daily_streak,
-    get_weekly_streak
+    get_streak_history,
+    current_streak_from_runs,
 )
 from db.todos import (
     insert_todo,
-    list_all_todos,
-    delete_todo
+    query_todos,
+    delete_todo,
+    todo_sort_key,
 )
 
+from ui.todos.list_models import TodoListModel, TodoDelegate, HabitListModel, HabitDelegate
+from ui.async_loader import AsyncLoader
+from ui.event_relay import EventRelay
+from db.versions import versions
+from helpers.profiling import profiled
+from helpers.events import TodosChanged, HabitsChanged, HabitLogChanged, ExternalChange
 from ui.dialogs.edit_habit_dialog import EditHabitDialog
 from ui.dialogs.edit_todo_dialog import EditTodoDialog
 
@@ -77,14 +85,22 @@ class ManagerView(QWidget):
         self.habits_tab = HabitsManagerWidget()
         self.todos_tab = TodosManagerWidget()
 
-        self.habits_tab.changed.connect(self.refresh)
-        self.todos_tab.changed.connect(self.refresh)
+        #writes from either tab (or anywhere else) reach the visible tab through the change bus
+        self._relay = EventRelay(
+            self,
+            self.on_data_changed,
+            TodosChanged,
+            HabitsChanged,
+            HabitLogChanged,
+            ExternalChange,
+        )
 
         self.tabs.addTab(self.habits_tab, 'Habits')
         self.tabs.addTab(self.todos_tab, 'Todos')
 
         self.tabs.currentChanged.connect(lambda _: self.refresh())
 
+    @profiled
     def refresh(self):
         idx = self.tabs.currentIndex()
         if idx == 0:
@@ -92,13 +108,35 @@ class ManagerView(QWidget):
         else:
             self.todos_tab.refresh()
 
+    #the todos tab refreshes debounced, so a toggle or delete it already patched in is marked fresh first
+    def on_data_changed(self, _event):
+        if not self.isVisible():
+            return
+        if self.tabs.currentIndex() == 1:
+            self.todos_tab.request_refresh()
+        else:
+            self.refresh()
+
+    #cheap when nothing changed, the tabs skip loading while their versions match
+    @profiled
+    def showEvent(self, event: QShowEvent) -> None:
+        super().showEvent(event)
+        self.refresh()
+
+
+#runs on the loader's worker thread
+#streak history for all habits comes from one cached pass over habit_log
+def load_habit_rows(connection) -> tuple[list[dict], dict]:
+    habits = list_all_habits(connection)
+    history = get_streak_history(connection, [int(h['id']) for h in habits])
+    return habits, history
 
-class HabitsManagerWidget(QWidget):
-    changed = Signal()
 
+class HabitsManagerWidget(QWidget):
     def __init__(self):
         super().__init__()
 
+        self.loader = AsyncLoader(self)
         self.build_ui()
 
     def build_ui(self):
@@ -153,9 +191,17 @@ class HabitsManagerWidget(QWidget):
         list_card, list_layout = self.make_card('All habits')
         layout.addWidget(list_card, 1)
 
-        self.habits_list = QListWidget()
-        # performance: smoother scrolling for uniform-height rows
+        # performance: painted rows from a model, uniform heights for smooth scrolling
+        self.habits_model = HabitListModel(self)
+        self.habits_delegate = HabitDelegate(self)
+        self.habits_delegate.check_toggled.connect(self.toggle_active, Qt.QueuedConnection)
+        self.habits_delegate.button_clicked.connect(self.on_habit_button, Qt.QueuedConnection)
+
+        self.habits_list = QListView()
+        self.habits_list.setModel(self.habits_model)
+        self.habits_list.setItemDelegate(self.habits_delegate)
         self.habits_list.setUniformItemSizes(True)
+        self.habits_list.setMouseTracking(True)
         list_layout.addWidget(self.habits_list, 1)
 
     def make_card(self, title: str) -> tuple[QFrame, QVBoxLayout]:
@@ -207,111 +253,62 @@ class HabitsManagerWidget(QWidget):
         self.emoji_input.setCurrentText('')
 
         self.refresh()
-        self.changed.emit()
 
+    @profiled
     def refresh(self):
-        self.habits_list.setUpdatesEnabled(False)
-        self.habits_list.clear()
-
-        today = dt_date.today().isoformat()
+        key = versions('habits')
+        if self.loader.is_fresh(key):
+            return
 
-        # performance: one connection for habits + streaks
-        with db_session() as connection:
-            habits = list_all_habits(connection)
+        self.loader.load(load_habit_rows, self.render_habits, key=key)
 
-            streaks: dict[int, int] = {}
-            for h in habits:
-                hid = int(h['id'])
-                if h['frequency'] == 'daily':
-                    streaks[hid] = get_daily_streak(connection, hid, today)
-                else:
-                    streaks[hid] = get_weekly_streak(connection, hid, today)
+    def render_habits(self, loaded: tuple[list[dict], dict]):
+        habits, history = loaded
+        today = dt_date.today().isoformat()
 
+        rows = []
         for habit in habits:
-            item = QListWidgetItem()
-            widget = self.make_habit_row(habit, streaks.get(int(habit['id']), 0))
-            item.setSizeHint(widget.sizeHint())
-            self.habits_list.addItem(item)
-            self.habits_list.setItemWidget(item, widget)
-
-        self.habits_list.setUpdatesEnabled(True)
-
-    def make_habit_row(self, habit: dict, streak: int) -> QWidget:
-        row = QWidget()
-        layout = QHBoxLayout(row)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(10)
-
-        name = habit['title']
-        if habit.get('emoji'):
-            name = f"{habit['emoji']} {name}"
-
-        name_label = QLabel(name)
-        name_label.setMinimumWidth(220)
-        layout.addWidget(name_label, 1)
-
-        meta = []
-        meta.append(habit['frequency'])
-        if habit['frequency'] == 'weekly':
-            meta.append(f"target {int(habit['weekly_target'] or 0)}")
-        if habit.get('start_date'):
-            meta.append(f"start {habit['start_date']}")
-        meta_label = QLabel(' • '.join(meta))
-        meta_label.setStyleSheet('color: #666; font-size: 12px;')
-        layout.addWidget(meta_label, 1)
-
-        active_box = QCheckBox('Active')
-        active_box.setChecked(bool(habit['active']))
-        active_box.setProperty('habit_id', habit['id'])
-        active_box.toggled.connect(self.toggle_active)
-        layout.addWidget(active_box, 0)
-
-        delete_button = QPushButton('Delete')
-        delete_button.setProperty('habit_id', habit['id'])
-        delete_button.clicked.connect(self.remove_habit)
-        layout.addWidget(delete_button, 0)
-
-        edit = QPushButton('Edit')
-        edit.setProperty('habit', habit)
-        edit.clicked.connect(self.edit_habit)
-        layout.addWidget(edit)
-
-        streak_label = QLabel(f'🔥 {streak}' if streak > 0 else '')
-        streak_label.setStyleSheet('color: #666; font-size: 12px;')
-        streak_label.setMinimumWidth(46)
-        layout.addWidget(streak_label)
-
-        return row
-
-    def edit_habit(self):
-        habit = self.sender().property('habit')
+            h = history.get(int(habit['id']), {})
+            runs = h.get('runs', [])
+            rows.append({
+                **habit,
+                'streak': current_streak_from_runs(runs, habit['frequency'], today),
+                'best': int(h.get('best') or 0),
+                'history_tooltip': self.streak_history_tooltip(runs, habit['frequency']),
+            })
+
+        self.habits_model.set_rows(rows)
+
+    def streak_history_tooltip(self, runs: list[dict], frequency: str) -> str:
+        if not runs:
+            return ''
+
+        unit = 'weeks' if frequency == 'weekly' else 'days'
+        lines = [f"{r['start']} – {r['end']}: {r['length']} {unit}" for r in reversed(runs[-10:])]
+        if len(runs) > 10:
+            lines.append(f'… {len(runs) - 10} older runs')
+        return '\n'.join(lines)
+
+    def on_habit_button(self, name: str, habit: dict):
+        if name == 'edit':
+            self.edit_habit(habit)
+        elif name == 'delete':
+            self.remove_habit(habit)
+
+    def edit_habit(self, habit: dict):
         dialog = EditHabitDialog(habit, self)
         dialog.saved.connect(self.refresh)
         dialog.exec()
 
-    def toggle_active(self, checked: bool):
-        box = self.sender()
-        if not box:
-            return
-
-        habit_id = box.property('habit_id')
-        if habit_id is None:
-            return
+    def toggle_active(self, habit: dict, checked: bool):
+        habit_id = int(habit['id'])
 
         with db_session() as connection:
-            set_habit_active(connection, int(habit_id), checked)
+            set_habit_active(connection, habit_id, checked)
 
-        self.changed.emit()
-
-    def remove_habit(self):
-        button = self.sender()
-        if not button:
-            return
-
-        habit_id = button.property('habit_id')
-        if habit_id is None:
-            return
+        self.habits_model.update_row(habit_id, {'active': 1 if checked else 0})
 
+    def remove_habit(self, habit: dict):
         answer = QMessageBox.question(
             self,
             'Delete habit',
@@ -322,18 +319,25 @@ class HabitsManagerWidget(QWidget):
             return
 
         with db_session() as connection:
-            delete_habit(connection, int(habit_id))
+            delete_habit(connection, int(habit['id']))
 
         self.refresh()
-        self.changed.emit()
 
 
-class TodosManagerWidget(QWidget):
-    changed = Signal()
+#todos per page in the manager list, more are loaded on demand
+TODO_PAGE_SIZE = 200
+
+TODO_MODES = {'All': 'all', 'Backlog': 'backlog', 'By date': 'date'}
 
+
+class TodosManagerWidget(QWidget):
     def __init__(self):
         super().__init__()
 
+        self._cursor = None
+        self._loaded = 0
+        self.loader = AsyncLoader(self)
+
         self._refresh_timer = QTimer(self)
         self._refresh_timer.setSingleShot(True)
         self._refresh_timer.timeout.connect(self.refresh)
@@ -395,11 +399,30 @@ class TodosManagerWidget(QWidget):
         self.filter_date_input.dateChanged.connect(lambda _: self.request_refresh())
         filter_row.addWidget(self.filter_date_input, 0)
 
-        self.todos_list = QListWidget()
-        # performance: smoother scrolling for uniform-height rows
+        # performance: painted rows from a model, uniform heights for smooth scrolling
+        self.todos_model = TodoListModel(self)
+        self.todos_delegate = TodoDelegate(self, show_date=True, editable=True)
+        self.todos_delegate.check_toggled.connect(self.toggle_todo, Qt.QueuedConnection)
+        self.todos_delegate.button_clicked.connect(self.on_todo_button, Qt.QueuedConnection)
+
+        self.todos_list = QListView()
+        self.todos_list.setModel(self.todos_model)
+        self.todos_list.setItemDelegate(self.todos_delegate)
         self.todos_list.setUniformItemSizes(True)
         list_layout.addWidget(self.todos_list, 1)
 
+        more_row = QHBoxLayout()
+        list_layout.addLayout(more_row)
+
+        self.count_label = QLabel('')
+        self.count_label.setStyleSheet('color: #666; font-size: 12px;')
+        more_row.addWidget(self.count_label, 1)
+
+        self.more_button = QPushButton('Load more')
+        self.more_button.clicked.connect(self.load_more)
+        self.more_button.hide()
+        more_row.addWidget(self.more_button, 0)
+
         self.on_backlog_toggled(self.backlog_box.isChecked())
         self.on_mode_changed(self.mode_input.currentText())
 
@@ -440,123 +463,104 @@ class TodosManagerWidget(QWidget):
 
         self.todo_title_input.setText('')
         self.refresh()
-        self.changed.emit()
-
-    def refresh(self):
-        self.todos_list.setUpdatesEnabled(False)
-        self.todos_list.clear()
 
-        with db_session() as connection:
-            todos = list_all_todos(connection)
-
-        query = (self.search_input.text() or '').strip().lower()
-        mode = self.mode_input.currentText()
+    def current_filters(self) -> tuple[str, str, str]:
+        mode = TODO_MODES.get(self.mode_input.currentText(), 'all')
         day_iso = self.filter_date_input.date().toString('yyyy-MM-dd')
+        return self.search_input.text(), mode, day_iso
 
-        filtered = []
-        for t in todos:
-            title = (t.get('title') or '')
-            date_value = t.get('date')
-
-            if query and query not in title.lower():
-                continue
-
-            if mode == 'Backlog' and date_value is not None:
-                continue
-
-            if mode == 'By date' and date_value != day_iso:
-                continue
-
-            filtered.append(t)
-
-        #sort so that completed are at bottom
-        filtered.sort(key=lambda t: t['completed'])
-
-        for todo in filtered:
-            item = QListWidgetItem()
-            widget = self.make_todo_row(todo)
-            item.setSizeHint(widget.sizeHint())
-            self.todos_list.addItem(item)
-            self.todos_list.setItemWidget(item, widget)
-
-        self.todos_list.setUpdatesEnabled(True)
-
-    def make_todo_row(self, todo: dict) -> QWidget:
-        row = QWidget()
-        layout = QHBoxLayout(row)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(10)
-
-        checkbox = QCheckBox()
-        checkbox.setChecked(bool(todo['completed']))
-        checkbox.setProperty('todo_id', todo['id'])
-        checkbox.toggled.connect(self.toggle_todo)
-        layout.addWidget(checkbox)
+    @profiled
+    def refresh(self):
+        self._refresh_timer.stop()
 
-        title = todo['title']
-        if todo.get('completed'):
-            title = f'✓ {title}'
+        key = (self.current_filters(), versions('todos'))
+        if self.loader.is_fresh(key):
+            return
 
-        title_label = QLabel(title)
-        if todo.get('completed'):
-            title_label.setStyleSheet('color: #888; text-decoration: line-through;')
+        self.todos_model.set_rows([])
+        self._cursor = None
+        self._loaded = 0
+        self.load_page(key)
 
-        layout.addWidget(title_label, 1)
+    def load_more(self):
+        if self._cursor is not None:
+            self.load_page()
 
-        date_text = todo['date'] if todo.get('date') else 'Backlog'
-        date_label = QLabel(date_text)
-        date_label.setStyleSheet('color: #666; font-size: 12px;')
-        date_label.setMinimumWidth(90)
-        date_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        layout.addWidget(date_label, 0)
+    #filters, ordering and paging happen in sql, only the visible page gets row widgets
+    #the first page carries the refresh key, later pages extend it
+    def load_page(self, key=None):
+        search, mode, day_iso = self.current_filters()
+        cursor = self._cursor
 
-        delete_button = QPushButton('Delete')
-        delete_button.setProperty('todo_id', todo['id'])
-        delete_button.clicked.connect(self.remove_todo)
-        layout.addWidget(delete_button, 0)
+        self.loader.load(
+            lambda connection: query_todos(
+                connection,
+                search=search,
+                mode=mode,
+                date=day_iso,
+                limit=TODO_PAGE_SIZE,
+                cursor=cursor,
+            ),
+            self.append_page,
+            key=key,
+        )
 
-        edit_button = QPushButton('Edit')
-        edit_button.setProperty('todo', todo)
-        edit_button.clicked.connect(self.edit_todo)
-        layout.addWidget(edit_button, 0)
+    def append_page(self, page: tuple[list[dict], tuple | None]):
+        todos, self._cursor = page
+        self.todos_model.append_rows(todos)
 
-        return row
+        self._loaded = self.todos_model.rowCount()
+        self.show_count()
 
-    def toggle_todo(self, checked: bool):
-        checkbox = self.sender()
-        if not checkbox:
-            return
+    def show_count(self):
+        more = '+' if self._cursor is not None else ''
+        self.count_label.setText(f'{self._loaded}{more} todos')
+        self.more_button.setVisible(self._cursor is not None)
 
-        todo_id = checkbox.property('todo_id')
-        if todo_id is None:
-            return
+    def on_todo_button(self, name: str, todo: dict):
+        if name == 'edit':
+            self.edit_todo(todo)
+        elif name == 'delete':
+            self.remove_todo(todo)
 
+    #none of the filters look at completed, but the ordering does (open first): the row moves to its
+    #new place among the loaded pages, or out of them when it now sorts past the paging cursor
+    #(a later page brings it back); loaded pages and the scroll position are kept
+    def toggle_todo(self, todo: dict, checked: bool):
         with db_session() as connection:
-            toggle_todo(connection, dt_date.today().isoformat(), int(todo_id), checked)
-
-        self.refresh()
-        self.changed.emit()
-
-    def edit_todo(self):
-        todo = self.sender().property('todo')
+            result = toggle_todo(connection, dt_date.today().isoformat(), int(todo['id']), checked, title=todo['title'])
+
+        todo_id = result['todo_id']
+        self.todos_model.update_row(todo_id, {'completed': 1 if result['completed'] else 0})
+        row = self.todos_model.row_by_id(todo_id)
+        if row is not None:
+            key = todo_sort_key(row)
+            if self._cursor is not None and key > self._cursor:
+                self.todos_model.remove_row(todo_id)
+                self._loaded = max(0, self._loaded - 1)
+                self.show_count()
+            else:
+                others = [todo_sort_key(r) for r in self.todos_model.rows() if int(r['id']) != todo_id]
+                self.todos_model.move_row(todo_id, bisect_left(others, key))
+        self.mark_patched()
+
+    def edit_todo(self, todo: dict):
         dialog = EditTodoDialog(todo, self)
         dialog.saved.connect(self.refresh)
         dialog.exec()
 
-    def remove_todo(self):
-        button = self.sender()
-        if not button:
-            return
-
-        todo_id = button.property('todo_id')
-        if todo_id is None:
-            return
-
+    def remove_todo(self, todo: dict):
         with db_session() as connection:
-            delete_todo(connection, int(todo_id))
+            delete_todo(connection, int(todo['id']))
 
-        self.refresh()
-        self.changed.emit()
+        self.todos_model.remove_row(int(todo['id']))
+        self._loaded = max(0, self._loaded - 1)
+        self.show_count()
+        self.mark_patched()
+
+    #the rows on screen already show the write, the refresh its change event schedules can skip
+    def mark_patched(self):
+        self.loader.mark_fresh((self.current_filters(), versions('todos')))
 
     def on_mode_changed(self, text: str):
         self.filter_date_input.setEnabled(text == 'By date')
@@ -1,7 +1,31 @@
+from typing import Callable
+
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QStackedWidget, QToolButton, QButtonGroup
 
 from ui.todos.day_view import DayView
-from ui.todos.manager_view import ManagerView
+
+DAY, MANAGER, YEAR, SEARCH, INSIGHTS = range(5)
+
+
+#like the main window tabs, the pages besides the day view are built (and imported) when first opened
+def build_manager_view() -> QWidget:
+    from ui.todos.manager_view import ManagerView
+    return ManagerView()
+
+
+def build_heatmap_view() -> QWidget:
+    from ui.todos.heatmap_view import HabitHeatmapView
+    return HabitHeatmapView()
+
+
+def build_search_view() -> QWidget:
+    from ui.todos.journal_search_view import JournalSearchView
+    return JournalSearchView()
+
+
+def build_insights_view() -> QWidget:
+    from ui.todos.insights_view import InsightsView
+    return InsightsView()
 
 
 class TodosContainer(QWidget):
@@ -10,10 +34,17 @@ class TodosContainer(QWidget):
 
         self._stack = QStackedWidget()
         self._day_view = DayView()
-        self._manager_view = ManagerView()
-
         self._stack.addWidget(self._day_view)
-        self._stack.addWidget(self._manager_view)
+
+        #index -> factory, entries are dropped once the page is built
+        self._page_factories: dict[int, Callable[[], QWidget]] = {
+            MANAGER: build_manager_view,
+            YEAR: build_heatmap_view,
+            SEARCH: build_search_view,
+            INSIGHTS: build_insights_view,
+        }
+        for _index in self._page_factories:
+            self._stack.addWidget(QWidget())
 
         #top nav for switching to manager now similar to finance tab
         nav = QHBoxLayout()
@@ -26,15 +57,33 @@ class TodosContainer(QWidget):
         self._btn_manager.setText("Manager")
         self._btn_manager.setCheckable(True)
 
+        self._btn_year = QToolButton()
+        self._btn_year.setText("Year")
+        self._btn_year.setCheckable(True)
+
+        self._btn_search = QToolButton()
+        self._btn_search.setText("Search")
+        self._btn_search.setCheckable(True)
+
+        self._btn_insights = QToolButton()
+        self._btn_insights.setText("Insights")
+        self._btn_insights.setCheckable(True)
+
         group = QButtonGroup(self)
         group.setExclusive(True)  
-        group.addButton(self._btn_day, 0)
-        group.addButton(self._btn_manager, 1)
+        group.addButton(self._btn_day, DAY)
+        group.addButton(self._btn_manager, MANAGER)
+        group.addButton(self._btn_year, YEAR)
+        group.addButton(self._btn_search, SEARCH)
+        group.addButton(self._btn_insights, INSIGHTS)
 
-        group.idClicked.connect(self._stack.setCurrentIndex)
+        group.idClicked.connect(self.show_page)
 
         nav.addWidget(self._btn_day)
         nav.addWidget(self._btn_manager)
+        nav.addWidget(self._btn_year)
+        nav.addWidget(self._btn_search)
+        nav.addWidget(self._btn_insights)
         nav.addStretch(1)
 
         root = QVBoxLayout()
@@ -43,7 +92,7 @@ class TodosContainer(QWidget):
 
         self.setLayout(root)
 
-        self._stack.setCurrentIndex(0)
+        self._stack.setCurrentIndex(DAY)
         self._btn_day.setChecked(True)
 
         self.setStyleSheet(
@@ -77,7 +126,31 @@ class TodosContainer(QWidget):
         )
 
 
+    #swaps the placeholder at index for the real page on first use
+    def ensure_page(self, index: int) -> QWidget:
+        factory = self._page_factories.pop(index, None)
+        if factory is None:
+            return self._stack.widget(index)
+
+        widget = factory()
+        if index in (YEAR, SEARCH):
+            widget.day_selected.connect(self.open_day)
+
+        current = self._stack.currentIndex()
+        placeholder = self._stack.widget(index)
+        self._stack.removeWidget(placeholder)
+        self._stack.insertWidget(index, widget)
+        self._stack.setCurrentIndex(current)
+        placeholder.deleteLater()
+
+        return widget
+
+    def show_page(self, index: int) -> QWidget:
+        widget = self.ensure_page(index)
+        self._stack.setCurrentIndex(index)
+        return widget
+
     def open_day(self, day: str) -> None:
-        self._stack.setCurrentIndex(0)
+        self._stack.setCurrentIndex(DAY)
         self._btn_day.setChecked(True)
         self._day_view.set_day(day)
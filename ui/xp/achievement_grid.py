@@ -1,10 +1,10 @@
-from PySide6.QtWidgets import QGridLayout, QLabel, QFrame
+from PySide6.QtWidgets import QGridLayout, QLabel, QFrame, QProgressBar
 from PySide6.QtCore import Qt
 
 class AchievementTile(QFrame):
-    def __init__(self, name: str, description: str, unlocked: bool, hidden: bool):
+    def __init__(self, name: str, description: str, unlocked: bool, hidden: bool, progress: dict | None = None):
         super().__init__()
-        self.setFixedSize(160, 90)
+        self.setFixedSize(160, 90 if progress is None else 110)
         self.setStyleSheet("""
             QFrame {
                 border: 1px solid #d9d9d9;
@@ -34,3 +34,20 @@ class AchievementTile(QFrame):
 
         layout.addWidget(title, 0, 0)
         layout.addWidget(desc, 1, 0)
+
+        #progress is {'current', 'target'} from actions.achievement_checks.evaluate_progress
+        if progress is not None:
+            current = int(progress.get("current") or 0)
+            target = int(progress.get("target") or 0)
+
+            bar = QProgressBar()
+            bar.setTextVisible(False)
+            bar.setFixedHeight(6)
+            bar.setRange(0, max(1, target))
+            bar.setValue(min(current, target))
+            layout.addWidget(bar, 2, 0)
+
+            count = QLabel(f"{current:,}/{target:,}")
+            count.setAlignment(Qt.AlignCenter)
+            count.setStyleSheet("font-size: 10px; color: #888; border: none;")
+            layout.addWidget(count, 3, 0)
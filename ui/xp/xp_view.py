@@ -12,19 +12,42 @@ from PySide6.QtWidgets import (
     QScrollArea,
 )
 
-from helpers.db import db_session
+from ui.async_loader import AsyncLoader
+from db.versions import versions, TABLES
+from helpers.profiling import profiled
 from db.xp import get_total_xp, list_recent_xp_events, level_for_total_xp, next_badge_milestone
-from db.achievements import list_achievements, list_unlocked_ids, unlock
+from db.achievements import list_achievements, list_unlocked_ids
+from db.stats import load_stats_snapshot
+from actions.achievement_checks import evaluate_progress
 
 from ui.xp.level_badge import LevelBadge
 from ui.xp.achievement_grid import AchievementTile
-from ui.xp.achievement_checks import CHECKS
 
 from datetime import date as dt_date
 
+
+#runs on the loader's worker thread
+def load_progression_data(connection) -> dict:
+    #unlocks are recorded by the action layer (actions.achievements), this only displays them
+    achs = list_achievements(connection)
+    unlocked = list_unlocked_ids(connection)
+
+    #one snapshot answers the progress of every tile
+    snapshot = load_stats_snapshot(connection, dt_date.today().isoformat())
+
+    return {
+        'total': get_total_xp(connection),
+        'events': list_recent_xp_events(connection, limit=60),
+        'achievements': achs,
+        'unlocked': unlocked,
+        'progress': evaluate_progress(achs, snapshot, unlocked),
+    }
+
+
 class XPView(QWidget):
     def __init__(self):
         super().__init__()
+        self.loader = AsyncLoader(self)
         self.build_ui()
 
     def build_ui(self) -> None:
@@ -125,69 +148,69 @@ class XPView(QWidget):
         self.achievement_grid.setSpacing(10)
         self.achievement_grid.setContentsMargins(0, 0, 0, 0)
 
+    @profiled
     def showEvent(self, event) -> None:
         super().showEvent(event)
         self.refresh()
 
+    @profiled
     def refresh(self) -> None:
-        with db_session() as connection:
-
-            total = get_total_xp(connection)
-            level, into, step = level_for_total_xp(total)
-            events = list_recent_xp_events(connection, limit=60)
-
-            self.badge.set_level(level)
-            self.level_label.setText(f'level {level}')
-
-            self.progress.setMaximum(step)
-            self.progress.setValue(into)
-            self.progress_label.setText(f'{into} / {step} xp   (total {total})')
-
-            next_m = next_badge_milestone(level)
-            self.milestone_label.setText('badge tier maxed' if next_m is None else f'next badge at level {next_m}')
-
-            self.log.clear()
-            for e in events:
-                xp = int(e.get('xp_amount') or 0)
-                msg = (e.get('message') or '').strip()
-                when = (e.get('created_at') or '')[:16]
-                sign = '+' if xp > 0 else ''
-                line = f'{when}   {sign}{xp} xp   {msg}'
-                self.log.addItem(QListWidgetItem(line))
-
-            day = dt_date.today().isoformat()
-
-            achs = list_achievements(connection)
-            unlocked = list_unlocked_ids(connection)
-
-            for a in achs:
-                aid = a["id"]
-                if aid in unlocked:
-                    continue
-                fn = CHECKS.get(aid)
-                if fn and fn(connection, day):
-                    unlock(connection, aid)
-                    unlocked.add(aid)
-
-
-            while self.achievement_grid.count():
-                item = self.achievement_grid.takeAt(0)
-                if item.widget():
-                    item.widget().deleteLater()
-
-            row = col = 0
-            for ach in achs:
-                is_unlocked = (ach["id"] in unlocked)
-                hidden = bool(ach.get("hidden_description"))
-                tile = AchievementTile(
-                    ach["name"],
-                    ach["description"],
-                    is_unlocked,
-                    hidden,
-                )
-                self.achievement_grid.addWidget(tile, row, col)
-                col += 1
-                if col >= 3:
-                    col = 0
-                    row += 1
-
+        #tile progress comes from the stats snapshot, which reads every table
+        key = (dt_date.today().isoformat(), versions(*TABLES))
+        if self.loader.is_fresh(key):
+            return
+
+        self.loader.load(load_progression_data, self.render, key=key)
+
+    def render(self, data: dict) -> None:
+        total = data['total']
+        level, into, step = level_for_total_xp(total)
+        events = data['events']
+
+        self.badge.set_level(level)
+        self.level_label.setText(f'level {level}')
+
+        self.progress.setMaximum(step)
+        self.progress.setValue(into)
+        self.progress_label.setText(f'{into} / {step} xp   (total {total})')
+
+        next_m = next_badge_milestone(level)
+        self.milestone_label.setText('badge tier maxed' if next_m is None else f'next badge at level {next_m}')
+
+        self.log.clear()
+        for e in events:
+            xp = int(e.get('xp_amount') or 0)
+            msg = (e.get('message') or '').strip()
+            when = (e.get('created_at') or '')[:16]
+            sign = '+' if xp > 0 else ''
+            line = f'{when}   {sign}{xp} xp   {msg}'
+            self.log.addItem(QListWidgetItem(line))
+
+        achs = data['achievements']
+        unlocked = data['unlocked']
+        progress = data['progress']
+
+        while self.achievement_grid.count():
+            item = self.achievement_grid.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+
+        row = col = 0
+        for ach in achs:
+            is_unlocked = (ach["id"] in unlocked)
+            hidden = bool(ach.get("hidden_description"))
+            tile_progress = progress.get(ach["id"])
+            if hidden or not tile_progress or tile_progress["target"] is None:
+                tile_progress = None
+            tile = AchievementTile(
+                ach["name"],
+                ach["description"],
+                is_unlocked,
+                hidden,
+                tile_progress,
+            )
+            self.achievement_grid.addWidget(tile, row, col)
+            col += 1
+            if col >= 3:
+                col = 0
+                row += 1